@@ -0,0 +1,81 @@
+#MIT License
+#
+#Copyright (c) 2022 I-and-D-Got-Accelerators
+#
+#Permission is hereby granted, free of charge, to any person obtaining a copy
+#of this software and associated documentation files (the "Software"), to deal
+#in the Software without restriction, including without limitation the rights
+#to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#copies of the Software, and to permit persons to whom the Software is
+#furnished to do so, subject to the following conditions:
+#
+#The above copyright notice and this permission notice shall be included in all
+#copies or substantial portions of the Software.
+#
+#THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#SOFTWARE.
+
+"""Compares AdaptiveBackoff with a fixed exponential curve on a dependency that fails for a
+   fixed outage duration after every call starts. Reported are the attempts per call, wasted
+   on the outage, and the idle time per call, the time between the end of the outage and the
+   successful attempt.
+
+   Run offline from the python_fault_tolerance directory with src on the search path:
+
+       PYTHONPATH=src python benchmarks/bench_adaptive.py [--calls N] [--outage SECONDS]"""
+
+import argparse
+import time
+import typing as PT
+
+import fault_tolerance
+
+class DummyException(Exception):
+    pass
+
+class AttemptCounter(fault_tolerance.RetryHooks):
+
+    def __init__(self):
+        self.attempts: int = 0
+
+    def on_attempt(self, name: str, attempt: int, elapsed: float, exc: Exception) -> None:
+        self.attempts += 1
+
+def run(policy: PT.Callable[[int], float], calls: int, outage: float) -> PT.Tuple[float, float]:
+    counter: AttemptCounter = AttemptCounter()
+    recovers_at: PT.List[float] = [0.0]
+
+    @fault_tolerance.forward_err_recovery_by_retry(max_no_of_retries=64, exc_lst=[DummyException], backoff_duration_fn=policy, hooks=[counter])
+    def dependency() -> None:
+        if time.monotonic() < recovers_at[0]:
+            raise DummyException()
+
+    idle: float = 0.0
+    for _ in range(calls):
+        recovers_at[0] = time.monotonic() + outage
+        dependency()
+        idle += time.monotonic() - recovers_at[0]
+    return counter.attempts / calls, idle / calls * 1e3
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--calls', type=int, default=20, help='calls, each hitting an outage')
+    parser.add_argument('--outage', type=float, default=0.1, help='outage duration in seconds')
+    args = parser.parse_args()
+
+    policies: PT.List[PT.Tuple[str, PT.Callable[[int], float]]] = [
+        ('ExponentialBackoff(0.01)', fault_tolerance.ExponentialBackoff(0.01)),
+        ('AdaptiveBackoff', fault_tolerance.AdaptiveBackoff(fallback=fault_tolerance.ExponentialBackoff(0.01))),
+    ]
+    print(f"{'policy':<28}{'attempts/call':>16}{'idle ms/call':>16}")
+    for name, policy in policies:
+        attempts, idle_ms = run(policy, args.calls, args.outage)
+        print(f"{name:<28}{attempts:>16.2f}{idle_ms:>16.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+#MIT License
+#
+#Copyright (c) 2022 I-and-D-Got-Accelerators
+#
+#Permission is hereby granted, free of charge, to any person obtaining a copy
+#of this software and associated documentation files (the "Software"), to deal
+#in the Software without restriction, including without limitation the rights
+#to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#copies of the Software, and to permit persons to whom the Software is
+#furnished to do so, subject to the following conditions:
+#
+#The above copyright notice and this permission notice shall be included in all
+#copies or substantial portions of the Software.
+#
+#THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#SOFTWARE.
+
+"""Compares the throughput of fanning out a failing function over a thread pool, once with
+   forward_err_recovery_by_retry sleeping in the pool threads and once with RetryingExecutor
+   rescheduling the failed calls on its delay queue.
+
+       PYTHONPATH=src python benchmarks/bench_executor.py [--tasks N] [--workers W] [--failure-rate F]"""
+
+import argparse
+import concurrent.futures
+import random
+import time
+import typing as PT
+
+import fault_tolerance
+
+class DummyException(Exception):
+    pass
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tasks', type=int, default=2000, help='number of calls')
+    parser.add_argument('--workers', type=int, default=8, help='number of pool threads')
+    parser.add_argument('--failure-rate', type=float, default=0.2, help='probability that an attempt fails')
+    parser.add_argument('--work', type=float, default=0.001, help='seconds of I/O per attempt')
+    parser.add_argument('--backoff', type=float, default=0.05, help='seconds of backoff after a failure')
+    args = parser.parse_args()
+
+    def backoff(attempt: int) -> float:
+        return args.backoff
+
+    def io_call(i: int) -> int:
+        time.sleep(args.work)
+        if random.random() < args.failure_rate:
+            raise DummyException()
+        return i
+
+    retried: PT.Callable = fault_tolerance.forward_err_recovery_by_retry(max_no_of_retries=10, exc_lst=[DummyException], backoff_duration_fn=backoff)(io_call)
+
+    t1 = time.monotonic()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=args.workers) as pool:
+        list(pool.map(retried, range(args.tasks)))
+    sleeping_duration: float = time.monotonic() - t1
+
+    t1 = time.monotonic()
+    with fault_tolerance.RetryingExecutor(max_no_of_retries=10, exc_lst=[DummyException], backoff_duration_fn=backoff, max_workers=args.workers) as executor:
+        list(executor.map(io_call, range(args.tasks)))
+    executor_duration: float = time.monotonic() - t1
+
+    print(f"{'strategy':<40}{'seconds':>10}{'calls/s':>12}")
+    print(f"{'retry decorator in ThreadPoolExecutor':<40}{sleeping_duration:>10.3f}{args.tasks / sleeping_duration:>12.1f}")
+    print(f"{'RetryingExecutor':<40}{executor_duration:>10.3f}{args.tasks / executor_duration:>12.1f}")
+
+if __name__ == "__main__":
+    main()
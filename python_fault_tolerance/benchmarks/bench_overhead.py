@@ -0,0 +1,96 @@
+#MIT License
+#
+#Copyright (c) 2022 I-and-D-Got-Accelerators
+#
+#Permission is hereby granted, free of charge, to any person obtaining a copy
+#of this software and associated documentation files (the "Software"), to deal
+#in the Software without restriction, including without limitation the rights
+#to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#copies of the Software, and to permit persons to whom the Software is
+#furnished to do so, subject to the following conditions:
+#
+#The above copyright notice and this permission notice shall be included in all
+#copies or substantial portions of the Software.
+#
+#THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#SOFTWARE.
+
+"""Measures the per call overhead of forward_err_recovery_by_retry compared with an undecorated
+   call, on the success path, on the path that retries once and on exhaustion.
+
+   Run offline from the python_fault_tolerance directory with src on the search path:
+
+       PYTHONPATH=src python benchmarks/bench_overhead.py [--number N] [--repeat R]
+
+   The best of R repetitions of N calls is reported in nanoseconds per call."""
+
+import argparse
+import timeit
+import typing as PT
+
+import fault_tolerance
+
+class DummyException(Exception):
+    pass
+
+def undecorated() -> int:
+    return 1
+
+@fault_tolerance.forward_err_recovery_by_retry(max_no_of_retries=3, exc_lst=[DummyException])
+def success_path() -> int:
+    return 1
+
+_calls: PT.List[int] = [0]
+
+@fault_tolerance.forward_err_recovery_by_retry(max_no_of_retries=3, exc_lst=[DummyException])
+def retry_once_path() -> int:
+    _calls[0] += 1
+    if _calls[0] % 2:
+        raise DummyException()
+    return 1
+
+@fault_tolerance.forward_err_recovery_by_retry(max_no_of_retries=3, exc_lst=[DummyException])
+def exhaustion_path() -> int:
+    raise DummyException()
+
+def exhaustion() -> None:
+    try:
+        exhaustion_path()
+    except fault_tolerance.FailedToRecoverError:
+        pass
+
+def undecorated_exhaustion() -> None:
+    for _ in range(3):
+        try:
+            raise DummyException()
+        except DummyException:
+            pass
+
+BENCHMARKS: PT.List[PT.Tuple[str, PT.Callable, PT.Callable]] = [
+    ('success path', success_path, undecorated),
+    ('retry once', retry_once_path, undecorated),
+    ('exhaustion after 3 attempts', exhaustion, undecorated_exhaustion),
+]
+
+def best_ns_per_call(fx: PT.Callable, number: int, repeat: int) -> float:
+    return min(timeit.repeat(fx, number=number, repeat=repeat)) / number * 1e9
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--number', type=int, default=200000, help='calls per repetition')
+    parser.add_argument('--repeat', type=int, default=5, help='number of repetitions')
+    args = parser.parse_args()
+
+    print(f"{'benchmark':<32}{'decorated ns':>14}{'baseline ns':>14}{'overhead ns':>14}")
+    for name, decorated, baseline in BENCHMARKS:
+        decorated_ns: float = best_ns_per_call(decorated, args.number, args.repeat)
+        baseline_ns: float = best_ns_per_call(baseline, args.number, args.repeat)
+        print(f"{name:<32}{decorated_ns:>14.1f}{baseline_ns:>14.1f}{decorated_ns - baseline_ns:>14.1f}")
+
+if __name__ == "__main__":
+    main()
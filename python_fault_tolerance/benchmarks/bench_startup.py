@@ -0,0 +1,126 @@
+#MIT License
+#
+#Copyright (c) 2022 I-and-D-Got-Accelerators
+#
+#Permission is hereby granted, free of charge, to any person obtaining a copy
+#of this software and associated documentation files (the "Software"), to deal
+#in the Software without restriction, including without limitation the rights
+#to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#copies of the Software, and to permit persons to whom the Software is
+#furnished to do so, subject to the following conditions:
+#
+#The above copyright notice and this permission notice shall be included in all
+#copies or substantial portions of the Software.
+#
+#THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#SOFTWARE.
+
+"""Measures the cold start cost of the package: the time of 'import fault_tolerance' in a fresh
+   interpreter, and the time to decorate a function with forward_err_recovery_by_retry, with a
+   specification seen before, and with a RetryPolicy created once, and the time and the memory to
+   define a client class with 50 retried methods, decorated one by one or by retry_methods.
+
+   Run offline from the python_fault_tolerance directory with src on the search path:
+
+       PYTHONPATH=src python benchmarks/bench_startup.py [--number N] [--repeat R]
+
+   The import time is the best of R fresh interpreters minus the start up of a bare interpreter,
+   the decoration times are the best of R repetitions of N decorations in microseconds, the class
+   definitions of N / 100 definitions."""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+import timeit
+import tracemalloc
+import typing as PT
+
+import fault_tolerance
+
+class DummyException(Exception):
+    pass
+
+def backoff(attempt: int) -> float:
+    return 0.1 * attempt
+
+def target() -> int:
+    return 1
+
+def best_interpreter_ms(code: str, repeat: int) -> float:
+    timings: PT.List[float] = []
+    for _ in range(repeat):
+        start: float = time.perf_counter()
+        subprocess.run([sys.executable, '-c', code], check=True, env=os.environ)
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1e3
+
+def decorate_with_new_spec() -> None:
+    # a fresh backoff function every time, its signature is inspected on every decoration
+    def fresh_backoff(attempt: int) -> float:
+        return 0.1 * attempt
+    fault_tolerance.forward_err_recovery_by_retry(max_no_of_retries=3, exc_lst=[DummyException], backoff_duration_fn=fresh_backoff)(target)
+
+def decorate_with_known_spec() -> None:
+    fault_tolerance.forward_err_recovery_by_retry(max_no_of_retries=3, exc_lst=[DummyException], backoff_duration_fn=backoff)(target)
+
+POLICY: fault_tolerance.RetryPolicy = fault_tolerance.RetryPolicy(max_no_of_retries=3, exc_lst=[DummyException], backoff_duration_fn=backoff)
+
+def decorate_with_policy() -> None:
+    POLICY(target)
+
+def method(self, key: str) -> str:
+    return key
+
+METHOD_NAMES: PT.List[str] = [f"get_{no}" for no in range(50)]
+
+def define_client_decorated_per_method() -> type:
+    return type('Client', (), {name: POLICY(method) for name in METHOD_NAMES})
+
+def define_client_with_retry_methods() -> type:
+    return fault_tolerance.retry_methods(POLICY)(type('Client', (), {name: method for name in METHOD_NAMES}))
+
+CLASS_BENCHMARKS: PT.List[PT.Tuple[str, PT.Callable[[], type]]] = [
+    ('client class, per method', define_client_decorated_per_method),
+    ('client class, retry_methods', define_client_with_retry_methods),
+]
+
+def allocated_kib(define_client: PT.Callable[[], type]) -> float:
+    tracemalloc.start()
+    start: int = tracemalloc.get_traced_memory()[0]
+    client: type = define_client()
+    allocated: int = tracemalloc.get_traced_memory()[0] - start
+    tracemalloc.stop()
+    return allocated / 1024
+
+BENCHMARKS: PT.List[PT.Tuple[str, PT.Callable]] = [
+    ('decorate, new specification', decorate_with_new_spec),
+    ('decorate, known specification', decorate_with_known_spec),
+    ('decorate, RetryPolicy', decorate_with_policy),
+]
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--number', type=int, default=20000, help='decorations per repetition')
+    parser.add_argument('--repeat', type=int, default=5, help='number of repetitions')
+    args = parser.parse_args()
+
+    bare_ms: float = best_interpreter_ms('pass', args.repeat)
+    import_ms: float = best_interpreter_ms('import fault_tolerance', args.repeat)
+    print(f"{'import fault_tolerance':<32}{import_ms - bare_ms:>10.1f} ms")
+    for name, fx in BENCHMARKS:
+        us: float = min(timeit.repeat(fx, number=args.number, repeat=args.repeat)) / args.number * 1e6
+        print(f"{name:<32}{us:>10.2f} us")
+    number: int = max(1, args.number // 100)
+    for name, define_client in CLASS_BENCHMARKS:
+        us = min(timeit.repeat(define_client, number=number, repeat=args.repeat)) / number * 1e6
+        print(f"{name:<32}{us:>10.2f} us{allocated_kib(define_client):>10.1f} KiB")
+
+if __name__ == "__main__":
+    main()
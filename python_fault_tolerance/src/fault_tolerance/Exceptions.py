@@ -23,7 +23,68 @@
 import typing as PT
 
 class FailedToRecoverError(Exception):
-    pass
+
+    """Raised when a call could not be recovered, caused by the exception of the last attempt.
+       trace holds the attempts of the call as a CallTrace, if the strategy recorded them. The
+       retry decorators only keep the attempts, the trace is built when it is first read."""
+
+    def __init__(self, message: str = "", trace: PT.Any = None):
+        super().__init__(message)
+        self._trace: PT.Any = trace
+        # the name of the function, the flat attempts and the time of a call the trace is built from
+        self._attempts: PT.Tuple[str, PT.List[PT.Any], float] = None
+
+    @property
+    def trace(self) -> PT.Any:
+        if self._attempts is not None:
+            from fault_tolerance.tracing import make_trace
+            name, attempts, recorded_at = self._attempts
+            self._trace = make_trace(name, attempts, False, recorded_at)
+            self._attempts = None
+        return self._trace
+
+    @trace.setter
+    def trace(self, trace: PT.Any) -> None:
+        self._trace = trace
+        self._attempts = None
 
 class IncorrectFaultToleranceSpecificationError(Exception):
     pass
+
+class RetryBudgetExhaustedError(FailedToRecoverError):
+    pass
+
+class CircuitOpenError(Exception):
+    pass
+
+class AttemptTimeoutError(Exception):
+    pass
+
+class DeadlineExceededError(FailedToRecoverError):
+    pass
+
+class BulkheadFullError(Exception):
+    pass
+
+class BatchFailedToRecoverError(FailedToRecoverError):
+
+    """Raised when items of a batch could not be recovered. results holds the per item results in
+       the original order, with the exception of the last attempt in place of every failed item,
+       and failures maps the index of every failed item to that exception."""
+
+    def __init__(self, message: str, results: PT.List[PT.Any] = None, failures: PT.Dict[int, Exception] = None):
+        super().__init__(message)
+        self.results: PT.List[PT.Any] = results if results is not None else []
+        self.failures: PT.Dict[int, Exception] = failures if failures is not None else {}
+
+class WorkflowFailedError(FailedToRecoverError):
+
+    """Raised when steps of a workflow failed, caused by the exception of the first failed step.
+       results holds the results of the steps that completed, including those resumed from their
+       checkpoints, and failures maps the name of every failed step to its exception. The steps
+       depending on a failed step were not run."""
+
+    def __init__(self, message: str, results: PT.Dict[str, PT.Any] = None, failures: PT.Dict[str, Exception] = None):
+        super().__init__(message)
+        self.results: PT.Dict[str, PT.Any] = results if results is not None else {}
+        self.failures: PT.Dict[str, Exception] = failures if failures is not None else {}
@@ -1,2 +1,36 @@
-from .Exceptions import FailedToRecoverError, IncorrectFaultToleranceSpecificationError
-from .decorators import forward_err_recovery_by_retry
\ No newline at end of file
+import importlib
+from .Exceptions import FailedToRecoverError, IncorrectFaultToleranceSpecificationError, RetryBudgetExhaustedError, CircuitOpenError, \
+                         AttemptTimeoutError, DeadlineExceededError, BulkheadFullError, \
+                         BatchFailedToRecoverError, WorkflowFailedError
+from .backoff import BackoffPolicy, ConstantBackoff, LinearBackoff, ExponentialBackoff, FibonacciBackoff, \
+                      FullJitterBackoff, DecorrelatedJitterBackoff, AdaptiveBackoff, retry_after_hint
+from .breaker import CircuitBreaker
+from .clock import Clock, SystemClock, VirtualClock
+from .budget import RetryBudget
+from .cache import ResultCache, InMemoryResultCache, SQLiteResultCache
+from .limiter import Bulkhead
+from .resources import ResourcePool
+from .metrics import RetryHooks, CompositeRetryHooks, MetricsCollector, LatencyTracker
+from .decorators import forward_err_recovery_by_retry, forward_err_recovery_by_batch_retry, forward_err_recovery_by_hedging, \
+                         forward_err_recovery_by_fallback, Fallback, \
+                         circuit_breaker, bulkhead, ExceptionClassifier, ExceptionRule
+from .tracing import AttemptTrace, CallTrace, TraceRing, TRACE_RING
+
+# these are only imported when they are used, e.g. RetryingExecutor needs concurrent.futures and
+# the shared state mmap and fcntl
+_lazy_attrs = {'RetryingExecutor': 'executor',
+               'SharedStateFile': 'shared_state', 'SharedCircuitBreaker': 'shared_state', 'SharedRetryBudget': 'shared_state',
+               'RetryPolicy': 'policy', 'retry_methods': 'policy', 'retry_functions': 'policy',
+               'Workflow': 'workflow',
+               'Simulation': 'simulation', 'FailureModel': 'simulation', 'SimulationReport': 'simulation', 'SimulatedFailure': 'simulation'}
+
+def __getattr__(name: str):
+    if name in _lazy_attrs:
+        module = importlib.import_module(f".{_lazy_attrs[name]}", __name__)
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def __dir__():
+    return sorted(set(globals()) | set(_lazy_attrs))
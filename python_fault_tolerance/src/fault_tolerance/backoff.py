@@ -0,0 +1,279 @@
+#MIT License
+#
+#Copyright (c) 2022 I-and-D-Got-Accelerators
+#
+#Permission is hereby granted, free of charge, to any person obtaining a copy
+#of this software and associated documentation files (the "Software"), to deal
+#in the Software without restriction, including without limitation the rights
+#to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#copies of the Software, and to permit persons to whom the Software is
+#furnished to do so, subject to the following conditions:
+#
+#The above copyright notice and this permission notice shall be included in all
+#copies or substantial portions of the Software.
+#
+#THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#SOFTWARE.
+
+import array
+import random
+import threading
+import typing as PT
+from fault_tolerance.Exceptions import IncorrectFaultToleranceSpecificationError
+from fault_tolerance.checks import check_non_negative_number, check_positive_number
+
+# longer schedules are not precomputed, the durations of later attempts are computed when needed
+MAX_SCHEDULE_LENGTH: int = 4096
+
+_thread_local: threading.local = threading.local()
+
+def _rng() -> random.Random:
+
+    """Returns the random number generator of the calling thread, so that jittered policies
+       never contend on the lock of the shared module level generator"""
+
+    try:
+        return _thread_local.rng
+    except AttributeError:
+        _thread_local.rng = random.Random()
+        return _thread_local.rng
+
+class BackoffPolicy:
+
+    """Base class of the built-in backoff policies. A policy is a callable taking the attempt
+       number and returning the backoff duration in seconds, clamped to [floor, cap], so it can be
+       passed as backoff_duration_fn without the type annotation checks of plain functions.
+
+       Policies without jitter precompute their schedule when the decorator is applied, the retry
+       loop then looks the backoff duration up instead of calling the policy."""
+
+    jittered: bool = False
+
+    def __init__(self, floor: float = 0.0, cap: float = float('inf')):
+        check_non_negative_number('floor', floor)
+        check_non_negative_number('cap', cap)
+        if cap < floor:
+            raise IncorrectFaultToleranceSpecificationError(f"The parameter cap is beneath the parameter floor (cap={cap}, floor={floor})")
+        self._floor: float = float(floor)
+        self._cap: float = float(cap)
+
+    def _duration(self, attempt: int) -> float:
+        raise NotImplementedError()
+
+    def __call__(self, attempt: int) -> float:
+        return min(self._cap, max(self._floor, self._duration(attempt)))
+
+    def schedule(self, max_no_of_retries: int) -> PT.Optional[array.array]:
+
+        """Returns the backoff durations of attempt 1 to max_no_of_retries, at most MAX_SCHEDULE_LENGTH
+           of them, as an array indexed by attempt - 1, or None for jittered policies that draw a new
+           duration every attempt."""
+
+        if self.jittered:
+            return None
+        return array.array('d', map(self, range(1, min(max_no_of_retries, MAX_SCHEDULE_LENGTH) + 1)))
+
+    def next_duration(self, attempt: int, previous: float) -> float:
+
+        """Returns the backoff duration after attempt, where previous is the backoff duration before
+           attempt in the same call, 0.0 before the first backoff. The retry loops keep previous per
+           call, only policies depending on it override this."""
+
+        return self(attempt)
+
+def _exponential(initial: float, multiplier: float, attempt: int) -> float:
+    try:
+        return initial * multiplier ** (attempt - 1)
+    except OverflowError:
+        return float('inf')
+
+class ConstantBackoff(BackoffPolicy):
+
+    """Backs off duration seconds after every attempt"""
+
+    def __init__(self, duration: float, floor: float = 0.0, cap: float = float('inf')):
+        super().__init__(floor, cap)
+        check_non_negative_number('duration', duration)
+        self._duration_value: float = float(duration)
+
+    def _duration(self, attempt: int) -> float:
+        return self._duration_value
+
+class LinearBackoff(BackoffPolicy):
+
+    """Backs off initial + increment * (attempt - 1) seconds"""
+
+    def __init__(self, initial: float, increment: float, floor: float = 0.0, cap: float = float('inf')):
+        super().__init__(floor, cap)
+        check_non_negative_number('initial', initial)
+        check_non_negative_number('increment', increment)
+        self._initial: float = float(initial)
+        self._increment: float = float(increment)
+
+    def _duration(self, attempt: int) -> float:
+        return self._initial + self._increment * (attempt - 1)
+
+class ExponentialBackoff(BackoffPolicy):
+
+    """Backs off initial * multiplier ** (attempt - 1) seconds"""
+
+    def __init__(self, initial: float, multiplier: float = 2.0, floor: float = 0.0, cap: float = float('inf')):
+        super().__init__(floor, cap)
+        check_positive_number('initial', initial)
+        check_positive_number('multiplier', multiplier)
+        self._initial: float = float(initial)
+        self._multiplier: float = float(multiplier)
+
+    def _duration(self, attempt: int) -> float:
+        return _exponential(self._initial, self._multiplier, attempt)
+
+class FibonacciBackoff(BackoffPolicy):
+
+    """Backs off unit * fib(attempt) seconds, i.e. unit, unit, 2 * unit, 3 * unit, 5 * unit and so on"""
+
+    def __init__(self, unit: float, floor: float = 0.0, cap: float = float('inf')):
+        super().__init__(floor, cap)
+        check_positive_number('unit', unit)
+        self._unit: float = float(unit)
+
+    def _duration(self, attempt: int) -> float:
+        previous, current = 0, 1
+        for _ in range(attempt - 1):
+            previous, current = current, previous + current
+            if current * self._unit >= self._cap:
+                break
+        return current * self._unit
+
+class FullJitterBackoff(BackoffPolicy):
+
+    """Backs off a uniformly drawn duration between zero and the exponential backoff
+       initial * multiplier ** (attempt - 1), which spreads the retries of many clients over time"""
+
+    jittered: bool = True
+
+    def __init__(self, initial: float, multiplier: float = 2.0, floor: float = 0.0, cap: float = float('inf')):
+        super().__init__(floor, cap)
+        check_positive_number('initial', initial)
+        check_positive_number('multiplier', multiplier)
+        self._initial: float = float(initial)
+        self._multiplier: float = float(multiplier)
+
+    def _duration(self, attempt: int) -> float:
+        return _rng().uniform(0.0, min(self._cap, _exponential(self._initial, self._multiplier, attempt)))
+
+class DecorrelatedJitterBackoff(BackoffPolicy):
+
+    """Backs off a uniformly drawn duration between initial and three times the previous backoff
+       duration of the call, restarting at attempt 1. Called with the attempt number alone, as
+       backoff_duration_fn of another strategy, it has no previous duration and draws up to three
+       times initial."""
+
+    jittered: bool = True
+
+    def __init__(self, initial: float, floor: float = 0.0, cap: float = float('inf')):
+        super().__init__(floor, cap)
+        check_positive_number('initial', initial)
+        self._initial: float = float(initial)
+
+    def _duration(self, attempt: int) -> float:
+        return _rng().uniform(self._initial, self._initial * 3)
+
+    def next_duration(self, attempt: int, previous: float) -> float:
+        if attempt <= 1 or previous <= 0.0:
+            previous = self._initial
+        return min(self._cap, max(self._floor, _rng().uniform(self._initial, previous * 3)))
+
+def retry_after_hint(exc: BaseException) -> PT.Optional[float]:
+
+    """Returns the retry hint an exception carries in seconds, its retry_after attribute or the
+       Retry-After header in seconds of its headers or the headers of its response, or None"""
+
+    hint: PT.Any = getattr(exc, 'retry_after', None)
+    if hint is None:
+        headers: PT.Any = getattr(exc, 'headers', None)
+        if headers is None:
+            headers = getattr(getattr(exc, 'response', None), 'headers', None)
+        getter: PT.Callable = getattr(headers, 'get', None)
+        hint = getter('Retry-After') if getter is not None else None
+    if hint is None:
+        return None
+    if hasattr(hint, 'total_seconds'):
+        hint = hint.total_seconds()
+    try:
+        hint = float(hint)
+    except (TypeError, ValueError):
+        return None
+    return hint if 0.0 <= hint < float('inf') else None
+
+class AdaptiveBackoff(BackoffPolicy):
+
+    """Backs off as long as the failure at hand is likely to last instead of following a fixed curve.
+
+       The retry hint of the exception, extracted by hint_fn, is the least the policy backs off.
+       In addition the time from the first failure of a call to its recovery is tracked per
+       decorated function as an exponentially weighted moving average, with the weight smoothing
+       of the latest recovery, and the policy backs off until the expected recovery. Once a call
+       has failed for longer than expected, or without any recovery observed yet, the policy
+       falls back to fallback, by default ExponentialBackoff(0.1)."""
+
+    # the duration depends on the exception and the recoveries observed, it is never precomputed
+    jittered: bool = True
+
+    def __init__(self, 
+                 fallback: PT.Callable[[int], float] = None, 
+                 hint_fn: PT.Callable[[BaseException], PT.Optional[float]] = retry_after_hint, 
+                 smoothing: float = 0.3, 
+                 floor: float = 0.0, 
+                 cap: float = float('inf')):
+        super().__init__(floor, cap)
+        if fallback is not None and not isinstance(fallback, PT.Callable):
+            raise IncorrectFaultToleranceSpecificationError(f"The parameter fallback is incorrect, expected a function taking an int returning a float, but got '{fallback}'")
+        if not isinstance(hint_fn, PT.Callable):
+            raise IncorrectFaultToleranceSpecificationError(f"The parameter hint_fn is incorrect, expected a function taking an exception returning a float or None, but got '{hint_fn}'")
+        check_positive_number('smoothing', smoothing)
+        if smoothing > 1:
+            raise IncorrectFaultToleranceSpecificationError(f"The parameter smoothing is above one (smoothing={smoothing})")
+        self._fallback: PT.Callable[[int], float] = fallback if fallback is not None else ExponentialBackoff(0.1)
+        self._hint_fn: PT.Callable[[BaseException], PT.Optional[float]] = hint_fn
+        self._smoothing: float = float(smoothing)
+        self._recoveries: PT.Dict[str, float] = {}
+        self._lock: threading.Lock = threading.Lock()
+
+    def _duration(self, attempt: int) -> float:
+        return self._fallback(attempt)
+
+    def recovery_estimate(self, name: str) -> PT.Optional[float]:
+
+        """The expected time from the first failure to the recovery of the decorated function name, None before any recovery"""
+
+        return self._recoveries.get(name)
+
+    def record_recovery(self, name: str, failing_for: float, recovered_after: float) -> None:
+
+        """Folds the recovery of a call of name into its estimate. The call still failed failing_for
+           seconds after its first failure and succeeded recovered_after seconds after it, the
+           dependency is taken to have recovered halfway in between. Recording the time of the
+           success instead would confirm any estimate too long, the calls back off until it expires."""
+
+        duration: float = (failing_for + recovered_after) / 2
+        with self._lock:
+            estimate: float = self._recoveries.get(name)
+            self._recoveries[name] = duration if estimate is None else estimate + self._smoothing * (duration - estimate)
+
+    def duration_after(self, name: str, attempt: int, exc: BaseException, elapsed: float) -> float:
+
+        """The backoff duration after attempt failed with exc, elapsed seconds after the first failure of the call"""
+
+        hint: PT.Optional[float] = self._hint_fn(exc) if exc is not None else None
+        estimate: PT.Optional[float] = self._recoveries.get(name)
+        remaining: float = estimate - elapsed if estimate is not None else 0.0
+        if remaining > 0.0 or hint is not None:
+            duration: float = max(remaining, hint if hint is not None else 0.0)
+        else:
+            duration = self._fallback(attempt)
+        return min(self._cap, max(self._floor, duration))
@@ -0,0 +1,148 @@
+#MIT License
+#
+#Copyright (c) 2022 I-and-D-Got-Accelerators
+#
+#Permission is hereby granted, free of charge, to any person obtaining a copy
+#of this software and associated documentation files (the "Software"), to deal
+#in the Software without restriction, including without limitation the rights
+#to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#copies of the Software, and to permit persons to whom the Software is
+#furnished to do so, subject to the following conditions:
+#
+#The above copyright notice and this permission notice shall be included in all
+#copies or substantial portions of the Software.
+#
+#THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#SOFTWARE.
+
+import collections
+import threading
+import typing as PT
+from fault_tolerance.Exceptions import CircuitOpenError
+from fault_tolerance.clock import Clock, check_clock
+from fault_tolerance.checks import check_positive_int, check_positive_number
+
+CLOSED: str = 'closed'
+OPEN: str = 'open'
+HALF_OPEN: str = 'half_open'
+
+class CircuitBreaker:
+
+    """State machine of a circuit breaker with the states closed, open and half-open.
+
+       While closed, calls pass and failures are counted over a sliding window of window_duration
+       seconds. When failure_threshold failures are within the window the breaker opens, and calls
+       fail fast with CircuitOpenError. After recovery_timeout seconds the breaker is half-open and
+       lets at most half_open_max_calls probe calls through at a time. A successful probe closes
+       the breaker, a failed probe opens it again.
+
+       A breaker can be shared by several decorated functions calling the same dependency. The
+       window and the recovery timeout are measured on clock, the system clock by default."""
+
+    def __init__(self, 
+                 failure_threshold: int = 5, 
+                 window_duration: float = 60.0, 
+                 recovery_timeout: float = 30.0, 
+                 half_open_max_calls: int = 1,
+                 clock: Clock = None):
+
+        check_positive_int('failure_threshold', failure_threshold)
+        check_positive_number('window_duration', window_duration)
+        check_positive_number('recovery_timeout', recovery_timeout)
+        check_positive_int('half_open_max_calls', half_open_max_calls)
+        self._clock: Clock = check_clock(clock)
+
+        self._failure_threshold: int = failure_threshold
+        self._window_duration: float = window_duration
+        self._recovery_timeout: float = recovery_timeout
+        self._half_open_max_calls: int = half_open_max_calls
+
+        self._state: str = CLOSED
+        self._failures: PT.Deque[float] = collections.deque()
+        self._opened_at: float = 0.0
+        self._probes: int = 0
+        self._lock: threading.Lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """The current state, one of CLOSED, OPEN or HALF_OPEN"""
+        if self._state == OPEN and self._clock.monotonic() - self._opened_at >= self._recovery_timeout:
+            return HALF_OPEN
+        return self._state
+
+    def before_call(self) -> bool:
+
+        """Admits a call or raises CircuitOpenError. Returns True if the admitted call is a
+           half-open probe, which must be reported back with the probe flag set."""
+
+        # the closed state is the common case and is checked without taking the lock
+        if self._state == CLOSED:
+            return False
+
+        with self._lock:
+            if self._state == CLOSED:
+                return False
+            if self._state == OPEN:
+                remaining: float = self._recovery_timeout - (self._clock.monotonic() - self._opened_at)
+                if remaining > 0:
+                    raise CircuitOpenError(f"Circuit breaker is open, failing fast for another {remaining:.3f} seconds")
+                self._state = HALF_OPEN
+                self._probes = 0
+            if self._probes >= self._half_open_max_calls:
+                raise CircuitOpenError(f"Circuit breaker is half-open and all {self._half_open_max_calls} probe calls are in flight")
+            self._probes += 1
+            return True
+
+    def record_success(self, probe: bool) -> None:
+
+        """Reports a successful call, a successful probe closes the breaker"""
+
+        if not probe:
+            return
+        with self._lock:
+            self._probes -= 1
+            if self._state == HALF_OPEN:
+                self._state = CLOSED
+                self._failures.clear()
+
+    def record_failure(self, probe: bool) -> None:
+
+        """Reports a failed call, opening the breaker if the threshold is reached or if a probe failed"""
+
+        now: float = self._clock.monotonic()
+        with self._lock:
+            if probe:
+                self._probes -= 1
+                if self._state == HALF_OPEN:
+                    self._open(now)
+                return
+            if self._state != CLOSED:
+                return
+            self._failures.append(now)
+            while self._failures and now - self._failures[0] > self._window_duration:
+                self._failures.popleft()
+            if len(self._failures) >= self._failure_threshold:
+                self._open(now)
+
+    def record_ignored(self, probe: bool) -> None:
+
+        """Reports a call that failed with an exception not counted as a failure, releasing the probe slot"""
+
+        if not probe:
+            return
+        with self._lock:
+            self._probes -= 1
+
+    def _open(self, now: float) -> None:
+        self._state = OPEN
+        self._opened_at = now
+        self._failures.clear()
+
+    def __repr__(self) -> str:
+        return (f"CircuitBreaker(failure_threshold={self._failure_threshold}, window_duration={self._window_duration}, "
+                f"recovery_timeout={self._recovery_timeout}, half_open_max_calls={self._half_open_max_calls}, state={self.state})")
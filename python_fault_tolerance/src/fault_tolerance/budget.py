@@ -0,0 +1,80 @@
+#MIT License
+#
+#Copyright (c) 2022 I-and-D-Got-Accelerators
+#
+#Permission is hereby granted, free of charge, to any person obtaining a copy
+#of this software and associated documentation files (the "Software"), to deal
+#in the Software without restriction, including without limitation the rights
+#to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#copies of the Software, and to permit persons to whom the Software is
+#furnished to do so, subject to the following conditions:
+#
+#The above copyright notice and this permission notice shall be included in all
+#copies or substantial portions of the Software.
+#
+#THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#SOFTWARE.
+
+import threading
+import typing as PT
+from fault_tolerance.Exceptions import IncorrectFaultToleranceSpecificationError
+
+class RetryBudget:
+
+    """Token bucket limiting the number of retries across all functions sharing the budget.
+
+       Every retry withdraws one token, every successful call deposits token_ratio tokens, and
+       retries are only allowed while at least one token is available. In steady state the
+       number of retries is thereby bounded to token_ratio times the number of successful calls,
+       plus a burst of max_tokens retries. When a dependency browns out, the successes dry up,
+       the bucket drains and the decorated functions stop multiplying the load with retries."""
+
+    def __init__(self, max_tokens: float = 10.0, token_ratio: float = 0.1):
+
+        # check max_tokens
+        if isinstance(max_tokens, bool) or not isinstance(max_tokens, (int, float)) or max_tokens < 1:
+            raise IncorrectFaultToleranceSpecificationError(f"The parameter max_tokens is not a number, but a {type(max_tokens)}"
+                                                            f" or the value is beneath one (max_tokens={max_tokens})")
+
+        # check token_ratio
+        if isinstance(token_ratio, bool) or not isinstance(token_ratio, (int, float)) or token_ratio <= 0:
+            raise IncorrectFaultToleranceSpecificationError(f"The parameter token_ratio is not a number, but a {type(token_ratio)}"
+                                                            f" or the value is not above zero (token_ratio={token_ratio})")
+
+        self._max_tokens: float = float(max_tokens)
+        self._token_ratio: float = float(token_ratio)
+        self._tokens: float = float(max_tokens)
+        self._lock: threading.Lock = threading.Lock()
+
+    @property
+    def tokens(self) -> float:
+        """The number of tokens currently available"""
+        return self._tokens
+
+    def record_success(self) -> None:
+
+        """Deposits token_ratio tokens for a successful call. When the bucket is full, which is
+           the normal state of a healthy dependency, this returns without taking the lock."""
+
+        if self._tokens >= self._max_tokens:
+            return
+        with self._lock:
+            self._tokens = min(self._max_tokens, self._tokens + self._token_ratio)
+
+    def try_acquire_retry(self) -> bool:
+
+        """Withdraws a token for a retry, returns False if the budget is exhausted"""
+
+        with self._lock:
+            if self._tokens < 1.0:
+                return False
+            self._tokens -= 1.0
+            return True
+
+    def __repr__(self) -> str:
+        return f"RetryBudget(max_tokens={self._max_tokens}, token_ratio={self._token_ratio}, tokens={self._tokens})"
@@ -0,0 +1,298 @@
+#MIT License
+#
+#Copyright (c) 2022 I-and-D-Got-Accelerators
+#
+#Permission is hereby granted, free of charge, to any person obtaining a copy
+#of this software and associated documentation files (the "Software"), to deal
+#in the Software without restriction, including without limitation the rights
+#to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#copies of the Software, and to permit persons to whom the Software is
+#furnished to do so, subject to the following conditions:
+#
+#The above copyright notice and this permission notice shall be included in all
+#copies or substantial portions of the Software.
+#
+#THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#SOFTWARE.
+
+import collections
+import threading
+import time
+import typing as PT
+from fault_tolerance.checks import check_positive_int, check_positive_number
+from fault_tolerance.lazy import lazy_import
+
+asyncio = lazy_import('asyncio', globals())
+hashlib = lazy_import('hashlib', globals())
+pickle = lazy_import('pickle', globals())
+
+_MISSING: object = object()
+
+class ResultCache:
+
+    """Base class of the result caches of forward_err_recovery_by_retry. get returns the cached
+       value of a key, or MISSING if there is none or it expired, set stores a value. A cache that
+       outlives the process or is shared with other processes, e.g. on disk, is persistent, its
+       results are only told apart by a cache_namespace given with the cache."""
+
+    MISSING: object = _MISSING
+    persistent: bool = False
+
+    def get(self, key: PT.Hashable) -> PT.Any:
+        raise NotImplementedError()
+
+    def set(self, key: PT.Hashable, value: PT.Any) -> None:
+        raise NotImplementedError()
+
+    def clear(self) -> None:
+        raise NotImplementedError()
+
+class InMemoryResultCache(ResultCache):
+
+    """Keeps at most max_entries results in memory, evicting the least recently used one, and
+       forgets results older than ttl seconds if ttl is given"""
+
+    def __init__(self, max_entries: int = 1024, ttl: float = None):
+        check_positive_int('max_entries', max_entries)
+        if ttl is not None:
+            check_positive_number('ttl', ttl)
+        self._max_entries: int = max_entries
+        self._ttl: float = ttl
+        self._entries: PT.OrderedDict[PT.Hashable, PT.Tuple[float, PT.Any]] = collections.OrderedDict()
+        self._lock: threading.Lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: PT.Hashable) -> PT.Any:
+        with self._lock:
+            entry: PT.Tuple[float, PT.Any] = self._entries.get(key)
+            if entry is None:
+                return _MISSING
+            if self._ttl is not None and entry[0] <= time.monotonic():
+                del self._entries[key]
+                return _MISSING
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: PT.Hashable, value: PT.Any) -> None:
+        expires_at: float = time.monotonic() + self._ttl if self._ttl is not None else 0.0
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+# the pickle protocol of keys without an encoding of their own, fixed so that the key of a result
+# does not change with the default protocol of the Python version
+_KEY_PICKLE_PROTOCOL: int = 4
+
+def _encode_key(key: PT.Hashable, out: PT.List[bytes]) -> None:
+    # appends an encoding of key to out that only depends on its value, not on the Python version or
+    # the hash seed of the process, the types of the arguments of calls are encoded themselves
+    if key is None or isinstance(key, bool):
+        out.append(b'N' if key is None else b'T' if key else b'F')
+    elif type(key) is int:
+        out.append(b'i%d;' % key)
+    elif type(key) is float:
+        out.append(b'f' + key.hex().encode('ascii') + b';')
+    elif type(key) is str:
+        data: bytes = key.encode('utf-8', 'surrogatepass')
+        out.append(b's%d:' % len(data) + data)
+    elif type(key) is bytes:
+        out.append(b'b%d:' % len(key) + key)
+    elif type(key) is tuple:
+        out.append(b'(')
+        for item in key:
+            _encode_key(item, out)
+        out.append(b')')
+    elif type(key) is frozenset:
+        # the iteration order of a set depends on the hash seed, its items are sorted by their encoding
+        items: PT.List[bytes] = []
+        for item in key:
+            encoded: PT.List[bytes] = []
+            _encode_key(item, encoded)
+            items.append(b''.join(encoded))
+        out.append(b'{' + b''.join(sorted(items)) + b'}')
+    else:
+        data = pickle.dumps(key, protocol=_KEY_PICKLE_PROTOCOL)
+        out.append(b'p%d:' % len(data) + data)
+
+def stable_key_digest(key: PT.Hashable) -> bytes:
+
+    """Returns the SHA-256 digest of an encoding of key that is the same in every process and Python
+       version for keys of None, bools, ints, floats, strings, bytes, tuples and frozensets of them.
+       Other objects are encoded by pickling them with a fixed protocol."""
+
+    out: PT.List[bytes] = []
+    _encode_key(key, out)
+    return hashlib.sha256(b''.join(out)).digest()
+
+class SQLiteResultCache(ResultCache):
+
+    """Keeps at most max_entries pickled results in a local SQLite database file, evicting the least
+       recently used ones, and forgets results older than ttl seconds if ttl is given. The results
+       survive restarts and are shared by the processes using the same file. Values must be
+       picklable, keys are stored as their stable_key_digest, so that they are found again by other
+       Python versions.
+
+       Reads do not write to the file, the use of the results read is recorded in memory and written
+       with the next set, or once touch_batch_size results were read, and on close."""
+
+    persistent: bool = True
+
+    def __init__(self, path: str, max_entries: int = 100000, ttl: float = None, touch_batch_size: int = 1024):
+        # sqlite3 is only imported when a SQLite cache is actually used
+        import sqlite3
+
+        check_positive_int('max_entries', max_entries)
+        if ttl is not None:
+            check_positive_number('ttl', ttl)
+        check_positive_int('touch_batch_size', touch_batch_size)
+        self._max_entries: int = max_entries
+        self._ttl: float = ttl
+        self._touch_batch_size: int = touch_batch_size
+        # the time of the last read of the keys read since the last write
+        self._touched: PT.Dict[bytes, float] = {}
+        self._lock: threading.Lock = threading.Lock()
+        self._connection = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None, timeout=30.0)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("CREATE TABLE IF NOT EXISTS results (key BLOB PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL, used_at REAL NOT NULL)")
+        self._connection.execute("CREATE INDEX IF NOT EXISTS results_used_at ON results (used_at)")
+
+    def get(self, key: PT.Hashable) -> PT.Any:
+        digest: bytes = stable_key_digest(key)
+        now: float = time.time()
+        with self._lock:
+            row = self._connection.execute("SELECT value, expires_at FROM results WHERE key = ?", (digest,)).fetchone()
+            if row is None:
+                return _MISSING
+            if self._ttl is not None and row[1] <= now:
+                self._connection.execute("DELETE FROM results WHERE key = ?", (digest,))
+                return _MISSING
+            self._touched[digest] = now
+            if len(self._touched) >= self._touch_batch_size:
+                self._write_touched()
+        return pickle.loads(row[0])
+
+    def _write_touched(self) -> None:
+        # writes the use of the results read since the last write, in a single transaction
+        if self._touched:
+            self._connection.execute("BEGIN")
+            try:
+                self._connection.executemany("UPDATE results SET used_at = max(used_at, ?) WHERE key = ?", 
+                                             [(used_at, digest) for digest, used_at in self._touched.items()])
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+            self._connection.execute("COMMIT")
+            self._touched.clear()
+
+    def set(self, key: PT.Hashable, value: PT.Any) -> None:
+        now: float = time.time()
+        expires_at: float = now + self._ttl if self._ttl is not None else 0.0
+        with self._lock:
+            self._write_touched()
+            self._connection.execute("INSERT OR REPLACE INTO results (key, value, expires_at, used_at) VALUES (?, ?, ?, ?)", 
+                                     (stable_key_digest(key), pickle.dumps(value), expires_at, now))
+            self._connection.execute("DELETE FROM results WHERE key IN (SELECT key FROM results ORDER BY used_at DESC LIMIT -1 OFFSET ?)", 
+                                     (self._max_entries,))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._touched.clear()
+            self._connection.execute("DELETE FROM results")
+
+    def close(self) -> None:
+        with self._lock:
+            try:
+                self._write_touched()
+            finally:
+                self._connection.close()
+
+class _Flight:
+
+    """A call in flight, awaited by the duplicate calls with the same key"""
+
+    __slots__ = ('done', 'result', 'exc')
+
+    def __init__(self):
+        self.done: threading.Event = threading.Event()
+        self.result: PT.Any = None
+        self.exc: BaseException = None
+
+class SingleFlight:
+
+    """Collapses concurrent calls with the same key into one execution, the duplicate calls wait
+       for the result, or the exception, of the call in flight"""
+
+    def __init__(self):
+        self._flights: PT.Dict[PT.Hashable, _Flight] = {}
+        self._async_flights: PT.Dict[PT.Hashable, asyncio.Future] = {}
+        self._lock: threading.Lock = threading.Lock()
+
+    def do(self, key: PT.Hashable, fn: PT.Callable[[], PT.Any]) -> PT.Any:
+        with self._lock:
+            flight: _Flight = self._flights.get(key)
+            leader: bool = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+        if not leader:
+            flight.done.wait()
+            if flight.exc is not None:
+                raise flight.exc
+            return flight.result
+        try:
+            flight.result = fn()
+            return flight.result
+        except BaseException as e:
+            flight.exc = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    async def do_async(self, key: PT.Hashable, coro_fn: PT.Callable[[], PT.Awaitable]) -> PT.Any:
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        flight: asyncio.Future = self._async_flights.get(key)
+        # flights are only shared between coroutines of the same event loop, and a duplicate call
+        # whose flight got cancelled takes off itself
+        while flight is not None and flight.get_loop() is loop:
+            try:
+                return await asyncio.shield(flight)
+            except asyncio.CancelledError:
+                if not flight.cancelled():
+                    raise
+            flight = self._async_flights.get(key)
+        flight = self._async_flights[key] = loop.create_future()
+        try:
+            result = await coro_fn()
+            flight.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            flight.cancel()
+            raise
+        except BaseException as e:
+            flight.set_exception(e)
+            # marks the exception as retrieved, so that a flight without duplicate calls does not log it
+            flight.exception()
+            raise
+        finally:
+            if self._async_flights.get(key) is flight:
+                del self._async_flights[key]
+
+def default_cache_key(*args, **kwargs) -> PT.Hashable:
+
+    """The cache key of a call by default, its positional and keyword arguments, which must be hashable"""
+
+    return (args, tuple(sorted(kwargs.items()))) if kwargs else args
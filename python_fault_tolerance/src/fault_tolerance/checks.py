@@ -0,0 +1,51 @@
+#MIT License
+#
+#Copyright (c) 2022 I-and-D-Got-Accelerators
+#
+#Permission is hereby granted, free of charge, to any person obtaining a copy
+#of this software and associated documentation files (the "Software"), to deal
+#in the Software without restriction, including without limitation the rights
+#to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#copies of the Software, and to permit persons to whom the Software is
+#furnished to do so, subject to the following conditions:
+#
+#The above copyright notice and this permission notice shall be included in all
+#copies or substantial portions of the Software.
+#
+#THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#SOFTWARE.
+
+import typing as PT
+from fault_tolerance.Exceptions import IncorrectFaultToleranceSpecificationError
+
+def _is_number(value: PT.Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+def check_positive_number(name: str, value: PT.Any) -> None:
+
+    """Raises IncorrectFaultToleranceSpecificationError if value is not a positive int or float"""
+
+    if not _is_number(value) or value <= 0:
+        raise IncorrectFaultToleranceSpecificationError(f"The parameter {name} is not a number, but a {type(value)}"
+                                                        f" or the value is not above zero ({name}={value})")
+
+def check_non_negative_number(name: str, value: PT.Any) -> None:
+
+    """Raises IncorrectFaultToleranceSpecificationError if value is not an int or float of at least zero"""
+
+    if not _is_number(value) or value < 0:
+        raise IncorrectFaultToleranceSpecificationError(f"The parameter {name} is not a number, but a {type(value)}"
+                                                        f" or the value is beneath zero ({name}={value})")
+
+def check_positive_int(name: str, value: PT.Any) -> None:
+
+    """Raises IncorrectFaultToleranceSpecificationError if value is not an int of at least one"""
+
+    if not isinstance(value, int) or isinstance(value, bool) or value < 1:
+        raise IncorrectFaultToleranceSpecificationError(f"The parameter {name} is not an int, but a {type(value)}"
+                                                        f" or the value is beneath one ({name}={value})")
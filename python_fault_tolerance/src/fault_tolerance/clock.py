@@ -0,0 +1,179 @@
+#MIT License
+#
+#Copyright (c) 2022 I-and-D-Got-Accelerators
+#
+#Permission is hereby granted, free of charge, to any person obtaining a copy
+#of this software and associated documentation files (the "Software"), to deal
+#in the Software without restriction, including without limitation the rights
+#to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#copies of the Software, and to permit persons to whom the Software is
+#furnished to do so, subject to the following conditions:
+#
+#The above copyright notice and this permission notice shall be included in all
+#copies or substantial portions of the Software.
+#
+#THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#SOFTWARE.
+
+import threading
+import time
+import typing as PT
+from fault_tolerance.Exceptions import IncorrectFaultToleranceSpecificationError
+from fault_tolerance.checks import check_non_negative_number
+from fault_tolerance.lazy import lazy_import
+
+# asyncio and selectors are only needed to run coroutines on a virtual clock
+asyncio = lazy_import('asyncio', globals())
+selectors = lazy_import('selectors', globals())
+
+class Clock:
+
+    """Source of the time and the sleeps of the recovery strategies. Deadlines, backoffs, breaker
+       windows and recovery timeouts are measured with monotonic and waited for with sleep, or with
+       sleep_async in coroutine functions, so that a VirtualClock can replace the time in tests."""
+
+    def monotonic(self) -> float:
+        """The current time in seconds, which never goes backwards"""
+        raise NotImplementedError
+
+    def sleep(self, seconds: float) -> None:
+        """Blocks the calling thread for seconds"""
+        raise NotImplementedError
+
+    def sleep_async(self, seconds: float) -> PT.Awaitable[None]:
+        """Returns an awaitable suspending the calling task for seconds"""
+        raise NotImplementedError
+
+class SystemClock(Clock):
+
+    """The real time of the host, the clock used unless another one is given"""
+
+    monotonic = staticmethod(time.monotonic)
+    sleep = staticmethod(time.sleep)
+
+    def sleep_async(self, seconds: float) -> PT.Awaitable[None]:
+        return asyncio.sleep(seconds)
+
+    def __repr__(self) -> str:
+        return "SystemClock()"
+
+SYSTEM_CLOCK: SystemClock = SystemClock()
+
+class _VirtualTimeSelector:
+
+    """Wraps the selector of an event loop, instead of blocking until the next timer is due it
+       polls for ready I/O and advances the virtual clock to the timer"""
+
+    def __init__(self, selector: 'selectors.BaseSelector', clock: 'VirtualClock'):
+        self._selector: 'selectors.BaseSelector' = selector
+        self._clock: VirtualClock = clock
+
+    def select(self, timeout: float = None) -> PT.List[PT.Tuple['selectors.SelectorKey', int]]:
+        events = self._selector.select(0)
+        if events or timeout is not None and timeout <= 0:
+            return events
+        if timeout is None:
+            # no timer is pending, only I/O or a callback from another thread can wake the loop up
+            return self._selector.select(None)
+        self._clock.advance(timeout)
+        return []
+
+    def __getattr__(self, attr: str) -> PT.Any:
+        return getattr(self._selector, attr)
+
+_virtual_time_event_loop_class: type = None
+
+def _virtual_time_event_loop(clock: 'VirtualClock') -> 'asyncio.AbstractEventLoop':
+
+    """Creates an event loop running on the time of clock, the loop class is only defined once
+       asyncio is imported"""
+
+    global _virtual_time_event_loop_class
+    if _virtual_time_event_loop_class is None:
+
+        class VirtualTimeEventLoop(asyncio.SelectorEventLoop):
+
+            def __init__(self, clock: VirtualClock):
+                super().__init__(_VirtualTimeSelector(selectors.DefaultSelector(), clock))
+                self.virtual_clock: VirtualClock = clock
+
+            def time(self) -> float:
+                return self.virtual_clock.monotonic()
+
+        _virtual_time_event_loop_class = VirtualTimeEventLoop
+    return _virtual_time_event_loop_class(clock)
+
+class VirtualClock(Clock):
+
+    """A clock whose time only advances when it is slept on, so that hours of backoff are tested
+       in milliseconds and every run with the same inputs gives the same result.
+
+       A blocking sleep advances the time at once. Coroutines are run on the virtual time with run,
+       on an event loop that, whenever all tasks wait, advances the time to the next timer instead
+       of waiting for it, so that concurrent tasks sleeping on the clock wake up in the order of
+       their virtual deadlines. Work done on other threads, e.g. the timeouts of attempts of plain
+       functions, still takes real time."""
+
+    def __init__(self, start: float = 0.0):
+
+        check_non_negative_number('start', start)
+
+        self._now: float = float(start)
+        self._lock: threading.Lock = threading.Lock()
+
+    def monotonic(self) -> float:
+        return self._now
+
+    def advance(self, seconds: float) -> None:
+
+        """Moves the time forward by seconds"""
+
+        if seconds < 0:
+            raise ValueError(f"A virtual clock cannot go backwards (seconds={seconds})")
+        with self._lock:
+            self._now += seconds
+
+    def sleep(self, seconds: float) -> None:
+        if seconds > 0:
+            self.advance(seconds)
+
+    async def sleep_async(self, seconds: float) -> None:
+        # sleeping on a loop that is not running on this clock would take real time
+        if getattr(asyncio.get_running_loop(), 'virtual_clock', None) is not self:
+            raise RuntimeError("A virtual clock can only be slept on asynchronously in a coroutine run with VirtualClock.run")
+        await asyncio.sleep(seconds)
+
+    def run(self, main: PT.Awaitable) -> PT.Any:
+
+        """Runs the coroutine main on an event loop running on the time of this clock, like
+           asyncio.run, and returns its result"""
+
+        loop = _virtual_time_event_loop(self)
+        try:
+            asyncio.set_event_loop(loop)
+            return loop.run_until_complete(main)
+        finally:
+            try:
+                loop.run_until_complete(loop.shutdown_asyncgens())
+            finally:
+                asyncio.set_event_loop(None)
+                loop.close()
+
+    def __repr__(self) -> str:
+        return f"VirtualClock(now={self._now})"
+
+def check_clock(clock: PT.Any) -> Clock:
+
+    """Returns clock, or the system clock if it is None, raises IncorrectFaultToleranceSpecificationError
+       if it is not a Clock"""
+
+    if clock is None:
+        return SYSTEM_CLOCK
+    if not isinstance(clock, Clock):
+        raise IncorrectFaultToleranceSpecificationError(f"The parameter clock is incorrect, expected a Clock, but got '{clock}'")
+    return clock
@@ -20,11 +20,45 @@
 #OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 #SOFTWARE.
 
+import array
+import collections
 import functools
-import inspect
+import itertools
+import threading
 import time
+import types
 import typing as PT
-from fault_tolerance.Exceptions import IncorrectFaultToleranceSpecificationError, FailedToRecoverError
+import weakref
+from fault_tolerance.Exceptions import (IncorrectFaultToleranceSpecificationError, FailedToRecoverError, RetryBudgetExhaustedError, 
+                                        CircuitOpenError, AttemptTimeoutError, DeadlineExceededError, BatchFailedToRecoverError)
+from fault_tolerance.backoff import BackoffPolicy, AdaptiveBackoff
+from fault_tolerance.breaker import CircuitBreaker
+from fault_tolerance.clock import Clock, check_clock
+from fault_tolerance.checks import check_positive_number, check_non_negative_number, check_positive_int
+from fault_tolerance.limiter import Bulkhead
+from fault_tolerance.metrics import RetryHooks, LatencyTracker, combine_hooks
+from fault_tolerance.budget import RetryBudget
+from fault_tolerance.cache import ResultCache, SingleFlight, default_cache_key
+from fault_tolerance.resources import ResourcePool
+from fault_tolerance.lazy import lazy_import
+from fault_tolerance.tracing import TRACE_RING
+
+# asyncio, concurrent.futures and inspect take longer to import than the whole package, they are
+# only imported once a coroutine function, a timeout, a hedge or a custom backoff function needs them
+asyncio = lazy_import('asyncio', globals())
+concurrent = lazy_import('concurrent.futures', globals())
+inspect = lazy_import('inspect', globals())
+
+# the code flags of generator, coroutine and async generator functions, as defined by inspect
+_CO_VARKEYWORDS: int = 0x08
+_CO_GENERATOR: int = 0x20
+_CO_COROUTINE: int = 0x80
+_CO_ASYNC_GENERATOR: int = 0x200
+
+# the exception tuples and backoff functions validated before, identical specifications are only validated once
+_MAX_VALIDATED_EXC_TPLS: int = 1024
+_validated_exc_tpls: PT.Set[PT.Tuple[type, ...]] = set()
+_validated_backoff_duration_fns: weakref.WeakSet = weakref.WeakSet()
 
 def _is_subclass(obj: PT.Any, cls: type) -> bool:
 
@@ -35,59 +69,1565 @@ def _is_subclass(obj: PT.Any, cls: type) -> bool:
     except TypeError:
         return False
 
-def forward_err_recovery_by_retry(max_no_of_retries: int = 1, 
-                                  exc_lst: PT.List[Exception] = [], 
-                                  backoff_duration_fn: PT.Callable[[int], float] = None) -> PT.Callable:
+def _code_flags(fx: PT.Any) -> int:
+
+    """Returns the code flags of a function, of the function of a method or of the function of a
+       partial, like inspect does, or None if fx has no code object of its own"""
+
+    while True:
+        if isinstance(fx, functools.partial):
+            fx = fx.func
+        elif isinstance(fx, types.MethodType):
+            fx = fx.__func__
+        else:
+            break
+    code: types.CodeType = getattr(fx, '__code__', None)
+    # functions marked by inspect.markcoroutinefunction are left to inspect
+    if not isinstance(code, types.CodeType) or hasattr(fx, '_is_coroutine_marker'):
+        return None
+    return code.co_flags
+
+def _is_coroutine_function(fx: PT.Any) -> bool:
+
+    """inspect.iscoroutinefunction, without importing inspect for plain functions"""
+
+    flags: int = _code_flags(fx)
+    return bool(flags & _CO_COROUTINE) if flags is not None else inspect.iscoroutinefunction(fx)
+
+def _is_generator_function(fx: PT.Any) -> bool:
+
+    """inspect.isgeneratorfunction, without importing inspect for plain functions"""
+
+    flags: int = _code_flags(fx)
+    return bool(flags & _CO_GENERATOR) if flags is not None else inspect.isgeneratorfunction(fx)
+
+def _is_async_generator_function(fx: PT.Any) -> bool:
+
+    """inspect.isasyncgenfunction, without importing inspect for plain functions"""
+
+    flags: int = _code_flags(fx)
+    return bool(flags & _CO_ASYNC_GENERATOR) if flags is not None else inspect.isasyncgenfunction(fx)
+
+def _cancelled() -> PT.Tuple[type, ...]:
+
+    """The exceptions of a cancelled coroutine, which the asynchronous wrappers re-raise before matching
+       exc_lst: cancellation is never a fault to recover from, and CancelledError is an Exception
+       before Python 3.8, so exc_lst=[Exception] would catch it. A function rather than a constant,
+       so that asyncio is only imported once an exception is raised in a coroutine."""
+
+    return (asyncio.CancelledError,)
+
+def _check_exc_lst(exc_lst: PT.Any) -> None:
+
+    """Raises IncorrectFaultToleranceSpecificationError if exc_lst is not a non-empty list of exceptions"""
+
+    # a list of the same exceptions as one validated before is correct
+    if isinstance(exc_lst, list):
+        try:
+            if tuple(exc_lst) in _validated_exc_tpls:
+                return
+        except TypeError:
+            pass
+
+    if not isinstance(exc_lst, list) or len(exc_lst) < 1 or any(map(lambda element: not _is_subclass(element, Exception), exc_lst)):
+        raise IncorrectFaultToleranceSpecificationError(f"The parameter exc_lst is incorrect, expected a list of exceptions, but got '{exc_lst}'")
+
+    if len(_validated_exc_tpls) >= _MAX_VALIDATED_EXC_TPLS:
+        _validated_exc_tpls.clear()
+    _validated_exc_tpls.add(tuple(exc_lst))
+
+def _check_max_no_of_retries(max_no_of_retries: PT.Any) -> None:
+
+    """Raises IncorrectFaultToleranceSpecificationError if max_no_of_retries is not an int of at least one"""
 
-    # check max_no_of_retries
     if not isinstance(max_no_of_retries, int) or max_no_of_retries < 1:
         raise IncorrectFaultToleranceSpecificationError(f"The parameter max_no_of_retries is not an int, but a {type(max_no_of_retries)}"
                                                         f" or the value is beneath zero (max_no_of_retries={max_no_of_retries})")
 
-    # check exc_lst
-    if not isinstance(exc_lst, list) or len(exc_lst) < 1 or any(map(lambda element: not _is_subclass(element, Exception), exc_lst)):
-        raise IncorrectFaultToleranceSpecificationError(f"The parameter exc_lst is incorrect, expected a list of exceptions, but got '{exc_lst}'")
+def _check_cache_namespace(cache_namespace: PT.Any, caches: PT.List[ResultCache]) -> None:
 
-    if backoff_duration_fn is not None:
-        if not isinstance(backoff_duration_fn, PT.Callable):
-            raise IncorrectFaultToleranceSpecificationError(f"The parameter backoff_duration_fn is incorrect, expected a function taking an int returning a float, but got '{backoff_duration_fn}'")
-        fas: inspect.FullArgSpec = inspect.getfullargspec(backoff_duration_fn)
-        if len(fas.args) != 1:
-            raise IncorrectFaultToleranceSpecificationError(f"The parameter backoff_duration_fn is incorrect, expected a function taking an int returning a float, "
-                                                            f"but it takes {len(fas.args)} arguments")
-        try:
-            if not _is_subclass(fas.annotations[fas.args[0]], int):
-                raise IncorrectFaultToleranceSpecificationError(f"The parameter backoff_duration_fn is incorrect, expected a function taking an int returning a float, but the argument is an {fas.annotations[fas.args[0]]}")
-        except KeyError:
-            raise IncorrectFaultToleranceSpecificationError(f"The parameter backoff_duration_fn is incorrect, expected a function taking an int returning a float, but the argument has no type annotation")
+    """Raises IncorrectFaultToleranceSpecificationError if cache_namespace is not a non-empty str, or
+       if it is missing for a persistent cache"""
+
+    if cache_namespace is not None and (not isinstance(cache_namespace, str) or not cache_namespace):
+        raise IncorrectFaultToleranceSpecificationError(f"The parameter cache_namespace is incorrect, expected a non-empty str, but got '{cache_namespace}'")
+    if cache_namespace is not None and not caches:
+        raise IncorrectFaultToleranceSpecificationError(f"The parameter cache_namespace is incorrect, it only applies together with a result cache")
+    if cache_namespace is None and any(cache.persistent for cache in caches):
+        raise IncorrectFaultToleranceSpecificationError(f"The parameter cache_namespace is missing, a persistent result cache requires a namespace telling the results of the decorated functions apart")
+
+def _check_backoff_duration_fn(backoff_duration_fn: PT.Any) -> None:
+
+    """Raises IncorrectFaultToleranceSpecificationError if backoff_duration_fn is not None, a BackoffPolicy
+       or a function taking an int returning a float, checked by its type annotations"""
+
+    # the built-in policies are known to be correct
+    if backoff_duration_fn is None or isinstance(backoff_duration_fn, BackoffPolicy):
+        return
+
+    # a function validated before is correct, its signature is only inspected once
+    try:
+        if backoff_duration_fn in _validated_backoff_duration_fns:
+            return
+    except TypeError:
+        pass
+
+    if not isinstance(backoff_duration_fn, PT.Callable):
+        raise IncorrectFaultToleranceSpecificationError(f"The parameter backoff_duration_fn is incorrect, expected a function taking an int returning a float, but got '{backoff_duration_fn}'")
+    fas: inspect.FullArgSpec = inspect.getfullargspec(backoff_duration_fn)
+    if len(fas.args) != 1:
+        raise IncorrectFaultToleranceSpecificationError(f"The parameter backoff_duration_fn is incorrect, expected a function taking an int returning a float, "
+                                                        f"but it takes {len(fas.args)} arguments")
+    try:
+        if not _is_subclass(fas.annotations[fas.args[0]], int):
+            raise IncorrectFaultToleranceSpecificationError(f"The parameter backoff_duration_fn is incorrect, expected a function taking an int returning a float, but the argument is an {fas.annotations[fas.args[0]]}")
+    except KeyError:
+        raise IncorrectFaultToleranceSpecificationError(f"The parameter backoff_duration_fn is incorrect, expected a function taking an int returning a float, but the argument has no type annotation")
+
+    try:
+        if not _is_subclass(fas.annotations['return'], float):
+            raise IncorrectFaultToleranceSpecificationError(f"The parameter backoff_duration_fn is incorrect, expected a function taking an int returning a float, but the functions returns an {fas.annotations['return']} instead")
+    except KeyError:
+        raise IncorrectFaultToleranceSpecificationError(f"The parameter backoff_duration_fn is incorrect, expected a function taking an int returning a float, but the functions returns None instead")
+
+    try:
+        _validated_backoff_duration_fns.add(backoff_duration_fn)
+    except TypeError:
+        pass
+
+class ExceptionRule:
+
+    """A rule of an ExceptionClassifier: exceptions of exc_type, for which predicate returns True if
+       given, are retried or not. A retried exception may override the max_no_of_retries and the
+       backoff_duration_fn of the decorator, None keeps those of the decorator."""
+
+    __slots__ = ('exc_type', 'predicate', 'retry', 'max_no_of_retries', 'backoff_duration_fn')
+
+    def __init__(self, 
+                 exc_type: type, 
+                 predicate: PT.Callable[[Exception], bool] = None, 
+                 retry: bool = True, 
+                 max_no_of_retries: int = None, 
+                 backoff_duration_fn: PT.Callable[[int], float] = None):
+        self.exc_type: type = exc_type
+        self.predicate: PT.Callable[[Exception], bool] = predicate
+        self.retry: bool = retry
+        self.max_no_of_retries: int = max_no_of_retries
+        self.backoff_duration_fn: PT.Callable[[int], float] = backoff_duration_fn
+
+    def __repr__(self) -> str:
+        return (f"ExceptionRule(exc_type={self.exc_type.__name__}, predicate={self.predicate}, retry={self.retry}, "
+                f"max_no_of_retries={self.max_no_of_retries}, backoff_duration_fn={self.backoff_duration_fn})")
+
+class ExceptionClassifier:
+
+    """Decides which exceptions are recovered from, passed as exc_lst of forward_err_recovery_by_retry.
+
+       retry_on and give_up_on add rules for an exception class, optionally narrowed by a predicate
+       on the exception, e.g. on its errno or status code. The rules of the most specific class in
+       the method resolution order of an exception apply first, rules of the same class in the order
+       they were added, and the first rule whose predicate holds decides. The rules that can apply to
+       an exception type are resolved once and cached, so classifying a repeated failure is a dict
+       lookup no matter how many rules there are. If no rule decides and follow_cause is set, the
+       exception is classified by its __cause__, up to max_cause_depth exceptions down the chain."""
+
+    def __init__(self, follow_cause: bool = True, max_cause_depth: int = 8):
+        check_positive_int('max_cause_depth', max_cause_depth)
+        self._follow_cause: bool = bool(follow_cause)
+        self._max_cause_depth: int = max_cause_depth
+        self._rules: PT.Dict[type, PT.List[ExceptionRule]] = {}
+        self._dispatch: PT.Dict[type, PT.Tuple[ExceptionRule, ...]] = {}
+
+    def __len__(self) -> int:
+        return sum(map(len, self._rules.values()))
+
+    def _add(self, rule: ExceptionRule) -> 'ExceptionClassifier':
+        if not _is_subclass(rule.exc_type, Exception):
+            raise IncorrectFaultToleranceSpecificationError(f"The parameter exc_type is incorrect, expected an exception, but got '{rule.exc_type}'")
+        if rule.predicate is not None and not isinstance(rule.predicate, PT.Callable):
+            raise IncorrectFaultToleranceSpecificationError(f"The parameter predicate is incorrect, expected a function taking an exception returning a bool, but got '{rule.predicate}'")
+        if rule.max_no_of_retries is not None:
+            _check_max_no_of_retries(rule.max_no_of_retries)
+        _check_backoff_duration_fn(rule.backoff_duration_fn)
+        self._rules.setdefault(rule.exc_type, []).append(rule)
+        # the resolved rules are invalid once a rule is added
+        self._dispatch = {}
+        return self
+
+    def retry_on(self, 
+                 exc_type: type, 
+                 predicate: PT.Callable[[Exception], bool] = None, 
+                 max_no_of_retries: int = None, 
+                 backoff_duration_fn: PT.Callable[[int], float] = None) -> 'ExceptionClassifier':
+
+        """Retries exceptions of exc_type for which predicate holds, with the max_no_of_retries and
+           backoff_duration_fn of the decorator unless given. Returns the classifier, so that rules can be chained."""
+
+        return self._add(ExceptionRule(exc_type, predicate, True, max_no_of_retries, backoff_duration_fn))
+
+    def give_up_on(self, exc_type: type, predicate: PT.Callable[[Exception], bool] = None) -> 'ExceptionClassifier':
+
+        """Does not retry exceptions of exc_type for which predicate holds, even if a rule of a base
+           class or their cause would. Returns the classifier, so that rules can be chained."""
+
+        return self._add(ExceptionRule(exc_type, predicate, False))
+
+    def _resolve(self, exc_type: type) -> PT.Tuple[ExceptionRule, ...]:
+        # the rules that can apply to exc_type, most specific class first, the rules after the first
+        # rule without predicate are never reached and left out
+        rules: PT.List[ExceptionRule] = []
+        for cls in exc_type.__mro__:
+            for rule in self._rules.get(cls, ()):
+                rules.append(rule)
+                if rule.predicate is None:
+                    return tuple(rules)
+        return tuple(rules)
+
+    def rule_for(self, exc: BaseException) -> ExceptionRule:
+
+        """Returns the rule deciding about exc, or None if no rule applies to it or its causes"""
+
+        depth: int = 0
+        while exc is not None and depth <= self._max_cause_depth:
+            exc_type: type = type(exc)
+            rules: PT.Tuple[ExceptionRule, ...] = self._dispatch.get(exc_type)
+            if rules is None:
+                rules = self._dispatch[exc_type] = self._resolve(exc_type)
+            for rule in rules:
+                if rule.predicate is None or rule.predicate(exc):
+                    return rule
+            if not self._follow_cause:
+                return None
+            exc = exc.__cause__
+            depth += 1
+        return None
 
+    def is_retryable(self, exc: BaseException) -> bool:
+
+        """True if exc is retried according to the rules"""
+
+        rule: ExceptionRule = self.rule_for(exc)
+        return rule is not None and rule.retry
+
+def _previous_backoff(attempts: PT.List[PT.Any]) -> float:
+
+    """Returns the backoff duration before the last attempt of a trace of flat (started_at, ended_at,
+       exception, backoff) entries, 0.0 if the last attempt is the first one"""
+
+    return attempts[-5] if len(attempts) > 4 else 0.0
+
+def _attempt_expired(timeout: float, owner: object) -> AttemptTimeoutError:
+
+    """Returns the AttemptTimeoutError of an attempt that expired, marked by the owner, the decorator
+       whose attempt_timeout expired, which is recovered from it whatever its exc_lst. Any other
+       AttemptTimeoutError, raised by the function or by a nested decorator, is not marked by it."""
+
+    error: AttemptTimeoutError = AttemptTimeoutError(f"Attempt timed out after {timeout} seconds")
+    error._expired_attempt_of = owner
+    return error
+
+def _call_in_worker_thread(fx: PT.Callable, timeout: float, args: tuple, kwargs: dict, 
+                           abandoned: PT.List['concurrent.futures.Future'] = None, owner: object = None) -> PT.Any:
+
+    """Calls fx on a daemon thread and waits at most timeout seconds for the result. When the
+       timeout expires the thread is abandoned, it cannot be stopped, and AttemptTimeoutError is raised,
+       marked by owner. The future of an abandoned thread is appended to abandoned if given, it is
+       done when the thread ends."""
+
+    future: concurrent.futures.Future = concurrent.futures.Future()
+
+    def run() -> None:
         try:
-            if not _is_subclass(fas.annotations['return'], float):
-                raise IncorrectFaultToleranceSpecificationError(f"The parameter backoff_duration_fn is incorrect, expected a function taking an int returning a float, but the functions returns an {fas.annotations['return']} instead")
-        except KeyError:
-            raise IncorrectFaultToleranceSpecificationError(f"The parameter backoff_duration_fn is incorrect, expected a function taking an int returning a float, but the functions returns None instead")
+            future.set_result(fx(*args, **kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=run, name=f"fault_tolerance-{getattr(fx, '__name__', 'attempt')}", daemon=True).start()
+    try:
+        return future.result(timeout)
+    except concurrent.futures.TimeoutError:
+        # fx may raise a TimeoutError of its own, that is not an expired attempt
+        if future.done():
+            raise
+    if abandoned is not None:
+        abandoned.append(future)
+    raise _attempt_expired(timeout, owner)
+
+async def _await_with_timeout(coro: PT.Awaitable, timeout: float, owner: object = None) -> PT.Any:
+
+    """Awaits coro for at most timeout seconds, cancels it and raises AttemptTimeoutError, marked by
+       owner, when the timeout expires. Unlike asyncio.wait_for, a TimeoutError raised by coro itself is propagated
+       as it is and not mistaken for an expired attempt."""
+
+    task: asyncio.Future = asyncio.ensure_future(coro)
+    try:
+        done, _ = await asyncio.wait({task}, timeout=timeout)
+    except asyncio.CancelledError:
+        task.cancel()
+        raise
+    if not done:
+        task.cancel()
+        await asyncio.wait({task})
+        raise _attempt_expired(timeout, owner)
+    return task.result()
+
+def forward_err_recovery_by_retry(max_no_of_retries: int = 1, 
+                                  exc_lst: PT.List[Exception] = [], 
+                                  backoff_duration_fn: PT.Callable[[int], float] = None,
+                                  retry_budget: RetryBudget = None,
+                                  attempt_timeout: float = None,
+                                  total_deadline: float = None,
+                                  hooks: PT.List[RetryHooks] = [],
+                                  resume_fn: PT.Callable[..., PT.Iterable] = None,
+                                  result_cache: ResultCache = None,
+                                  cache_key_fn: PT.Callable[..., PT.Hashable] = None,
+                                  cache_namespace: str = None,
+                                  on_failure: PT.Callable[..., None] = None,
+                                  prepare_retry: PT.Callable[..., None] = None,
+                                  resource_pool: ResourcePool = None,
+                                  resource_kwarg: str = 'resource',
+                                  clock: Clock = None) -> PT.Callable:
+
+    # check max_no_of_retries
+    _check_max_no_of_retries(max_no_of_retries)
+
+    # check exc_lst, a list of exceptions or an ExceptionClassifier
+    classifier: ExceptionClassifier = exc_lst if isinstance(exc_lst, ExceptionClassifier) else None
+    if classifier is None:
+        _check_exc_lst(exc_lst)
+    elif len(classifier) < 1:
+        raise IncorrectFaultToleranceSpecificationError(f"The parameter exc_lst is incorrect, expected a list of exceptions or an ExceptionClassifier with rules, but got a classifier without rules")
+
+    # check backoff_duration_fn
+    _check_backoff_duration_fn(backoff_duration_fn)
+
+    # check retry_budget
+    if retry_budget is not None and not isinstance(retry_budget, RetryBudget):
+        raise IncorrectFaultToleranceSpecificationError(f"The parameter retry_budget is incorrect, expected a RetryBudget, but got '{retry_budget}'")
+
+    # check attempt_timeout and total_deadline
+    if attempt_timeout is not None:
+        check_positive_number('attempt_timeout', attempt_timeout)
+    if total_deadline is not None:
+        check_positive_number('total_deadline', total_deadline)
+
+    # check hooks, a list with several hooks is combined into one
+    retry_hooks: RetryHooks = combine_hooks(hooks)
+
+    # check resume_fn
+    if resume_fn is not None and not isinstance(resume_fn, PT.Callable):
+        raise IncorrectFaultToleranceSpecificationError(f"The parameter resume_fn is incorrect, expected a function taking an offset and the arguments of the call, but got '{resume_fn}'")
+
+    # check result_cache, cache_key_fn and cache_namespace
+    if result_cache is not None and not isinstance(result_cache, ResultCache):
+        raise IncorrectFaultToleranceSpecificationError(f"The parameter result_cache is incorrect, expected a ResultCache, but got '{result_cache}'")
+    if cache_key_fn is not None and not isinstance(cache_key_fn, PT.Callable):
+        raise IncorrectFaultToleranceSpecificationError(f"The parameter cache_key_fn is incorrect, expected a function taking the arguments of the call, but got '{cache_key_fn}'")
+    if cache_key_fn is not None and result_cache is None:
+        raise IncorrectFaultToleranceSpecificationError(f"The parameter cache_key_fn is incorrect, it only applies together with a result_cache")
+    key_fn: PT.Callable[..., PT.Hashable] = cache_key_fn if cache_key_fn is not None else default_cache_key
+    _check_cache_namespace(cache_namespace, [result_cache] if result_cache is not None else [])
+
+    # check on_failure, prepare_retry, resource_pool and resource_kwarg
+    if on_failure is not None and not isinstance(on_failure, PT.Callable):
+        raise IncorrectFaultToleranceSpecificationError(f"The parameter on_failure is incorrect, expected a function taking an exception and the arguments of the call, but got '{on_failure}'")
+    if prepare_retry is not None and not isinstance(prepare_retry, PT.Callable):
+        raise IncorrectFaultToleranceSpecificationError(f"The parameter prepare_retry is incorrect, expected a function taking the attempt number and the arguments of the call, but got '{prepare_retry}'")
+    if resource_pool is not None and not isinstance(resource_pool, ResourcePool):
+        raise IncorrectFaultToleranceSpecificationError(f"The parameter resource_pool is incorrect, expected a ResourcePool, but got '{resource_pool}'")
+    if not isinstance(resource_kwarg, str) or not resource_kwarg.isidentifier():
+        raise IncorrectFaultToleranceSpecificationError(f"The parameter resource_kwarg is incorrect, expected the name of a keyword argument, but got '{resource_kwarg}'")
+
+    # check clock, the deadlines and backoffs are measured and waited for on it
+    clock = check_clock(clock)
+    monotonic: PT.Callable[[], float] = clock.monotonic
+    sleep: PT.Callable[[float], None] = clock.sleep
+    sleep_async: PT.Callable[[float], PT.Awaitable[None]] = clock.sleep_async
+
+    # precompute the backoff schedule of policies without jitter, the retry loop then only looks the duration up
+    backoff_schedule: array.array = backoff_duration_fn.schedule(max_no_of_retries) if isinstance(backoff_duration_fn, BackoffPolicy) else None
+
+    # an adaptive backoff is given the exception and the time since the first failure, and learns the recovery times
+    adaptive_backoff: AdaptiveBackoff = backoff_duration_fn if isinstance(backoff_duration_fn, AdaptiveBackoff) else None
+
+    # other policies are given the previous backoff duration of the call, which the retry loops read from its trace
+    backoff_policy: BackoffPolicy = backoff_duration_fn if isinstance(backoff_duration_fn, BackoffPolicy) else None
+
+    # the exceptions to recover from as a tuple, so that they are matched by a single except clause,
+    # a classifier decides about every exception
+    exc_tpl: PT.Tuple[type, ...] = tuple(exc_lst) if classifier is None else (Exception,)
+
+    # the rule of the exceptions recovered from as specified by the decorator
+    default_rule: ExceptionRule = ExceptionRule(Exception)
+
+    # without timeouts and hooks the first attempt is a plain call, only a failure enters the retry loop
+    instrumented: bool = (attempt_timeout is not None or total_deadline is not None or retry_hooks is not None 
+                          or on_failure is not None or prepare_retry is not None or resource_pool is not None)
+
+    # failed attempts are rolled back and their resources discarded, so that the retry starts from a clean state
+    guarded: bool = on_failure is not None or resource_pool is not None
+
+    # marks the AttemptTimeoutError of the expired attempts of this decorator
+    expiry: object = object()
+
+    def rule_for(e: Exception) -> ExceptionRule:
+        # the rule by which e is recovered from, None if it is not. An attempt expired by this decorator
+        # is always recovered from, an AttemptTimeoutError of the function or of a nested decorator only
+        # by exc_lst, as on the plain path. An open circuit never is, failing fast is the point of the breaker
+        if isinstance(e, CircuitOpenError):
+            return None
+        if classifier is None:
+            return default_rule if isinstance(e, exc_tpl) or getattr(e, '_expired_attempt_of', None) is expiry else None
+        rule: ExceptionRule = classifier.rule_for(e)
+        if rule is not None and rule.retry:
+            return rule
+        return default_rule if getattr(e, '_expired_attempt_of', None) is expiry else None
+
+    def attempts_allowed(rule: ExceptionRule) -> int:
+        # the number of attempts allowed after a failure recovered from by rule
+        return rule.max_no_of_retries if rule.max_no_of_retries is not None else max_no_of_retries
+
+    def attempt_timeout_before(deadline: float) -> float:
+        # the timeout of the next attempt, clipped to the time left before the overall deadline
+        if deadline is None:
+            return attempt_timeout
+        remaining: float = deadline - monotonic()
+        if remaining <= 0:
+            raise DeadlineExceededError(f"Deadline of {total_deadline} seconds exceeded")
+        return remaining if attempt_timeout is None else min(attempt_timeout, remaining)
+
+    def backoff_after(attempt: int, previous: float, attempts_left: int, deadline: float, rule: ExceptionRule, name: str, exc: Exception, 
+                      failed_at: float) -> float:
+        # the backoff duration after a failed attempt, previous is the backoff duration before it, a 
+        # backoff that would run past the overall deadline is skipped, since there would be no time 
+        # left for the next attempt anyway
+        duration: float
+        if rule.backoff_duration_fn is not None:
+            duration = rule.backoff_duration_fn.next_duration(attempt, previous) if isinstance(rule.backoff_duration_fn, BackoffPolicy) \
+                       else rule.backoff_duration_fn(attempt)
+        elif backoff_schedule is not None and attempt <= len(backoff_schedule):
+            duration = backoff_schedule[attempt - 1]
+        elif adaptive_backoff is not None:
+            duration = adaptive_backoff.duration_after(name, attempt, exc, monotonic() - failed_at)
+        elif backoff_policy is not None:
+            duration = backoff_policy.next_duration(attempt, previous)
+        else:
+            duration = backoff_duration_fn(attempt) if backoff_duration_fn is not None else 0
+        if deadline is not None and monotonic() + duration >= deadline:
+            if attempts_left > 0:
+                raise DeadlineExceededError(f"Deadline of {total_deadline} seconds exceeded after {attempt} attempts")
+            duration = 0
+        if attempts_left > 0 and retry_budget is not None and not retry_budget.try_acquire_retry():
+            raise RetryBudgetExhaustedError(f"Retry budget exhausted after {attempt} attempts")
+        return duration
+
+    def gave_up(error: FailedToRecoverError, name: str, attempts: PT.List[PT.Any]) -> FailedToRecoverError:
+        # attaches the attempts of the call to error, which builds its trace from them only when the
+        # trace is read, and records the call in the trace ring, attempts holds flat (started_at,
+        # ended_at, exception, backoff) entries per attempt
+        recorded_at: float = time.time()
+        error._attempts = (name, attempts, recorded_at)
+        TRACE_RING.record(name, attempts, False, recorded_at)
+        return error
+
+
+    def streaming_decorator(fx: PT.Callable, name: str) -> PT.Callable:
+
+        # generators are retried while they are consumed, a failure mid-stream re-creates the source
+        # at the offset of the next item, either by resume_fn or by calling fx again and skipping the
+        # items already yielded, so nothing is yielded twice and nothing is kept in memory
+        if attempt_timeout is not None or total_deadline is not None:
+            raise IncorrectFaultToleranceSpecificationError(f"The parameters attempt_timeout and total_deadline do not apply to the generator function '{name}'")
+        if on_failure is not None or prepare_retry is not None or resource_pool is not None:
+            raise IncorrectFaultToleranceSpecificationError(f"The parameters on_failure, prepare_retry and resource_pool do not apply to the generator function '{name}'")
+
+        def backoff_mid_stream(attempt_no: int, attempts_left: int, start: float, exc: Exception, rule: ExceptionRule, failed_at: float, 
+                               attempts: PT.List[PT.Any]) -> float:
+            # the backoff duration after a failure mid-stream, raises if the stream is not to be resumed
+            try:
+                duration: float = backoff_after(attempt_no, _previous_backoff(attempts), attempts_left, None, rule, name, exc, failed_at)
+            except FailedToRecoverError as e:
+                if retry_hooks is not None:
+                    retry_hooks.on_giveup(name, attempt_no, monotonic() - start, exc)
+                raise gave_up(e, name, attempts) from exc
+            attempts[-1] = duration
+            if retry_hooks is not None and attempts_left > 0:
+                retry_hooks.on_retry(name, attempt_no, monotonic() - start, exc, duration)
+            return duration
+
+        def on_exhausted(attempt_no: int, attempts_left: int, start: float, exc: Exception, attempts: PT.List[PT.Any]) -> None:
+            if attempts_left < 1:
+                if retry_hooks is not None:
+                    retry_hooks.on_giveup(name, attempt_no, monotonic() - start, exc)
+                raise gave_up(FailedToRecoverError(f"Failed to recover from exceptions after {attempt_no} attempts"), name, attempts) from exc
+            if retry_hooks is not None:
+                retry_hooks.on_attempt(name, attempt_no + 1, monotonic() - start, exc)
+
+        if _is_async_generator_function(fx):
+
+            async def reopen_async(offset: int, args: tuple, kwargs: dict) -> PT.AsyncIterator:
+                if resume_fn is not None:
+                    return resume_fn(offset, *args, **kwargs).__aiter__()
+                source: PT.AsyncIterator = fx(*args, **kwargs)
+                for _ in range(offset):
+                    await source.__anext__()
+                return source
+
+            @functools.wraps(fx)
+            async def async_generator_wrapper(*args, **kwargs):
+                start: float = monotonic()
+                attempt_no: int = 1
+                offset: int = 0
+                exc: Exception = None
+                failed_at: float = None
+                last_failed_at: float = None
+                # the trace of the stream, kept once it fails, every re-opened source is an attempt
+                attempts: PT.List[PT.Any] = None
+                opened_at: float = start
+                source: PT.AsyncIterator = fx(*args, **kwargs)
+                if retry_hooks is not None:
+                    retry_hooks.on_attempt(name, 1, 0.0, None)
+                try:
+                    while True:
+                        try:
+                            if source is None:
+                                source = await reopen_async(offset, args, kwargs)
+                            item = await source.__anext__()
+                        except StopAsyncIteration:
+                            break
+                        except _cancelled():
+                            raise
+                        except exc_tpl as e:
+                            rule: ExceptionRule = rule_for(e)
+                            if rule is None:
+                                raise
+                            exc, source = e, None
+                            last_failed_at = monotonic()
+                            if failed_at is None:
+                                failed_at = last_failed_at
+                            attempts = attempts if attempts is not None else []
+                            attempts += (opened_at, last_failed_at, exc, 0.0)
+                            attempts_left: int = attempts_allowed(rule) - attempt_no
+                            await sleep_async(backoff_mid_stream(attempt_no, attempts_left, start, exc, rule, failed_at, attempts))
+                            on_exhausted(attempt_no, attempts_left, start, exc, attempts)
+                            attempt_no += 1
+                            opened_at = monotonic()
+                            continue
+                        if failed_at is not None:
+                            # the stream recovered from the failures since failed_at
+                            if adaptive_backoff is not None:
+                                adaptive_backoff.record_recovery(name, last_failed_at - failed_at, monotonic() - failed_at)
+                            failed_at = None
+                        offset += 1
+                        yield item
+                finally:
+                    if source is not None and hasattr(source, 'aclose'):
+                        await source.aclose()
+                if attempts is not None:
+                    attempts += (opened_at, monotonic(), None, 0.0)
+                    TRACE_RING.record(name, attempts, True)
+                if retry_budget is not None:
+                    retry_budget.record_success()
+                if retry_hooks is not None:
+                    retry_hooks.on_success(name, attempt_no, monotonic() - start, exc)
+            return async_generator_wrapper
+
+        def reopen(offset: int, args: tuple, kwargs: dict) -> PT.Iterator:
+            if resume_fn is not None:
+                return iter(resume_fn(offset, *args, **kwargs))
+            source: PT.Iterator = fx(*args, **kwargs)
+            if offset > 0:
+                # skips the items already yielded without keeping them
+                collections.deque(itertools.islice(source, offset), maxlen=0)
+            return source
+
+        @functools.wraps(fx)
+        def generator_wrapper(*args, **kwargs):
+            start: float = monotonic()
+            attempt_no: int = 1
+            offset: int = 0
+            exc: Exception = None
+            failed_at: float = None
+            last_failed_at: float = None
+            # the trace of the stream, kept once it fails, every re-opened source is an attempt
+            attempts: PT.List[PT.Any] = None
+            opened_at: float = start
+            source: PT.Iterator = fx(*args, **kwargs)
+            if retry_hooks is not None:
+                retry_hooks.on_attempt(name, 1, 0.0, None)
+            try:
+                while True:
+                    try:
+                        if source is None:
+                            source = reopen(offset, args, kwargs)
+                        item = next(source)
+                    except StopIteration:
+                        break
+                    except exc_tpl as e:
+                        rule: ExceptionRule = rule_for(e)
+                        if rule is None:
+                            raise
+                        exc, source = e, None
+                        last_failed_at = monotonic()
+                        if failed_at is None:
+                            failed_at = last_failed_at
+                        attempts = attempts if attempts is not None else []
+                        attempts += (opened_at, last_failed_at, exc, 0.0)
+                        attempts_left: int = attempts_allowed(rule) - attempt_no
+                        duration: float = backoff_mid_stream(attempt_no, attempts_left, start, exc, rule, failed_at, attempts)
+                        if duration > 0:
+                            sleep(duration)
+                        on_exhausted(attempt_no, attempts_left, start, exc, attempts)
+                        attempt_no += 1
+                        opened_at = monotonic()
+                        continue
+                    if failed_at is not None:
+                        # the stream recovered from the failures since failed_at
+                        if adaptive_backoff is not None:
+                            adaptive_backoff.record_recovery(name, last_failed_at - failed_at, monotonic() - failed_at)
+                        failed_at = None
+                    offset += 1
+                    yield item
+            finally:
+                if source is not None and hasattr(source, 'close'):
+                    source.close()
+            if attempts is not None:
+                attempts += (opened_at, monotonic(), None, 0.0)
+                TRACE_RING.record(name, attempts, True)
+            if retry_budget is not None:
+                retry_budget.record_success()
+            if retry_hooks is not None:
+                retry_hooks.on_success(name, attempt_no, monotonic() - start, exc)
+        return generator_wrapper
+
+    def retry_decorator(fx: PT.Callable, name: str) -> PT.Callable:
+
+        if _is_generator_function(fx) or _is_async_generator_function(fx):
+            return streaming_decorator(fx, name)
+        if resume_fn is not None:
+            raise IncorrectFaultToleranceSpecificationError(f"The parameter resume_fn is incorrect, it only applies to generator functions but '{name}' is not one")
+
+        if _is_coroutine_function(fx):
+
+            # coroutine functions get a coroutine wrapper, the awaited call is retried and the
+            # backoff is done with the asynchronous sleep of the clock so that the event loop is never blocked
+
+            async def unguarded_attempt_async(args: tuple, kwargs: dict, timeout: float) -> PT.Any:
+                if timeout is None:
+                    return await fx(*args, **kwargs)
+                return await _await_with_timeout(fx(*args, **kwargs), timeout, expiry)
+
+            async def guarded_attempt_async(args: tuple, kwargs: dict, timeout: float) -> PT.Any:
+                # the attempt is given a resource from the pool, a failed attempt is rolled back 
+                # by on_failure, which may be a coroutine function, and its resource is discarded
+                resource: PT.Any = None
+                if resource_pool is not None:
+                    resource = await resource_pool.acquire_async()
+                    kwargs = {**kwargs, resource_kwarg: resource}
+                try:
+                    result = await unguarded_attempt_async(args, kwargs, timeout)
+                except BaseException as e:
+                    try:
+                        if on_failure is not None and isinstance(e, Exception):
+                            rolled_back = on_failure(e, *args, **kwargs)
+                            if hasattr(rolled_back, '__await__'):
+                                await rolled_back
+                    finally:
+                        if resource_pool is not None:
+                            # the resource of a cancelled attempt is in an unknown state, it is closed and not reset
+                            if isinstance(e, AttemptTimeoutError):
+                                resource_pool.abandon(resource)
+                            else:
+                                resource_pool.discard(resource)
+                    raise
+                if resource_pool is not None:
+                    resource_pool.release(resource)
+                return result
+
+            attempt_async: PT.Callable = guarded_attempt_async if guarded else unguarded_attempt_async
+
+            async def recover_async(args: tuple, kwargs: dict, start: float, deadline: float, exc: Exception, rule: ExceptionRule) -> PT.Any:
+                # the retry loop, entered after the first attempt failed with exc, recovered from by rule
+                attempt_no: int = 1
+                failed_at: float = monotonic()
+                last_failed_at: float = failed_at
+                # the trace of the call, the start of a plain first attempt is not measured
+                attempts: PT.List[PT.Any] = [start if instrumented else None, failed_at, exc, 0.0]
+                while True:
+                    # the attempts left are those allowed by the rule of the last failure
+                    attempts_left: int = attempts_allowed(rule) - attempt_no
+                    try:
+                        duration: float = backoff_after(attempt_no, _previous_backoff(attempts), attempts_left, deadline, rule, name, exc, failed_at)
+                    except FailedToRecoverError as e:
+                        if retry_hooks is not None:
+                            retry_hooks.on_giveup(name, attempt_no, monotonic() - start, exc)
+                        raise gave_up(e, name, attempts) from exc
+                    attempts[-1] = duration
+                    if retry_hooks is not None and attempts_left > 0:
+                        retry_hooks.on_retry(name, attempt_no, monotonic() - start, exc, duration)
+                    await sleep_async(duration)
+                    if attempts_left < 1:
+                        if retry_hooks is not None:
+                            retry_hooks.on_giveup(name, attempt_no, monotonic() - start, exc)
+                        raise gave_up(FailedToRecoverError(f"Failed to recover from exceptions after {attempt_no} attempts"), name, attempts) from exc
+                    try:
+                        timeout: float = attempt_timeout_before(deadline)
+                    except FailedToRecoverError as e:
+                        if retry_hooks is not None:
+                            retry_hooks.on_giveup(name, attempt_no, monotonic() - start, exc)
+                        raise gave_up(e, name, attempts) from exc
+                    if retry_hooks is not None:
+                        retry_hooks.on_attempt(name, attempt_no + 1, monotonic() - start, exc)
+                    if prepare_retry is not None:
+                        prepared = prepare_retry(attempt_no + 1, *args, **kwargs)
+                        if hasattr(prepared, '__await__'):
+                            await prepared
+                    started_at: float = monotonic()
+                    try:
+                        result = await attempt_async(args, kwargs, timeout)
+                    except _cancelled():
+                        raise
+                    except Exception as e:
+                        last_failed_at = monotonic()
+                        attempts += (started_at, last_failed_at, e, 0.0)
+                        rule = rule_for(e)
+                        if rule is None:
+                            if retry_hooks is not None:
+                                retry_hooks.on_giveup(name, attempt_no + 1, last_failed_at - start, e)
+                            TRACE_RING.record(name, attempts, False)
+                            raise
+                        exc = e
+                        attempt_no += 1
+                    else:
+                        attempts += (started_at, monotonic(), None, 0.0)
+                        TRACE_RING.record(name, attempts, True)
+                        if retry_budget is not None:
+                            retry_budget.record_success()
+                        if adaptive_backoff is not None:
+                            adaptive_backoff.record_recovery(name, last_failed_at - failed_at, monotonic() - failed_at)
+                        if retry_hooks is not None:
+                            retry_hooks.on_success(name, attempt_no + 1, monotonic() - start, exc)
+                        return result
+
+            if not instrumented:
 
+                @functools.wraps(fx)
+                async def async_wrapper(*args, **kwargs):
+                    try:
+                        result = await fx(*args, **kwargs)
+                    except _cancelled():
+                        raise
+                    except exc_tpl as e:
+                        rule: ExceptionRule = rule_for(e)
+                        if rule is None:
+                            raise
+                        return await recover_async(args, kwargs, 0.0, None, e, rule)
+                    if retry_budget is not None:
+                        retry_budget.record_success()
+                    return result
+                return async_wrapper
+
+            @functools.wraps(fx)
+            async def instrumented_async_wrapper(*args, **kwargs):
+                start: float = monotonic()
+                deadline: float = start + total_deadline if total_deadline is not None else None
+                timeout: float = attempt_timeout_before(deadline)
+                if retry_hooks is not None:
+                    retry_hooks.on_attempt(name, 1, 0.0, None)
+                try:
+                    result = await attempt_async(args, kwargs, timeout)
+                except _cancelled():
+                    raise
+                except Exception as e:
+                    rule: ExceptionRule = rule_for(e)
+                    if rule is None:
+                        if retry_hooks is not None:
+                            retry_hooks.on_giveup(name, 1, monotonic() - start, e)
+                        raise
+                    return await recover_async(args, kwargs, start, deadline, e, rule)
+                if retry_budget is not None:
+                    retry_budget.record_success()
+                if retry_hooks is not None:
+                    retry_hooks.on_success(name, 1, monotonic() - start, None)
+                return result
+            return instrumented_async_wrapper
+
+        def unguarded_attempt(args: tuple, kwargs: dict, timeout: float, abandoned: PT.List['concurrent.futures.Future'] = None) -> PT.Any:
+            if timeout is None:
+                return fx(*args, **kwargs)
+            # the attempt runs on a worker thread so that it can be abandoned when it hangs
+            return _call_in_worker_thread(fx, timeout, args, kwargs, abandoned, expiry)
+
+        def guarded_attempt(args: tuple, kwargs: dict, timeout: float) -> PT.Any:
+            # the attempt is given a resource from the pool, a failed attempt is rolled back by 
+            # on_failure, which gets the resource too, and its resource is discarded
+            resource: PT.Any = None
+            abandoned: PT.List[concurrent.futures.Future] = []
+            if resource_pool is not None:
+                resource = resource_pool.acquire()
+                kwargs = {**kwargs, resource_kwarg: resource}
+            try:
+                result = unguarded_attempt(args, kwargs, timeout, abandoned)
+            except BaseException as e:
+                try:
+                    if on_failure is not None and isinstance(e, Exception):
+                        on_failure(e, *args, **kwargs)
+                finally:
+                    if resource_pool is not None:
+                        if abandoned:
+                            # the thread of a timed out attempt may still use the resource, so it keeps
+                            # its slot in the pool until the thread ends, and is then closed and not reset
+                            abandoned[0].add_done_callback(lambda _: resource_pool.abandon(resource))
+                        else:
+                            resource_pool.discard(resource)
+                raise
+            if resource_pool is not None:
+                resource_pool.release(resource)
+            return result
+
+        attempt: PT.Callable = guarded_attempt if guarded else unguarded_attempt
+
+        def recover(args: tuple, kwargs: dict, start: float, deadline: float, exc: Exception, rule: ExceptionRule) -> PT.Any:
+            # the retry loop, entered after the first attempt failed with exc, recovered from by rule
+            attempt_no: int = 1
+            failed_at: float = monotonic()
+            last_failed_at: float = failed_at
+            # the trace of the call, the start of a plain first attempt is not measured
+            attempts: PT.List[PT.Any] = [start if instrumented else None, failed_at, exc, 0.0]
+            while True:
+                # the attempts left are those allowed by the rule of the last failure
+                attempts_left: int = attempts_allowed(rule) - attempt_no
+                try:
+                    duration: float = backoff_after(attempt_no, _previous_backoff(attempts), attempts_left, deadline, rule, name, exc, failed_at)
+                except FailedToRecoverError as e:
+                    if retry_hooks is not None:
+                        retry_hooks.on_giveup(name, attempt_no, monotonic() - start, exc)
+                    raise gave_up(e, name, attempts) from exc
+                attempts[-1] = duration
+                if retry_hooks is not None and attempts_left > 0:
+                    retry_hooks.on_retry(name, attempt_no, monotonic() - start, exc, duration)
+                if duration > 0:
+                    sleep(duration)
+                if attempts_left < 1:
+                    if retry_hooks is not None:
+                        retry_hooks.on_giveup(name, attempt_no, monotonic() - start, exc)
+                    raise gave_up(FailedToRecoverError(f"Failed to recover from exceptions after {attempt_no} attempts"), name, attempts) from exc
+                try:
+                    timeout: float = attempt_timeout_before(deadline)
+                except FailedToRecoverError as e:
+                    if retry_hooks is not None:
+                        retry_hooks.on_giveup(name, attempt_no, monotonic() - start, exc)
+                    raise gave_up(e, name, attempts) from exc
+                if retry_hooks is not None:
+                    retry_hooks.on_attempt(name, attempt_no + 1, monotonic() - start, exc)
+                if prepare_retry is not None:
+                    prepare_retry(attempt_no + 1, *args, **kwargs)
+                started_at: float = monotonic()
+                try:
+                    result = attempt(args, kwargs, timeout)
+                except Exception as e:
+                    last_failed_at = monotonic()
+                    attempts += (started_at, last_failed_at, e, 0.0)
+                    rule = rule_for(e)
+                    if rule is None:
+                        if retry_hooks is not None:
+                            retry_hooks.on_giveup(name, attempt_no + 1, last_failed_at - start, e)
+                        TRACE_RING.record(name, attempts, False)
+                        raise
+                    exc = e
+                    attempt_no += 1
+                else:
+                    attempts += (started_at, monotonic(), None, 0.0)
+                    TRACE_RING.record(name, attempts, True)
+                    if retry_budget is not None:
+                        retry_budget.record_success()
+                    if adaptive_backoff is not None:
+                        adaptive_backoff.record_recovery(name, last_failed_at - failed_at, monotonic() - failed_at)
+                    if retry_hooks is not None:
+                        retry_hooks.on_success(name, attempt_no + 1, monotonic() - start, exc)
+                    return result
+
+        if not instrumented:
+
+            # the success path costs the frame of the wrapper and nothing else
+            @functools.wraps(fx)
+            def wrapper(*args, **kwargs):
+                try:
+                    result = fx(*args, **kwargs)
+                except exc_tpl as e:
+                    rule: ExceptionRule = rule_for(e)
+                    if rule is None:
+                        raise
+                    return recover(args, kwargs, 0.0, None, e, rule)
+                if retry_budget is not None:
+                    retry_budget.record_success()
+                return result
+            return wrapper
+
+        @functools.wraps(fx)
+        def instrumented_wrapper(*args, **kwargs):
+            start: float = monotonic()
+            deadline: float = start + total_deadline if total_deadline is not None else None
+            timeout: float = attempt_timeout_before(deadline)
+            if retry_hooks is not None:
+                retry_hooks.on_attempt(name, 1, 0.0, None)
+            try:
+                result = attempt(args, kwargs, timeout)
+            except Exception as e:
+                rule: ExceptionRule = rule_for(e)
+                if rule is None:
+                    if retry_hooks is not None:
+                        retry_hooks.on_giveup(name, 1, monotonic() - start, e)
+                    raise
+                return recover(args, kwargs, start, deadline, e, rule)
+            if retry_budget is not None:
+                retry_budget.record_success()
+            if retry_hooks is not None:
+                retry_hooks.on_success(name, 1, monotonic() - start, None)
+            return result
+        return instrumented_wrapper
+
+    def decorator(fx: PT.Callable) -> PT.Callable:
+
+        name: str = f"{getattr(fx, '__module__', None)}.{getattr(fx, '__qualname__', repr(fx))}"
+
+        retrying: PT.Callable = retry_decorator(fx, name)
+        if result_cache is None:
+            return retrying
+        if _is_generator_function(fx) or _is_async_generator_function(fx):
+            raise IncorrectFaultToleranceSpecificationError(f"The parameter result_cache is incorrect, the results of generator function '{name}' cannot be cached")
+
+        # the results of completed calls are cached under the namespace of the decorated function and
+        # the key of the call, a repeated call returns the cached result without any attempt, and concurrent
+        # calls with the same key are collapsed into one, so the work is done once even while it is being
+        # recovered. Without a cache_namespace every decoration is a namespace of its own, so that closures
+        # and functions decorated per instance, sharing their qualified name, never share results
+        namespace: PT.Hashable = (cache_namespace, name) if cache_namespace is not None else object()
+        flights: SingleFlight = SingleFlight()
+
+        if _is_coroutine_function(fx):
+
+            @functools.wraps(fx)
+            async def cached_async_wrapper(*args, **kwargs):
+                key: PT.Hashable = (namespace, key_fn(*args, **kwargs))
+                result = result_cache.get(key)
+                if result is not ResultCache.MISSING:
+                    return result
+
+                async def compute():
+                    # a flight that landed since the lookup above has cached its result
+                    result = result_cache.get(key)
+                    if result is not ResultCache.MISSING:
+                        return result
+                    result = await retrying(*args, **kwargs)
+                    result_cache.set(key, result)
+                    return result
+                return await flights.do_async(key, compute)
+            return cached_async_wrapper
+
+        @functools.wraps(fx)
+        def cached_wrapper(*args, **kwargs):
+            key: PT.Hashable = (namespace, key_fn(*args, **kwargs))
+            result = result_cache.get(key)
+            if result is not ResultCache.MISSING:
+                return result
+
+            def compute():
+                # a flight that landed since the lookup above has cached its result
+                result = result_cache.get(key)
+                if result is not ResultCache.MISSING:
+                    return result
+                result = retrying(*args, **kwargs)
+                result_cache.set(key, result)
+                return result
+            return flights.do(key, compute)
+        return cached_wrapper
+    return decorator
+
+def _settle_batch_round(pending: PT.List[int], 
+                        outcome: PT.Any, 
+                        results: PT.List[PT.Any], 
+                        failures: PT.Dict[int, Exception],
+                        attempts: array.array,
+                        exc_tpl: PT.Tuple[type, ...],
+                        max_no_of_retries: int) -> PT.List[int]:
+
+    """Stores the per item outcome of a batch round in results and failures and returns the indices
+       of the items to retry in the next round"""
+
+    if not isinstance(outcome, (list, tuple)) or len(outcome) != len(pending):
+        raise IncorrectFaultToleranceSpecificationError(f"The batch function is incorrect, expected it to return a list of {len(pending)} per item results "
+                                                        f"or exceptions, but got '{outcome}'")
+    retry: PT.List[int] = []
+    for index, item_outcome in zip(pending, outcome):
+        attempts[index] += 1
+        if not isinstance(item_outcome, Exception):
+            results[index] = item_outcome
+            failures.pop(index, None)
+            continue
+        results[index] = item_outcome
+        failures[index] = item_outcome
+        if isinstance(item_outcome, exc_tpl) and attempts[index] < max_no_of_retries:
+            retry.append(index)
+    return retry
 
+def forward_err_recovery_by_batch_retry(max_no_of_retries: int = 1, 
+                                        exc_lst: PT.List[Exception] = [], 
+                                        backoff_duration_fn: PT.Callable[[int], float] = None,
+                                        clock: Clock = None,
+                                        items_arg: PT.Union[int, str] = None) -> PT.Callable:
+
+    """Retries only the failed items of a bulk operation. The decorated function takes a list of
+       items as the argument items_arg, the position or the name of a parameter, by default its first
+       parameter other than self or cls, so that bulk methods are retried as they are. It returns a
+       list with a result per item, in the same order,
+       where a failed item has an exception in place of its result. Items that failed with one of the
+       exceptions in exc_lst are passed again, and only they, after backing off. An exception in
+       exc_lst raised by the function as a whole fails every item of that round.
+
+       Every item is attempted at most max_no_of_retries times. The results are returned in the
+       original order, or, if any item failed for good, BatchFailedToRecoverError is raised with the
+       results and failures of all items."""
+
+    _check_max_no_of_retries(max_no_of_retries)
+    _check_exc_lst(exc_lst)
+    _check_backoff_duration_fn(backoff_duration_fn)
+    clock = check_clock(clock)
+    sleep: PT.Callable[[float], None] = clock.sleep
+    sleep_async: PT.Callable[[float], PT.Awaitable[None]] = clock.sleep_async
+
+    # check items_arg
+    if items_arg is not None and not (isinstance(items_arg, str) and items_arg) and not (isinstance(items_arg, int) and not isinstance(items_arg, bool) and items_arg >= 0):
+        raise IncorrectFaultToleranceSpecificationError(f"The parameter items_arg is incorrect, expected the position or the name of a parameter, but got '{items_arg}'")
+
+    exc_tpl: PT.Tuple[type, ...] = tuple(exc_lst)
+    backoff_schedule: array.array = backoff_duration_fn.schedule(max_no_of_retries) if isinstance(backoff_duration_fn, BackoffPolicy) else None
+
+    def backoff_after(round_no: int, previous: float) -> float:
+        # the backoff duration after round_no, previous is the backoff duration before it
+        if backoff_schedule is not None and round_no <= len(backoff_schedule):
+            return backoff_schedule[round_no - 1]
+        if isinstance(backoff_duration_fn, BackoffPolicy):
+            return backoff_duration_fn.next_duration(round_no, previous)
+        return backoff_duration_fn(round_no) if backoff_duration_fn is not None else 0
+
+    def final_results(items: PT.List[PT.Any], results: PT.List[PT.Any], failures: PT.Dict[int, Exception], round_no: int) -> PT.List[PT.Any]:
+        if failures:
+            raise BatchFailedToRecoverError(f"Failed to recover {len(failures)} of {len(items)} items after {round_no} rounds", 
+                                            results=results, failures=failures)
+        return results
 
-                                                                                                                                                                                                                                                                                                           
     def decorator(fx: PT.Callable) -> PT.Callable:
-        functools.wraps(fx)
+
+        # the position of the items, and their name if they may be passed as a keyword argument, the
+        # parameters are read from the code object of the innermost function so that inspect is not needed
+        inner: PT.Any = fx
+        while hasattr(inner, '__wrapped__'):
+            inner = inner.__wrapped__
+        code: types.CodeType = getattr(inner, '__code__', None)
+        parameters: PT.Tuple[str, ...] = ()
+        positional: PT.Tuple[str, ...] = ()
+        if isinstance(code, types.CodeType):
+            parameters = code.co_varnames[:code.co_argcount + code.co_kwonlyargcount]
+            positional = parameters[:code.co_argcount]
+            if isinstance(inner, types.MethodType):
+                parameters, positional = parameters[1:], positional[1:]
+        if items_arg is None:
+            items_index: int = 1 if positional[:1] in (('self',), ('cls',)) else 0
+            items_name: str = positional[items_index] if items_index < len(positional) else None
+        elif isinstance(items_arg, int):
+            items_index = items_arg
+            items_name = positional[items_index] if items_index < len(positional) else None
+        else:
+            if parameters and items_arg not in parameters and not code.co_flags & _CO_VARKEYWORDS:
+                raise IncorrectFaultToleranceSpecificationError(f"The parameter items_arg is incorrect, '{fx.__qualname__}' has no parameter '{items_arg}'")
+            items_index = positional.index(items_arg) if items_arg in positional else None
+            items_name = items_arg
+
+        def bind(args: tuple, kwargs: dict) -> PT.Tuple[PT.List[PT.Any], PT.Callable[[PT.List[PT.Any]], PT.Tuple[tuple, dict]]]:
+            # returns the items of a call, and a function returning the arguments of the call with other items
+            if items_name is not None and items_name in kwargs:
+                return list(kwargs[items_name]), lambda batch: (args, {**kwargs, items_name: batch})
+            if items_index is None or items_index >= len(args):
+                raise TypeError(f"{getattr(fx, '__qualname__', fx)}() missing its items argument {items_arg if items_arg is not None else items_index}")
+            return list(args[items_index]), lambda batch: (args[:items_index] + (batch,) + args[items_index + 1:], kwargs)
+
+        if _is_coroutine_function(fx):
+
+            @functools.wraps(fx)
+            async def async_wrapper(*args, **kwargs):
+                items, with_items = bind(args, kwargs)
+                results: PT.List[PT.Any] = [None] * len(items)
+                failures: PT.Dict[int, Exception] = {}
+                attempts: array.array = array.array('L', bytes(array.array('L').itemsize * len(items)))
+                pending: PT.List[int] = list(range(len(items)))
+                round_no: int = 0
+                backoff: float = 0.0
+                while pending:
+                    if round_no > 0:
+                        backoff = backoff_after(round_no, backoff)
+                        await sleep_async(backoff)
+                    round_no += 1
+                    try:
+                        round_args, round_kwargs = with_items([items[index] for index in pending])
+                        outcome = await fx(*round_args, **round_kwargs)
+                    except _cancelled():
+                        raise
+                    except exc_tpl as e:
+                        # a failure of the whole round fails every item of the round
+                        outcome = [e] * len(pending)
+                    pending = _settle_batch_round(pending, outcome, results, failures, attempts, exc_tpl, max_no_of_retries)
+                return final_results(items, results, failures, round_no)
+            return async_wrapper
+
+        @functools.wraps(fx)
         def wrapper(*args, **kwargs):
-            attempts_left: int = max_no_of_retries
-            completed: bool = False
-            while not completed:
+            items, with_items = bind(args, kwargs)
+            results: PT.List[PT.Any] = [None] * len(items)
+            failures: PT.Dict[int, Exception] = {}
+            attempts: array.array = array.array('L', bytes(array.array('L').itemsize * len(items)))
+            pending: PT.List[int] = list(range(len(items)))
+            round_no: int = 0
+            backoff: float = 0.0
+            while pending:
+                if round_no > 0:
+                    backoff = backoff_after(round_no, backoff)
+                    if backoff > 0:
+                        sleep(backoff)
+                round_no += 1
                 try:
-                    return fx(*args, **kwargs)
-                except Exception as e:
-                    if any(map(lambda exc: isinstance(e, exc), exc_lst)):
+                    round_args, round_kwargs = with_items([items[index] for index in pending])
+                    outcome = fx(*round_args, **round_kwargs)
+                except exc_tpl as e:
+                    # a failure of the whole round fails every item of the round
+                    outcome = [e] * len(pending)
+                pending = _settle_batch_round(pending, outcome, results, failures, attempts, exc_tpl, max_no_of_retries)
+            return final_results(items, results, failures, round_no)
+        return wrapper
+    return decorator
 
-                        attempts_left -= 1
-                    else:
+class Fallback:
+
+    """An alternative of forward_err_recovery_by_fallback. fx is called with the arguments of the
+       failed call, if it fails with one of the exceptions in exc_lst the next alternative is tried."""
+
+    __slots__ = ('fx', 'exc_tpl')
+
+    def __init__(self, fx: PT.Callable, exc_lst: PT.List[Exception]):
+        if not isinstance(fx, PT.Callable):
+            raise IncorrectFaultToleranceSpecificationError(f"The parameter fx is incorrect, expected a function, but got '{fx}'")
+        _check_exc_lst(exc_lst)
+        self.fx: PT.Callable = fx
+        self.exc_tpl: PT.Tuple[type, ...] = tuple(exc_lst)
+
+    def __repr__(self) -> str:
+        return f"Fallback({getattr(self.fx, '__qualname__', self.fx)}, exc_lst={list(self.exc_tpl)})"
+
+def forward_err_recovery_by_fallback(exc_lst: PT.List[Exception] = [],
+                                     fallbacks: PT.List[PT.Union[PT.Callable, Fallback, ResultCache]] = [],
+                                     cache_key_fn: PT.Callable[..., PT.Hashable] = None,
+                                     cache_namespace: str = None) -> PT.Callable:
+
+    """Serves a degraded result instead of failing. When the function or coroutine function fails
+       with one of the exceptions in exc_lst, typically FailedToRecoverError of a retry decorator
+       stacked inside and CircuitOpenError, the alternatives in fallbacks are tried in order and the
+       result of the first one that succeeds is returned. An alternative is
+
+       - a function, or coroutine function, called with the arguments of the call, the next
+         alternative is tried if it fails with one of the exceptions in exc_lst,
+       - a Fallback, a function with exceptions of its own upon which the next alternative is tried,
+       - a ResultCache serving the last good result of the function for the same arguments. Every
+         result of the function is stored in the caches of the chain under the key of the call by
+         cache_key_fn, and served for as long as the cache keeps it, e.g. a result at most a minute
+         old from InMemoryResultCache(max_entries=1024, ttl=60.0). A cache without a result for
+         the call is skipped. A persistent cache requires a cache_namespace. Storing the results
+         is best-effort, a call whose result cannot be keyed or stored returns it all the same.
+
+       If no alternative succeeds, FailedToRecoverError is raised from the exception of the last one."""
+
+    # check exc_lst
+    _check_exc_lst(exc_lst)
+    exc_tpl: PT.Tuple[type, ...] = tuple(exc_lst)
+
+    # check fallbacks, every alternative is kept with the exceptions upon which the next one is tried
+    if not isinstance(fallbacks, list) or len(fallbacks) < 1:
+        raise IncorrectFaultToleranceSpecificationError(f"The parameter fallbacks is incorrect, expected a list of functions, Fallbacks or ResultCaches, but got '{fallbacks}'")
+    chain: PT.List[PT.Tuple[PT.Any, PT.Tuple[type, ...]]] = []
+    for alternative in fallbacks:
+        if isinstance(alternative, Fallback):
+            chain.append((alternative.fx, alternative.exc_tpl))
+        elif isinstance(alternative, (ResultCache, PT.Callable)):
+            chain.append((alternative, exc_tpl))
+        else:
+            raise IncorrectFaultToleranceSpecificationError(f"The parameter fallbacks is incorrect, expected a list of functions, Fallbacks or ResultCaches, but got '{alternative}'")
+    caches: PT.List[ResultCache] = [alternative for alternative, _ in chain if isinstance(alternative, ResultCache)]
+
+    # check cache_key_fn
+    if cache_key_fn is not None and not isinstance(cache_key_fn, PT.Callable):
+        raise IncorrectFaultToleranceSpecificationError(f"The parameter cache_key_fn is incorrect, expected a function taking the arguments of the call, but got '{cache_key_fn}'")
+    if cache_key_fn is not None and not caches:
+        raise IncorrectFaultToleranceSpecificationError(f"The parameter cache_key_fn is incorrect, it only applies together with a ResultCache in fallbacks")
+    key_fn: PT.Callable[..., PT.Hashable] = cache_key_fn if cache_key_fn is not None else default_cache_key
+    _check_cache_namespace(cache_namespace, caches)
+
+    def decorator(fx: PT.Callable) -> PT.Callable:
+
+        name: str = f"{getattr(fx, '__module__', None)}.{getattr(fx, '__qualname__', repr(fx))}"
+        if _is_generator_function(fx) or _is_async_generator_function(fx):
+            raise IncorrectFaultToleranceSpecificationError(f"The generator function '{name}' cannot fall back, its items are consumed by the caller")
+        # the results are cached under the namespace of the decorated function, see forward_err_recovery_by_retry
+        namespace: PT.Hashable = (cache_namespace, name) if cache_namespace is not None else object()
+
+        def stale_result(cache: ResultCache, args: tuple, kwargs: dict) -> PT.Any:
+            # a cache that cannot key or read the call, e.g. with unhashable arguments, is skipped
+            try:
+                return cache.get((namespace, key_fn(*args, **kwargs)))
+            except Exception:
+                return ResultCache.MISSING
+
+        def store_result(args: tuple, kwargs: dict, result: PT.Any) -> None:
+            # storing the result is best-effort, a result that cannot be keyed or stored is returned all the same
+            try:
+                key: PT.Hashable = (namespace, key_fn(*args, **kwargs))
+            except Exception:
+                return
+            for cache in caches:
+                try:
+                    cache.set(key, result)
+                except Exception:
+                    pass
+
+        if _is_coroutine_function(fx):
+
+            async def degrade_async(args: tuple, kwargs: dict, exc: Exception) -> PT.Any:
+                for alternative, alternative_exc_tpl in chain:
+                    if isinstance(alternative, ResultCache):
+                        result = stale_result(alternative, args, kwargs)
+                        if result is not ResultCache.MISSING:
+                            return result
+                        continue
+                    try:
+                        result = alternative(*args, **kwargs)
+                        if hasattr(result, '__await__'):
+                            result = await result
+                        return result
+                    except _cancelled():
                         raise
-                    time.sleep(backoff_duration_fn(max_no_of_retries - attempts_left) if backoff_duration_fn is not None else 0)
+                    except alternative_exc_tpl as e:
+                        exc = e
+                raise FailedToRecoverError(f"Failed to recover from exceptions after {len(chain)} fallbacks") from exc
+
+            @functools.wraps(fx)
+            async def async_wrapper(*args, **kwargs):
+                try:
+                    result = await fx(*args, **kwargs)
+                except _cancelled():
+                    raise
+                except exc_tpl as e:
+                    return await degrade_async(args, kwargs, e)
+                if caches:
+                    store_result(args, kwargs, result)
+                return result
+            return async_wrapper
+
+        def degrade(args: tuple, kwargs: dict, exc: Exception) -> PT.Any:
+            for alternative, alternative_exc_tpl in chain:
+                if isinstance(alternative, ResultCache):
+                    result = stale_result(alternative, args, kwargs)
+                    if result is not ResultCache.MISSING:
+                        return result
+                    continue
+                try:
+                    return alternative(*args, **kwargs)
+                except alternative_exc_tpl as e:
+                    exc = e
+            raise FailedToRecoverError(f"Failed to recover from exceptions after {len(chain)} fallbacks") from exc
+
+        # without a cache in the chain the success path costs the frame of the wrapper and nothing else
+        @functools.wraps(fx)
+        def wrapper(*args, **kwargs):
+            try:
+                result = fx(*args, **kwargs)
+            except exc_tpl as e:
+                return degrade(args, kwargs, e)
+            if caches:
+                store_result(args, kwargs, result)
+            return result
+        return wrapper
+    return decorator
+
+def circuit_breaker(exc_lst: PT.List[Exception] = [],
+                    failure_threshold: int = 5,
+                    window_duration: float = 60.0,
+                    recovery_timeout: float = 30.0,
+                    half_open_max_calls: int = 1,
+                    breaker: CircuitBreaker = None,
+                    clock: Clock = None) -> PT.Callable:
+
+    """Guards a function with a circuit breaker counting the exceptions in exc_lst as failures.
+       While the circuit is open, calls fail fast with CircuitOpenError instead of waiting for the
+       dependency to time out. Pass a CircuitBreaker as breaker to share the state between several
+       functions, the remaining parameters are then ignored. 
+
+       Stacked inside forward_err_recovery_by_retry, every attempt is guarded and an open circuit
+       ends the retry loop immediately. Stacked outside, a whole retried call counts as one call."""
+
+    # check exc_lst
+    _check_exc_lst(exc_lst)
+
+    # check breaker
+    if breaker is None:
+        breaker = CircuitBreaker(failure_threshold=failure_threshold, 
+                                 window_duration=window_duration,
+                                 recovery_timeout=recovery_timeout, 
+                                 half_open_max_calls=half_open_max_calls,
+                                 clock=clock)
+    elif not isinstance(breaker, CircuitBreaker):
+        raise IncorrectFaultToleranceSpecificationError(f"The parameter breaker is incorrect, expected a CircuitBreaker, but got '{breaker}'")
+
+    exc_tpl: PT.Tuple[type, ...] = tuple(exc_lst)
+
+    def decorator(fx: PT.Callable) -> PT.Callable:
+
+        if _is_coroutine_function(fx):
+
+            @functools.wraps(fx)
+            async def async_wrapper(*args, **kwargs):
+                probe: bool = breaker.before_call()
+                try:
+                    result = await fx(*args, **kwargs)
+                except _cancelled():
+                    breaker.record_ignored(probe)
+                    raise
+                except exc_tpl:
+                    breaker.record_failure(probe)
+                    raise
+                except BaseException:
+                    breaker.record_ignored(probe)
+                    raise
+                breaker.record_success(probe)
+                return result
+            async_wrapper.circuit_breaker = breaker
+            return async_wrapper
+
+        @functools.wraps(fx)
+        def wrapper(*args, **kwargs):
+            probe: bool = breaker.before_call()
+            try:
+                result = fx(*args, **kwargs)
+            except exc_tpl:
+                breaker.record_failure(probe)
+                raise
+            except BaseException:
+                breaker.record_ignored(probe)
+                raise
+            breaker.record_success(probe)
+            return result
+        wrapper.circuit_breaker = breaker
+        return wrapper
+    return decorator
+
+_bulkheads: PT.Dict[str, Bulkhead] = {}
+_bulkheads_lock: threading.Lock = threading.Lock()
+
+def bulkhead(max_concurrent_calls: int = 10,
+             max_queue_size: int = 0,
+             queue_timeout: float = None,
+             key: str = None) -> PT.Callable:
+
+    """Caps the number of concurrent calls in flight of a function or coroutine function. Calls
+       beyond max_concurrent_calls wait in a queue of at most max_queue_size callers for at most
+       queue_timeout seconds, and fail fast with BulkheadFullError when the queue is full or the
+       wait times out. Functions decorated with the same key share one Bulkhead, for example to
+       bound the calls to a dependency, sync and async callers alike.
+
+       Stacked inside forward_err_recovery_by_retry, every attempt takes a slot and the slot is
+       released while backing off, so retries cannot bypass the limit."""
+
+    # check key
+    if key is not None and not isinstance(key, str):
+        raise IncorrectFaultToleranceSpecificationError(f"The parameter key is incorrect, expected a str, but got '{key}'")
+
+    limiter: Bulkhead = Bulkhead(max_concurrent_calls=max_concurrent_calls, max_queue_size=max_queue_size, queue_timeout=queue_timeout)
+    if key is not None:
+        with _bulkheads_lock:
+            shared: Bulkhead = _bulkheads.setdefault(key, limiter)
+        if shared.specification != limiter.specification:
+            raise IncorrectFaultToleranceSpecificationError(f"The bulkhead with key '{key}' is already specified differently, as {shared}")
+        limiter = shared
+
+    def decorator(fx: PT.Callable) -> PT.Callable:
+
+        if _is_coroutine_function(fx):
+
+            @functools.wraps(fx)
+            async def async_wrapper(*args, **kwargs):
+                await limiter.acquire_async()
+                try:
+                    return await fx(*args, **kwargs)
                 finally:
-                    if attempts_left < 1:
-                        raise FailedToRecoverError(f"Failed to recover from exceptions after {max_no_of_retries} attempts")
+                    limiter.release()
+            async_wrapper.bulkhead = limiter
+            return async_wrapper
+
+        @functools.wraps(fx)
+        def wrapper(*args, **kwargs):
+            limiter.acquire()
+            try:
+                return fx(*args, **kwargs)
+            finally:
+                limiter.release()
+        wrapper.bulkhead = limiter
+        return wrapper
+    return decorator
+
+_hedging_executor: 'concurrent.futures.ThreadPoolExecutor' = None
+_hedging_executor_lock: threading.Lock = threading.Lock()
+
+def _shared_hedging_executor() -> 'concurrent.futures.ThreadPoolExecutor':
+
+    """Returns the thread pool shared by hedged functions without an executor of their own, created on first use"""
+
+    global _hedging_executor
+    if _hedging_executor is None:
+        with _hedging_executor_lock:
+            if _hedging_executor is None:
+                _hedging_executor = concurrent.futures.ThreadPoolExecutor(thread_name_prefix='fault_tolerance-hedging')
+    return _hedging_executor
+
+def forward_err_recovery_by_hedging(exc_lst: PT.List[Exception] = [],
+                                    max_no_of_hedges: int = 1,
+                                    hedge_delay: float = 0.05,
+                                    hedge_percentile: float = None,
+                                    executor: 'concurrent.futures.Executor' = None,
+                                    clock: Clock = None) -> PT.Callable:
+
+    """Hedges calls of an idempotent function: if an attempt has not completed after the hedge
+       delay, another attempt is started in parallel, up to max_no_of_hedges extra attempts. The
+       first successful attempt wins and the others are cancelled, or ignored if they already run.
+
+       The hedge delay is hedge_delay seconds, or, if hedge_percentile is given, the latency at that
+       percentile of recent successful attempts once enough of them are tracked. An attempt failing
+       with one of the exceptions in exc_lst starts the next hedge immediately, FailedToRecoverError
+       is raised when all attempts failed. Other exceptions are raised at once.
+
+       Coroutine functions are hedged with tasks, other functions run on executor, by default a
+       thread pool shared by all hedged functions. The shared pool has the default size of
+       ThreadPoolExecutor, min(32, os.cpu_count() + 4) threads, so that attempts of all hedged
+       functions queue for it once that many run; functions with many concurrent callers or long
+       attempts should be given an executor of their own.
+
+       Latencies are measured on clock, by default the system clock. The hedge delay of coroutine
+       functions is waited for on the time of the event loop, which runs on a VirtualClock in
+       VirtualClock.run, the one of other functions is waited for in real time."""
+
+    # check exc_lst
+    _check_exc_lst(exc_lst)
+
+    check_positive_int('max_no_of_hedges', max_no_of_hedges)
+    check_non_negative_number('hedge_delay', hedge_delay)
+
+    # check hedge_percentile
+    if hedge_percentile is not None:
+        if isinstance(hedge_percentile, bool) or not isinstance(hedge_percentile, (int, float)) or not 0 < hedge_percentile < 100:
+            raise IncorrectFaultToleranceSpecificationError(f"The parameter hedge_percentile is incorrect, expected a number between 0 and 100, but got '{hedge_percentile}'")
+
+    # check executor
+    if executor is not None and not isinstance(executor, concurrent.futures.Executor):
+        raise IncorrectFaultToleranceSpecificationError(f"The parameter executor is incorrect, expected a concurrent.futures.Executor, but got '{executor}'")
+
+    # check clock, the latencies of the attempts are measured on it
+    clock = check_clock(clock)
+    monotonic: PT.Callable[[], float] = clock.monotonic
+
+    exc_tpl: PT.Tuple[type, ...] = tuple(exc_lst)
+    max_no_of_attempts: int = max_no_of_hedges + 1
+
+    def decorator(fx: PT.Callable) -> PT.Callable:
+
+        latency_tracker: LatencyTracker = LatencyTracker()
+
+        def current_hedge_delay() -> float:
+            if hedge_percentile is not None:
+                tracked: float = latency_tracker.percentile(hedge_percentile)
+                if tracked is not None:
+                    return tracked
+            return hedge_delay
+
+        if _is_coroutine_function(fx):
+
+            async def timed_attempt_async(args: tuple, kwargs: dict) -> PT.Tuple[PT.Any, float]:
+                start: float = monotonic()
+                result = await fx(*args, **kwargs)
+                return result, monotonic() - start
+
+            @functools.wraps(fx)
+            async def async_wrapper(*args, **kwargs):
+                pending: PT.Set[asyncio.Future] = {asyncio.ensure_future(timed_attempt_async(args, kwargs))}
+                launched: int = 1
+                last_exc: Exception = None
+                try:
+                    while True:
+                        done, pending = await asyncio.wait(pending, 
+                                                           timeout=current_hedge_delay() if launched < max_no_of_attempts else None,
+                                                           return_when=asyncio.FIRST_COMPLETED)
+                        for task in done:
+                            try:
+                                result, latency = task.result()
+                            except _cancelled():
+                                raise
+                            except exc_tpl as e:
+                                last_exc = e
+                                continue
+                            latency_tracker.record(latency)
+                            return result
+                        # the hedge delay expired or attempts failed, start the next hedge if any is left
+                        if launched < max_no_of_attempts:
+                            pending.add(asyncio.ensure_future(timed_attempt_async(args, kwargs)))
+                            launched += 1
+                        elif not pending:
+                            raise FailedToRecoverError(f"Failed to recover from exceptions after {max_no_of_attempts} hedged attempts") from last_exc
+                finally:
+                    for task in pending:
+                        task.cancel()
+            async_wrapper.latency_tracker = latency_tracker
+            return async_wrapper
+
+        def timed_attempt(args: tuple, kwargs: dict) -> PT.Tuple[PT.Any, float]:
+            start: float = monotonic()
+            result = fx(*args, **kwargs)
+            return result, monotonic() - start
+
+        @functools.wraps(fx)
+        def wrapper(*args, **kwargs):
+            pool: concurrent.futures.Executor = executor if executor is not None else _shared_hedging_executor()
+            pending: PT.Set[concurrent.futures.Future] = {pool.submit(timed_attempt, args, kwargs)}
+            launched: int = 1
+            last_exc: Exception = None
+            try:
+                while True:
+                    done, pending = concurrent.futures.wait(pending, 
+                                                            timeout=current_hedge_delay() if launched < max_no_of_attempts else None,
+                                                            return_when=concurrent.futures.FIRST_COMPLETED)
+                    for future in done:
+                        try:
+                            result, latency = future.result()
+                        except exc_tpl as e:
+                            last_exc = e
+                            continue
+                        latency_tracker.record(latency)
+                        return result
+                    # the hedge delay expired or attempts failed, start the next hedge if any is left
+                    if launched < max_no_of_attempts:
+                        pending.add(pool.submit(timed_attempt, args, kwargs))
+                        launched += 1
+                    elif not pending:
+                        raise FailedToRecoverError(f"Failed to recover from exceptions after {max_no_of_attempts} hedged attempts") from last_exc
+            finally:
+                # attempts that have not started are cancelled, running ones are left to complete and ignored
+                for future in pending:
+                    future.cancel()
+        wrapper.latency_tracker = latency_tracker
         return wrapper
     return decorator
 
@@ -0,0 +1,246 @@
+#MIT License
+#
+#Copyright (c) 2022 I-and-D-Got-Accelerators
+#
+#Permission is hereby granted, free of charge, to any person obtaining a copy
+#of this software and associated documentation files (the "Software"), to deal
+#in the Software without restriction, including without limitation the rights
+#to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#copies of the Software, and to permit persons to whom the Software is
+#furnished to do so, subject to the following conditions:
+#
+#The above copyright notice and this permission notice shall be included in all
+#copies or substantial portions of the Software.
+#
+#THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#SOFTWARE.
+
+import array
+import concurrent.futures
+import heapq
+import itertools
+import threading
+import time
+import typing as PT
+from fault_tolerance.Exceptions import IncorrectFaultToleranceSpecificationError, FailedToRecoverError
+from fault_tolerance.backoff import BackoffPolicy
+from fault_tolerance.decorators import _check_max_no_of_retries, _check_exc_lst, _check_backoff_duration_fn
+
+class _DelayQueue:
+
+    """Calls functions after a delay on a single timer thread, started on first use"""
+
+    def __init__(self):
+        self._heap: PT.List[PT.Tuple[float, int, PT.Callable[[], None]]] = []
+        self._sequence: PT.Iterator[int] = itertools.count()
+        self._condition: threading.Condition = threading.Condition()
+        self._thread: threading.Thread = None
+        self._stopped: bool = False
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def call_later(self, delay: float, fn: PT.Callable[[], None]) -> None:
+        with self._condition:
+            heapq.heappush(self._heap, (time.monotonic() + delay, next(self._sequence), fn))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='fault_tolerance-delay-queue', daemon=True)
+                self._thread.start()
+            self._condition.notify()
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._stopped:
+                    if self._heap:
+                        remaining: float = self._heap[0][0] - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self._condition.wait(remaining)
+                    else:
+                        self._condition.wait()
+                if self._stopped:
+                    return
+                _, _, fn = heapq.heappop(self._heap)
+            fn()
+
+    def stop(self) -> None:
+        with self._condition:
+            self._stopped = True
+            self._condition.notify()
+
+class _RetryingTask:
+
+    """A submitted call, its attempt number, its last backoff duration and the future handed out to the caller"""
+
+    __slots__ = ('fn', 'args', 'kwargs', 'future', 'attempt', 'backoff')
+
+    def __init__(self, fn: PT.Callable, args: tuple, kwargs: dict):
+        self.fn: PT.Callable = fn
+        self.args: tuple = args
+        self.kwargs: dict = kwargs
+        self.future: concurrent.futures.Future = concurrent.futures.Future()
+        self.attempt: int = 1
+        self.backoff: float = 0.0
+
+def _resolve(future: concurrent.futures.Future, result: PT.Any = None, exc: BaseException = None) -> None:
+    # the caller may have cancelled the future in the meantime, the outcome is then dropped
+    if future.cancelled():
+        return
+    try:
+        if exc is None:
+            future.set_result(result)
+        else:
+            future.set_exception(exc)
+    except Exception:
+        if not future.cancelled():
+            raise
+
+class RetryingExecutor:
+
+    """Runs calls on an executor and retries them with the semantics of forward_err_recovery_by_retry:
+       at most max_no_of_retries attempts, retrying the exceptions in exc_lst and backing off by
+       backoff_duration_fn between attempts. Instead of sleeping in a worker, a failed attempt is
+       resubmitted after its backoff by a timer thread, so the workers only run ready attempts.
+
+       The executor is a ThreadPoolExecutor with max_workers workers unless one is given, for
+       example a ProcessPoolExecutor, which is then not shut down by this executor. Calls are
+       submitted with submit, returning a future, or with map and map_unordered, streaming the
+       results. Exhausted calls fail with FailedToRecoverError caused by the last exception."""
+
+    def __init__(self, 
+                 max_no_of_retries: int = 1, 
+                 exc_lst: PT.List[Exception] = [], 
+                 backoff_duration_fn: PT.Callable[[int], float] = None,
+                 executor: concurrent.futures.Executor = None,
+                 max_workers: int = None):
+
+        _check_max_no_of_retries(max_no_of_retries)
+        _check_exc_lst(exc_lst)
+        _check_backoff_duration_fn(backoff_duration_fn)
+
+        # check executor
+        if executor is not None and not isinstance(executor, concurrent.futures.Executor):
+            raise IncorrectFaultToleranceSpecificationError(f"The parameter executor is incorrect, expected a concurrent.futures.Executor, but got '{executor}'")
+
+        self._max_no_of_retries: int = max_no_of_retries
+        self._exc_tpl: PT.Tuple[type, ...] = tuple(exc_lst)
+        self._backoff_duration_fn: PT.Callable[[int], float] = backoff_duration_fn
+        self._backoff_schedule: array.array = backoff_duration_fn.schedule(max_no_of_retries) if isinstance(backoff_duration_fn, BackoffPolicy) else None
+
+        self._owns_executor: bool = executor is None
+        self._executor: concurrent.futures.Executor = executor if executor is not None else concurrent.futures.ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='fault_tolerance-retrying')
+        self._delay_queue: _DelayQueue = _DelayQueue()
+        self._outstanding: PT.Set[concurrent.futures.Future] = set()
+        self._lock: threading.Lock = threading.Lock()
+        self._shutdown: bool = False
+
+    def _backoff_after(self, attempt: int, previous: float) -> float:
+        if self._backoff_schedule is not None and attempt <= len(self._backoff_schedule):
+            return self._backoff_schedule[attempt - 1]
+        if isinstance(self._backoff_duration_fn, BackoffPolicy):
+            return self._backoff_duration_fn.next_duration(attempt, previous)
+        return self._backoff_duration_fn(attempt) if self._backoff_duration_fn is not None else 0
+
+    def submit(self, fn: PT.Callable, *args, **kwargs) -> concurrent.futures.Future:
+
+        """Schedules fn(*args, **kwargs) and returns a future of its result after recovery"""
+
+        task: _RetryingTask = _RetryingTask(fn, args, kwargs)
+        with self._lock:
+            if self._shutdown:
+                raise RuntimeError("cannot schedule new calls after shutdown")
+            self._outstanding.add(task.future)
+        task.future.add_done_callback(self._forget)
+        self._launch(task)
+        return task.future
+
+    def _forget(self, future: concurrent.futures.Future) -> None:
+        with self._lock:
+            self._outstanding.discard(future)
+
+    def _launch(self, task: _RetryingTask) -> None:
+        if task.future.cancelled():
+            return
+        try:
+            attempt: concurrent.futures.Future = self._executor.submit(task.fn, *task.args, **task.kwargs)
+        except Exception as e:
+            _resolve(task.future, exc=e)
+            return
+        attempt.add_done_callback(lambda attempt: self._settle(task, attempt))
+
+    def _settle(self, task: _RetryingTask, attempt: concurrent.futures.Future) -> None:
+        if attempt.cancelled():
+            task.future.cancel()
+            return
+        exc: BaseException = attempt.exception()
+        if exc is None:
+            _resolve(task.future, result=attempt.result())
+        elif not isinstance(exc, self._exc_tpl):
+            _resolve(task.future, exc=exc)
+        elif task.attempt >= self._max_no_of_retries:
+            error: FailedToRecoverError = FailedToRecoverError(f"Failed to recover from exceptions after {self._max_no_of_retries} attempts")
+            error.__cause__ = exc
+            _resolve(task.future, exc=error)
+        else:
+            duration: float = self._backoff_after(task.attempt, task.backoff)
+            task.attempt += 1
+            task.backoff = duration
+            if duration > 0:
+                self._delay_queue.call_later(duration, lambda: self._launch(task))
+            else:
+                self._launch(task)
+
+    def map(self, fn: PT.Callable, *iterables: PT.Iterable, timeout: float = None) -> PT.Iterator[PT.Any]:
+
+        """Submits fn for every set of arguments and yields the results in the order of the arguments"""
+
+        futures: PT.List[concurrent.futures.Future] = [self.submit(fn, *args) for args in zip(*iterables)]
+        deadline: float = time.monotonic() + timeout if timeout is not None else None
+        try:
+            for future in futures:
+                yield future.result(None if deadline is None else max(0.0, deadline - time.monotonic()))
+        finally:
+            for future in futures:
+                future.cancel()
+
+    def map_unordered(self, fn: PT.Callable, *iterables: PT.Iterable, timeout: float = None) -> PT.Iterator[PT.Any]:
+
+        """Submits fn for every set of arguments and yields the results as soon as they complete"""
+
+        futures: PT.List[concurrent.futures.Future] = [self.submit(fn, *args) for args in zip(*iterables)]
+        try:
+            for future in concurrent.futures.as_completed(futures, timeout):
+                yield future.result()
+        finally:
+            for future in futures:
+                future.cancel()
+
+    def shutdown(self, wait: bool = True) -> None:
+
+        """Stops accepting calls. With wait, waits for all outstanding calls including their retries
+           to complete, without, cancels them. The timer thread is stopped and an executor created by
+           this executor is shut down."""
+
+        with self._lock:
+            self._shutdown = True
+            outstanding: PT.List[concurrent.futures.Future] = list(self._outstanding)
+        if wait:
+            concurrent.futures.wait(outstanding)
+        else:
+            for future in outstanding:
+                future.cancel()
+        self._delay_queue.stop()
+        if self._owns_executor:
+            self._executor.shutdown(wait=wait)
+
+    def __enter__(self) -> 'RetryingExecutor':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.shutdown(wait=True)
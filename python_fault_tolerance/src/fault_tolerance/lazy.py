@@ -0,0 +1,58 @@
+#MIT License
+#
+#Copyright (c) 2022 I-and-D-Got-Accelerators
+#
+#Permission is hereby granted, free of charge, to any person obtaining a copy
+#of this software and associated documentation files (the "Software"), to deal
+#in the Software without restriction, including without limitation the rights
+#to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#copies of the Software, and to permit persons to whom the Software is
+#furnished to do so, subject to the following conditions:
+#
+#The above copyright notice and this permission notice shall be included in all
+#copies or substantial portions of the Software.
+#
+#THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#SOFTWARE.
+
+import importlib
+import sys
+import typing as PT
+
+class LazyModule:
+
+    """Stands in for a module in the namespace of the importing module until one of its attributes
+       is accessed, then imports it and replaces itself in the namespace with the real module, so
+       that later accesses cost nothing. A dotted name such as 'concurrent.futures' is bound to its
+       top-level package, 'concurrent', like 'import concurrent.futures' does."""
+
+    __slots__ = ('_name', '_namespace')
+
+    def __init__(self, name: str, namespace: PT.Dict[str, PT.Any]):
+        self._name: str = name
+        self._namespace: PT.Dict[str, PT.Any] = namespace
+
+    def __getattr__(self, attr: str) -> PT.Any:
+        importlib.import_module(self._name)
+        top_level_name: str = self._name.partition('.')[0]
+        module = sys.modules[top_level_name]
+        if self._namespace.get(top_level_name) is self:
+            self._namespace[top_level_name] = module
+        return getattr(module, attr)
+
+    def __repr__(self) -> str:
+        return f"<lazy module '{self._name}'>"
+
+def lazy_import(name: str, namespace: PT.Dict[str, PT.Any]) -> PT.Any:
+
+    """Returns the module if it is already imported, otherwise a LazyModule importing it on first use"""
+
+    top_level_name: str = name.partition('.')[0]
+    if name in sys.modules:
+        return sys.modules[top_level_name]
+    return LazyModule(name, namespace)
@@ -0,0 +1,188 @@
+#MIT License
+#
+#Copyright (c) 2022 I-and-D-Got-Accelerators
+#
+#Permission is hereby granted, free of charge, to any person obtaining a copy
+#of this software and associated documentation files (the "Software"), to deal
+#in the Software without restriction, including without limitation the rights
+#to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#copies of the Software, and to permit persons to whom the Software is
+#furnished to do so, subject to the following conditions:
+#
+#The above copyright notice and this permission notice shall be included in all
+#copies or substantial portions of the Software.
+#
+#THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#SOFTWARE.
+
+import collections
+import threading
+import typing as PT
+from fault_tolerance.Exceptions import BulkheadFullError, IncorrectFaultToleranceSpecificationError
+from fault_tolerance.checks import check_positive_int, check_positive_number
+from fault_tolerance.lazy import lazy_import
+
+asyncio = lazy_import('asyncio', globals())
+
+class _ThreadWaiter:
+
+    """A thread waiting in the queue of a bulkhead"""
+
+    __slots__ = ('granted', '_event')
+
+    def __init__(self):
+        self.granted: bool = False
+        self._event: threading.Event = threading.Event()
+
+    def notify(self) -> None:
+        self._event.set()
+
+    def wait(self, timeout: float) -> None:
+        self._event.wait(timeout)
+
+class _TaskWaiter:
+
+    """A coroutine waiting in the queue of a bulkhead, notified thread-safely through its event loop"""
+
+    __slots__ = ('granted', '_loop', 'future')
+
+    def __init__(self, loop: 'asyncio.AbstractEventLoop'):
+        self.granted: bool = False
+        self._loop: asyncio.AbstractEventLoop = loop
+        self.future: asyncio.Future = loop.create_future()
+
+    def _resolve(self) -> None:
+        if not self.future.done():
+            self.future.set_result(None)
+
+    def notify(self) -> None:
+        self._loop.call_soon_threadsafe(self._resolve)
+
+class Bulkhead:
+
+    """Limits the number of calls in flight to max_concurrent_calls. Further callers wait in a
+       FIFO queue of at most max_queue_size callers for at most queue_timeout seconds (None waits
+       without a timeout), and BulkheadFullError is raised when the queue is full or the wait
+       times out. The same bulkhead limits threads and coroutines together, a released slot is
+       handed over directly to the first waiter in the queue."""
+
+    def __init__(self, max_concurrent_calls: int = 10, max_queue_size: int = 0, queue_timeout: float = None):
+
+        check_positive_int('max_concurrent_calls', max_concurrent_calls)
+
+        # check max_queue_size
+        if not isinstance(max_queue_size, int) or isinstance(max_queue_size, bool) or max_queue_size < 0:
+            raise IncorrectFaultToleranceSpecificationError(f"The parameter max_queue_size is not an int, but a {type(max_queue_size)}"
+                                                            f" or the value is beneath zero (max_queue_size={max_queue_size})")
+        if queue_timeout is not None:
+            check_positive_number('queue_timeout', queue_timeout)
+
+        self._max_concurrent_calls: int = max_concurrent_calls
+        self._max_queue_size: int = max_queue_size
+        self._queue_timeout: float = queue_timeout
+
+        self._in_flight: int = 0
+        self._waiters: PT.Deque[PT.Union[_ThreadWaiter, _TaskWaiter]] = collections.deque()
+        self._lock: threading.Lock = threading.Lock()
+
+    @property
+    def specification(self) -> PT.Tuple[int, int, PT.Optional[float]]:
+        """The max_concurrent_calls, max_queue_size and queue_timeout the bulkhead was created with"""
+        return self._max_concurrent_calls, self._max_queue_size, self._queue_timeout
+
+    @property
+    def in_flight(self) -> int:
+        """The number of calls holding a slot"""
+        return self._in_flight
+
+    @property
+    def queued(self) -> int:
+        """The number of callers waiting for a slot"""
+        return len(self._waiters)
+
+    def _enqueue_or_acquire(self, waiter_factory: PT.Callable) -> PT.Optional[PT.Union[_ThreadWaiter, _TaskWaiter]]:
+        # takes a free slot and returns None, or queues and returns a waiter, or raises if the queue is full
+        with self._lock:
+            if self._in_flight < self._max_concurrent_calls and not self._waiters:
+                self._in_flight += 1
+                return None
+            if len(self._waiters) >= self._max_queue_size:
+                raise BulkheadFullError(f"Bulkhead is full, {self._in_flight} calls are in flight and {len(self._waiters)} are queued")
+            waiter = waiter_factory()
+            self._waiters.append(waiter)
+            return waiter
+
+    def _abandon(self, waiter: PT.Union[_ThreadWaiter, _TaskWaiter]) -> bool:
+        # removes a waiter that stopped waiting, returns False if it was handed a slot in the meantime
+        with self._lock:
+            if waiter.granted:
+                return False
+            self._waiters.remove(waiter)
+            return True
+
+    def acquire(self) -> None:
+
+        """Takes a slot, waiting in the queue if none is free"""
+
+        waiter: _ThreadWaiter = self._enqueue_or_acquire(_ThreadWaiter)
+        if waiter is None:
+            return
+        waiter.wait(self._queue_timeout)
+        if self._abandon(waiter):
+            raise BulkheadFullError(f"Bulkhead queue timeout of {self._queue_timeout} seconds expired")
+
+    async def acquire_async(self) -> None:
+
+        """Takes a slot, waiting in the queue without blocking the event loop if none is free"""
+
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        waiter: _TaskWaiter = self._enqueue_or_acquire(lambda: _TaskWaiter(loop))
+        if waiter is None:
+            return
+        try:
+            await asyncio.wait({waiter.future}, timeout=self._queue_timeout)
+        except asyncio.CancelledError:
+            if not self._abandon(waiter):
+                self.release()
+            raise
+        if self._abandon(waiter):
+            raise BulkheadFullError(f"Bulkhead queue timeout of {self._queue_timeout} seconds expired")
+
+    def release(self) -> None:
+
+        """Releases a slot, handing it over to the first waiter in the queue if any"""
+
+        with self._lock:
+            while self._waiters:
+                waiter = self._waiters.popleft()
+                try:
+                    waiter.notify()
+                except RuntimeError:
+                    # the event loop of the waiting coroutine is closed
+                    continue
+                waiter.granted = True
+                return
+            self._in_flight -= 1
+
+    def __enter__(self) -> 'Bulkhead':
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.release()
+
+    async def __aenter__(self) -> 'Bulkhead':
+        await self.acquire_async()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self.release()
+
+    def __repr__(self) -> str:
+        return (f"Bulkhead(max_concurrent_calls={self._max_concurrent_calls}, max_queue_size={self._max_queue_size}, "
+                f"queue_timeout={self._queue_timeout}, in_flight={self._in_flight}, queued={len(self._waiters)})")
@@ -0,0 +1,278 @@
+#MIT License
+#
+#Copyright (c) 2022 I-and-D-Got-Accelerators
+#
+#Permission is hereby granted, free of charge, to any person obtaining a copy
+#of this software and associated documentation files (the "Software"), to deal
+#in the Software without restriction, including without limitation the rights
+#to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#copies of the Software, and to permit persons to whom the Software is
+#furnished to do so, subject to the following conditions:
+#
+#The above copyright notice and this permission notice shall be included in all
+#copies or substantial portions of the Software.
+#
+#THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#SOFTWARE.
+
+import array
+import bisect
+import threading
+import typing as PT
+from fault_tolerance.Exceptions import IncorrectFaultToleranceSpecificationError
+from fault_tolerance.checks import check_positive_int
+
+class RetryHooks:
+
+    """Base class of the hooks called by forward_err_recovery_by_retry. Subclasses override the
+       events they are interested in. Every hook receives the name of the decorated function, the
+       number of the attempt (starting at 1), the seconds elapsed since the call started and an
+       exception, which is None where no attempt has failed yet.
+
+       on_attempt  before every attempt, exc is the exception of the previous attempt
+       on_retry    after a failed attempt that is retried, before backing off backoff_duration seconds
+       on_success  after the attempt that succeeded, exc is the exception of the previous attempt
+       on_giveup   when the call ends with an exception, exc is the exception of the last attempt
+
+       Hooks are called on the thread or in the task of the call and must not raise."""
+
+    def on_attempt(self, name: str, attempt: int, elapsed: float, exc: Exception) -> None:
+        pass
+
+    def on_retry(self, name: str, attempt: int, elapsed: float, exc: Exception, backoff_duration: float) -> None:
+        pass
+
+    def on_success(self, name: str, attempt: int, elapsed: float, exc: Exception) -> None:
+        pass
+
+    def on_giveup(self, name: str, attempt: int, elapsed: float, exc: Exception) -> None:
+        pass
+
+class CompositeRetryHooks(RetryHooks):
+
+    """Calls several hooks in order"""
+
+    def __init__(self, hooks: PT.List[RetryHooks]):
+        self._hooks: PT.Tuple[RetryHooks, ...] = tuple(hooks)
+
+    def on_attempt(self, name: str, attempt: int, elapsed: float, exc: Exception) -> None:
+        for hooks in self._hooks:
+            hooks.on_attempt(name, attempt, elapsed, exc)
+
+    def on_retry(self, name: str, attempt: int, elapsed: float, exc: Exception, backoff_duration: float) -> None:
+        for hooks in self._hooks:
+            hooks.on_retry(name, attempt, elapsed, exc, backoff_duration)
+
+    def on_success(self, name: str, attempt: int, elapsed: float, exc: Exception) -> None:
+        for hooks in self._hooks:
+            hooks.on_success(name, attempt, elapsed, exc)
+
+    def on_giveup(self, name: str, attempt: int, elapsed: float, exc: Exception) -> None:
+        for hooks in self._hooks:
+            hooks.on_giveup(name, attempt, elapsed, exc)
+
+def combine_hooks(hooks: PT.Any) -> PT.Optional[RetryHooks]:
+
+    """Checks a list of hooks and returns a single RetryHooks calling them all, or None if the list is empty"""
+
+    if not isinstance(hooks, list) or any(map(lambda element: not isinstance(element, RetryHooks), hooks)):
+        raise IncorrectFaultToleranceSpecificationError(f"The parameter hooks is incorrect, expected a list of RetryHooks, but got '{hooks}'")
+    if len(hooks) == 0:
+        return None
+    if len(hooks) == 1:
+        return hooks[0]
+    return CompositeRetryHooks(hooks)
+
+DEFAULT_LATENCY_BUCKETS: PT.Tuple[float, ...] = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+class _FunctionMetrics:
+
+    """The counters and the latency histogram of a single decorated function"""
+
+    __slots__ = ('calls', 'attempts', 'retries', 'successes', 'giveups', 'backoff_seconds', 
+                 'retry_exceptions', 'latency_counts', 'latency_sum')
+
+    def __init__(self, no_of_buckets: int):
+        self.calls: int = 0
+        self.attempts: int = 0
+        self.retries: int = 0
+        self.successes: int = 0
+        self.giveups: int = 0
+        self.backoff_seconds: float = 0.0
+        self.retry_exceptions: PT.Dict[str, int] = {}
+        # one count per bucket plus the +Inf bucket, not cumulative
+        self.latency_counts: array.array = array.array('Q', bytes(8 * (no_of_buckets + 1)))
+        self.latency_sum: float = 0.0
+
+def _escape_label(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+class MetricsCollector(RetryHooks):
+
+    """In-process collector of per function counters and call latency histograms. The histogram
+       has fixed buckets with upper bounds in seconds, stored as a preallocated array of counts.
+       Pass the collector in the hooks of the decorator and export with snapshot or to_prometheus."""
+
+    def __init__(self, buckets: PT.Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        if (not isinstance(buckets, (list, tuple)) or len(buckets) < 1 or 
+            any(map(lambda bound: isinstance(bound, bool) or not isinstance(bound, (int, float)), buckets)) or
+            list(buckets) != sorted(set(buckets))):
+            raise IncorrectFaultToleranceSpecificationError(f"The parameter buckets is incorrect, expected increasing upper bounds in seconds, but got '{buckets}'")
+        self._buckets: PT.Tuple[float, ...] = tuple(float(bound) for bound in buckets)
+        self._functions: PT.Dict[str, _FunctionMetrics] = {}
+        self._lock: threading.Lock = threading.Lock()
+
+    def _metrics(self, name: str) -> _FunctionMetrics:
+        try:
+            return self._functions[name]
+        except KeyError:
+            return self._functions.setdefault(name, _FunctionMetrics(len(self._buckets)))
+
+    def on_attempt(self, name: str, attempt: int, elapsed: float, exc: Exception) -> None:
+        with self._lock:
+            metrics: _FunctionMetrics = self._metrics(name)
+            metrics.attempts += 1
+            if attempt == 1:
+                metrics.calls += 1
+
+    def on_retry(self, name: str, attempt: int, elapsed: float, exc: Exception, backoff_duration: float) -> None:
+        exc_name: str = type(exc).__name__
+        with self._lock:
+            metrics: _FunctionMetrics = self._metrics(name)
+            metrics.retries += 1
+            metrics.backoff_seconds += backoff_duration
+            metrics.retry_exceptions[exc_name] = metrics.retry_exceptions.get(exc_name, 0) + 1
+
+    def on_success(self, name: str, attempt: int, elapsed: float, exc: Exception) -> None:
+        index: int = bisect.bisect_left(self._buckets, elapsed)
+        with self._lock:
+            metrics: _FunctionMetrics = self._metrics(name)
+            metrics.successes += 1
+            metrics.latency_counts[index] += 1
+            metrics.latency_sum += elapsed
+
+    def on_giveup(self, name: str, attempt: int, elapsed: float, exc: Exception) -> None:
+        index: int = bisect.bisect_left(self._buckets, elapsed)
+        with self._lock:
+            metrics: _FunctionMetrics = self._metrics(name)
+            metrics.giveups += 1
+            metrics.latency_counts[index] += 1
+            metrics.latency_sum += elapsed
+
+    def reset(self) -> None:
+        """Forgets all collected metrics"""
+        with self._lock:
+            self._functions.clear()
+
+    def snapshot(self) -> PT.Dict[str, PT.Dict[str, PT.Any]]:
+
+        """Returns the collected metrics per function name as plain dicts. The latency buckets
+           are cumulative and keyed by their upper bound, like Prometheus histograms."""
+
+        result: PT.Dict[str, PT.Dict[str, PT.Any]] = {}
+        with self._lock:
+            for name, metrics in self._functions.items():
+                cumulative: int = 0
+                buckets: PT.Dict[float, int] = {}
+                for bound, count in zip(self._buckets + (float('inf'),), metrics.latency_counts):
+                    cumulative += count
+                    buckets[bound] = cumulative
+                result[name] = {
+                    'calls': metrics.calls,
+                    'attempts': metrics.attempts,
+                    'retries': metrics.retries,
+                    'successes': metrics.successes,
+                    'giveups': metrics.giveups,
+                    'backoff_seconds': metrics.backoff_seconds,
+                    'retry_exceptions': dict(metrics.retry_exceptions),
+                    'latency': {'buckets': buckets, 'sum': metrics.latency_sum, 'count': cumulative},
+                }
+        return result
+
+    def to_prometheus(self, prefix: str = 'fault_tolerance') -> str:
+
+        """Returns the collected metrics in the Prometheus text exposition format"""
+
+        snapshot: PT.Dict[str, PT.Dict[str, PT.Any]] = self.snapshot()
+        lines: PT.List[str] = []
+
+        for counter, help_text in (('calls', 'Calls of the decorated function'),
+                                   ('attempts', 'Attempts, including the first attempt of every call'),
+                                   ('successes', 'Calls that succeeded'),
+                                   ('giveups', 'Calls that gave up and raised')):
+            lines.append(f"# HELP {prefix}_{counter}_total {help_text}")
+            lines.append(f"# TYPE {prefix}_{counter}_total counter")
+            for name, metrics in snapshot.items():
+                lines.append(f'{prefix}_{counter}_total{{function="{_escape_label(name)}"}} {metrics[counter]}')
+
+        lines.append(f"# HELP {prefix}_retries_total Retries by the exception that caused them")
+        lines.append(f"# TYPE {prefix}_retries_total counter")
+        for name, metrics in snapshot.items():
+            for exc_name, count in sorted(metrics['retry_exceptions'].items()):
+                lines.append(f'{prefix}_retries_total{{function="{_escape_label(name)}",exception="{_escape_label(exc_name)}"}} {count}')
+
+        lines.append(f"# HELP {prefix}_backoff_seconds_total Seconds spent backing off")
+        lines.append(f"# TYPE {prefix}_backoff_seconds_total counter")
+        for name, metrics in snapshot.items():
+            lines.append(f'{prefix}_backoff_seconds_total{{function="{_escape_label(name)}"}} {metrics["backoff_seconds"]}')
+
+        lines.append(f"# HELP {prefix}_call_duration_seconds Duration of calls including retries and backoff")
+        lines.append(f"# TYPE {prefix}_call_duration_seconds histogram")
+        for name, metrics in snapshot.items():
+            label: str = _escape_label(name)
+            for bound, count in metrics['latency']['buckets'].items():
+                le: str = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f'{prefix}_call_duration_seconds_bucket{{function="{label}",le="{le}"}} {count}')
+            lines.append(f'{prefix}_call_duration_seconds_sum{{function="{label}"}} {metrics["latency"]["sum"]}')
+            lines.append(f'{prefix}_call_duration_seconds_count{{function="{label}"}} {metrics["latency"]["count"]}')
+
+        return '\n'.join(lines) + '\n'
+
+class LatencyTracker:
+
+    """Keeps the latencies of the last window_size successful calls in a preallocated ring buffer
+       and reports percentiles over them, once at least min_samples latencies are recorded.
+
+       The window is sorted at most once every refresh_every recorded latencies, by default every
+       sixteenth of the window, and percentiles in between are read from the last sorted window, so
+       that asking for the hedge delay on every call does not sort the window on every call."""
+
+    def __init__(self, window_size: int = 128, min_samples: int = 16, refresh_every: int = None):
+        check_positive_int('window_size', window_size)
+        if not isinstance(min_samples, int) or isinstance(min_samples, bool) or not 1 <= min_samples <= window_size:
+            raise IncorrectFaultToleranceSpecificationError(f"The parameter min_samples is not an int, but a {type(min_samples)}"
+                                                            f" or the value is not between one and window_size (min_samples={min_samples})")
+        if refresh_every is None:
+            refresh_every = max(1, window_size // 16)
+        check_positive_int('refresh_every', refresh_every)
+        self._samples: array.array = array.array('d', bytes(8 * window_size))
+        self._min_samples: int = min_samples
+        self._refresh_every: int = refresh_every
+        self._count: int = 0
+        self._sorted: PT.List[float] = None
+        self._sorted_at: int = 0
+        self._lock: threading.Lock = threading.Lock()
+
+    def record(self, latency: float) -> None:
+        with self._lock:
+            self._samples[self._count % len(self._samples)] = latency
+            self._count += 1
+
+    def percentile(self, percentile: float) -> PT.Optional[float]:
+
+        """Returns the latency at the given percentile (0 to 100) of the recorded window, as of
+           the last time it was sorted, or None while fewer than min_samples latencies are recorded"""
+
+        with self._lock:
+            if self._count < self._min_samples:
+                return None
+            if self._sorted is None or self._count - self._sorted_at >= self._refresh_every:
+                self._sorted = sorted(self._samples[:min(self._count, len(self._samples))])
+                self._sorted_at = self._count
+            samples: PT.List[float] = self._sorted
+        return samples[min(len(samples) - 1, int(len(samples) * percentile / 100.0))]
@@ -0,0 +1,208 @@
+#MIT License
+#
+#Copyright (c) 2022 I-and-D-Got-Accelerators
+#
+#Permission is hereby granted, free of charge, to any person obtaining a copy
+#of this software and associated documentation files (the "Software"), to deal
+#in the Software without restriction, including without limitation the rights
+#to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#copies of the Software, and to permit persons to whom the Software is
+#furnished to do so, subject to the following conditions:
+#
+#The above copyright notice and this permission notice shall be included in all
+#copies or substantial portions of the Software.
+#
+#THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#SOFTWARE.
+
+import fnmatch
+import types
+import typing as PT
+from fault_tolerance.Exceptions import IncorrectFaultToleranceSpecificationError
+from fault_tolerance.cache import ResultCache
+from fault_tolerance.budget import RetryBudget
+from fault_tolerance.clock import Clock
+from fault_tolerance.decorators import forward_err_recovery_by_retry
+from fault_tolerance.metrics import RetryHooks
+from fault_tolerance.resources import ResourcePool
+
+class RetryPolicy:
+
+    """A retry specification that is validated once, when the policy is created, and can then be
+       applied to any number of functions, as a decorator or by calling it with the function. The
+       parameters are those of forward_err_recovery_by_retry. A policy is immutable, replace returns
+       a new policy with some parameters changed."""
+
+    __slots__ = ('_spec', '_decorator')
+
+    def __init__(self,
+                 max_no_of_retries: int = 1,
+                 exc_lst: PT.List[Exception] = [],
+                 backoff_duration_fn: PT.Callable[[int], float] = None,
+                 retry_budget: RetryBudget = None,
+                 attempt_timeout: float = None,
+                 total_deadline: float = None,
+                 hooks: PT.List[RetryHooks] = [],
+                 resume_fn: PT.Callable[..., PT.Iterable] = None,
+                 result_cache: ResultCache = None,
+                 cache_key_fn: PT.Callable[..., PT.Hashable] = None,
+                 cache_namespace: str = None,
+                 on_failure: PT.Callable[..., None] = None,
+                 prepare_retry: PT.Callable[..., None] = None,
+                 resource_pool: ResourcePool = None,
+                 resource_kwarg: str = 'resource',
+                 clock: Clock = None):
+
+        # the lists are copied, so that the policy cannot be changed behind its back
+        self._spec: PT.Dict[str, PT.Any] = dict(max_no_of_retries=max_no_of_retries, 
+                                                exc_lst=list(exc_lst) if isinstance(exc_lst, list) else exc_lst, 
+                                                backoff_duration_fn=backoff_duration_fn, 
+                                                retry_budget=retry_budget, 
+                                                attempt_timeout=attempt_timeout, 
+                                                total_deadline=total_deadline,
+                                                hooks=list(hooks) if isinstance(hooks, list) else hooks, 
+                                                resume_fn=resume_fn, 
+                                                result_cache=result_cache, 
+                                                cache_key_fn=cache_key_fn,
+                                                cache_namespace=cache_namespace,
+                                                on_failure=on_failure,
+                                                prepare_retry=prepare_retry,
+                                                resource_pool=resource_pool,
+                                                resource_kwarg=resource_kwarg,
+                                                clock=clock)
+        self._decorator: PT.Callable = forward_err_recovery_by_retry(**self._spec)
+
+    @property
+    def spec(self) -> PT.Dict[str, PT.Any]:
+        """The parameters the policy was created with"""
+        return dict(self._spec)
+
+    def replace(self, **changes) -> 'RetryPolicy':
+
+        """Returns a new policy with the given parameters changed, validating only the new specification"""
+
+        return RetryPolicy(**{**self._spec, **changes})
+
+    def __call__(self, fx: PT.Callable) -> PT.Callable:
+        return self._decorator(fx)
+
+    def __repr__(self) -> str:
+        return "RetryPolicy(" + ", ".join(f"{name}={value!r}" for name, value in self._spec.items() if value is not None) + ")"
+
+# the kinds of members a class-level policy is applied to
+_METHOD: int = 0
+_STATIC_METHOD: int = 1
+_CLASS_METHOD: int = 2
+
+class _RetriedMember:
+
+    """Stands in for a method of a class decorated by retry_methods. The policy is applied when the
+       method is first looked up, so that defining a class with many retried methods costs one small
+       object per method, and the retried function then replaces the stand-in in the class, so that
+       later lookups and calls cost what they cost for any method. Nothing is stored on the
+       instances, classes with __slots__ are retried as well."""
+
+    __slots__ = ('_fx', '_policy', '_kind', '_owner', '_name')
+
+    def __init__(self, fx: PT.Callable, policy: RetryPolicy, kind: int, owner: type, name: str):
+        self._fx: PT.Callable = fx
+        self._policy: RetryPolicy = policy
+        self._kind: int = kind
+        self._owner: type = owner
+        self._name: str = name
+
+    @property
+    def __wrapped__(self) -> PT.Callable:
+        return self._fx
+
+    def __get__(self, instance: PT.Any, owner: type = None) -> PT.Any:
+        retried: PT.Callable = self._policy(self._fx)
+        member: PT.Any = retried
+        if self._kind == _STATIC_METHOD:
+            member = staticmethod(retried)
+        elif self._kind == _CLASS_METHOD:
+            member = classmethod(retried)
+        # two threads looking the method up for the first time may both apply the policy, the
+        # results are equivalent and one of them stays in the class
+        if vars(self._owner).get(self._name) is self:
+            setattr(self._owner, self._name, member)
+        return member.__get__(instance, owner)
+
+    def __repr__(self) -> str:
+        return f"<retried member {getattr(self._fx, '__qualname__', self._fx)!r}>"
+
+def _check_selection(policy: PT.Any, pattern: PT.Any, predicate: PT.Any) -> None:
+    if not isinstance(policy, RetryPolicy):
+        raise IncorrectFaultToleranceSpecificationError(f"The parameter policy is incorrect, expected a RetryPolicy, but got '{policy}'")
+    if pattern is not None and not isinstance(pattern, str):
+        raise IncorrectFaultToleranceSpecificationError(f"The parameter pattern is incorrect, expected a shell-style pattern of names such as 'get_*', but got '{pattern}'")
+    if predicate is not None and not isinstance(predicate, PT.Callable):
+        raise IncorrectFaultToleranceSpecificationError(f"The parameter predicate is incorrect, expected a function taking a name and a member, but got '{predicate}'")
+
+def _is_selected(name: str, member: PT.Any, pattern: str, predicate: PT.Callable[[str, PT.Any], bool]) -> bool:
+    # without a pattern and a predicate the public members are selected
+    if pattern is None and predicate is None:
+        return not name.startswith('_')
+    return (pattern is None or fnmatch.fnmatchcase(name, pattern)) and (predicate is None or predicate(name, member))
+
+def retry_methods(policy: RetryPolicy, 
+                  pattern: str = None, 
+                  predicate: PT.Callable[[str, PT.Any], bool] = None) -> PT.Callable[[type], type]:
+
+    """Class decorator applying one policy to the methods defined by the class: the public methods,
+       or those whose names match the shell-style pattern and for which predicate, given the name
+       and the member, returns True. Methods, coroutine and generator methods, staticmethods and
+       classmethods are retried, and so are the getters of properties. Inherited and abstract
+       methods are left as they are."""
+
+    _check_selection(policy, pattern, predicate)
+
+    def decorator(cls: type) -> type:
+        for name, member in list(vars(cls).items()):
+            if not _is_selected(name, member, pattern, predicate):
+                continue
+            if isinstance(member, staticmethod):
+                kind, fx = _STATIC_METHOD, member.__func__
+            elif isinstance(member, classmethod):
+                kind, fx = _CLASS_METHOD, member.__func__
+            elif isinstance(member, property):
+                if member.fget is not None and not getattr(member.fget, '__isabstractmethod__', False):
+                    setattr(cls, name, member.getter(policy(member.fget)))
+                continue
+            elif isinstance(member, types.FunctionType):
+                kind, fx = _METHOD, member
+            else:
+                continue
+            if not isinstance(fx, types.FunctionType) or getattr(fx, '__isabstractmethod__', False):
+                continue
+            setattr(cls, name, _RetriedMember(fx, policy, kind, cls, name))
+        return cls
+    return decorator
+
+def retry_functions(namespace: PT.Union[types.ModuleType, PT.Dict[str, PT.Any]], 
+                    policy: RetryPolicy, 
+                    pattern: str = None, 
+                    predicate: PT.Callable[[str, PT.Any], bool] = None) -> PT.List[str]:
+
+    """Applies one policy to the functions defined in a module, given as the module or as its
+       globals(), selected like the methods by retry_methods. Functions imported from other modules
+       are left as they are. Returns the names of the retried functions."""
+
+    _check_selection(policy, pattern, predicate)
+    if isinstance(namespace, types.ModuleType):
+        namespace = vars(namespace)
+    elif not isinstance(namespace, dict):
+        raise IncorrectFaultToleranceSpecificationError(f"The parameter namespace is incorrect, expected a module or its globals(), but got '{namespace}'")
+
+    module_name: str = namespace.get('__name__')
+    retried: PT.List[str] = []
+    for name, member in list(namespace.items()):
+        if isinstance(member, types.FunctionType) and member.__module__ == module_name and _is_selected(name, member, pattern, predicate):
+            namespace[name] = policy(member)
+            retried.append(name)
+    return retried
@@ -0,0 +1,188 @@
+#MIT License
+#
+#Copyright (c) 2022 I-and-D-Got-Accelerators
+#
+#Permission is hereby granted, free of charge, to any person obtaining a copy
+#of this software and associated documentation files (the "Software"), to deal
+#in the Software without restriction, including without limitation the rights
+#to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#copies of the Software, and to permit persons to whom the Software is
+#furnished to do so, subject to the following conditions:
+#
+#The above copyright notice and this permission notice shall be included in all
+#copies or substantial portions of the Software.
+#
+#THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#SOFTWARE.
+
+import collections
+import contextlib
+import threading
+import typing as PT
+from fault_tolerance.Exceptions import IncorrectFaultToleranceSpecificationError
+from fault_tolerance.checks import check_positive_int, check_positive_number
+from fault_tolerance.limiter import Bulkhead
+
+class ResourcePool:
+
+    """A pool of at most max_size resources, e.g. connections, created by factory on demand.
+
+       A resource is acquired for an attempt and either released back to the pool when the
+       attempt succeeded, or discarded when it failed: a discarded resource is reset by reset if
+       given and returned to the pool, or closed by close and dropped if there is no reset or the
+       reset fails, so that the next attempt gets a healthy resource and the other resources of
+       the pool stay untouched. A resource whose state is unknown, e.g. the resource of an attempt
+       that timed out, is abandoned: it is closed and dropped, never reset. validate, if given, is called on an idle resource before it is
+       handed out, a resource failing validation is closed and replaced.
+
+       Callers wait for a resource in a queue of at most max_waiters callers for at most
+       acquire_timeout seconds (None waits without a timeout), BulkheadFullError is raised when
+       the queue is full or the wait times out. acquire_async waits without blocking the event
+       loop and awaits the factory if it returns an awaitable."""
+
+    def __init__(self, 
+                 factory: PT.Callable[[], PT.Any], 
+                 max_size: int = 10, 
+                 max_waiters: int = 1024, 
+                 acquire_timeout: float = None, 
+                 validate: PT.Callable[[PT.Any], bool] = None, 
+                 reset: PT.Callable[[PT.Any], None] = None, 
+                 close: PT.Callable[[PT.Any], None] = None):
+
+        for name, fn in (('factory', factory), ('validate', validate), ('reset', reset), ('close', close)):
+            if (fn is not None or name == 'factory') and not isinstance(fn, PT.Callable):
+                raise IncorrectFaultToleranceSpecificationError(f"The parameter {name} is incorrect, expected a function, but got '{fn}'")
+        check_positive_int('max_size', max_size)
+        if acquire_timeout is not None:
+            check_positive_number('acquire_timeout', acquire_timeout)
+
+        self._factory: PT.Callable[[], PT.Any] = factory
+        self._validate: PT.Callable[[PT.Any], bool] = validate
+        self._reset: PT.Callable[[PT.Any], None] = reset
+        self._close: PT.Callable[[PT.Any], None] = close
+        self._slots: Bulkhead = Bulkhead(max_concurrent_calls=max_size, max_queue_size=max_waiters, queue_timeout=acquire_timeout)
+        self._idle: PT.Deque[PT.Any] = collections.deque()
+        self._lock: threading.Lock = threading.Lock()
+
+    @property
+    def idle(self) -> int:
+        """The number of idle resources in the pool"""
+        return len(self._idle)
+
+    @property
+    def in_use(self) -> int:
+        """The number of resources acquired and not yet released or discarded"""
+        return self._slots.in_flight
+
+    def _close_quietly(self, resource: PT.Any) -> None:
+        # a resource being dropped is broken already, failing to close it is not an error
+        if self._close is not None:
+            try:
+                self._close(resource)
+            except Exception:
+                pass
+
+    def _idle_resource(self) -> PT.Any:
+        # returns a valid idle resource, or the pool itself if there is none
+        while True:
+            with self._lock:
+                if not self._idle:
+                    return self
+                resource: PT.Any = self._idle.pop()
+            if self._validate is None or self._validate(resource):
+                return resource
+            self._close_quietly(resource)
+
+    def acquire(self) -> PT.Any:
+
+        """Returns an idle or a new resource, waiting if max_size resources are in use"""
+
+        self._slots.acquire()
+        try:
+            resource: PT.Any = self._idle_resource()
+            return resource if resource is not self else self._factory()
+        except BaseException:
+            self._slots.release()
+            raise
+
+    async def acquire_async(self) -> PT.Any:
+
+        """Returns an idle or a new resource, waiting without blocking the event loop if max_size resources are in use"""
+
+        await self._slots.acquire_async()
+        try:
+            resource: PT.Any = self._idle_resource()
+            if resource is self:
+                resource = self._factory()
+                if hasattr(resource, '__await__'):
+                    resource = await resource
+            return resource
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def release(self, resource: PT.Any) -> None:
+
+        """Returns a healthy resource to the pool"""
+
+        with self._lock:
+            self._idle.append(resource)
+        self._slots.release()
+
+    def discard(self, resource: PT.Any) -> None:
+
+        """Resets a resource used by a failed attempt and returns it to the pool, or closes and drops it"""
+
+        try:
+            if self._reset is not None:
+                try:
+                    self._reset(resource)
+                except Exception:
+                    self._close_quietly(resource)
+                else:
+                    with self._lock:
+                        self._idle.append(resource)
+            else:
+                self._close_quietly(resource)
+        finally:
+            self._slots.release()
+
+    def abandon(self, resource: PT.Any) -> None:
+
+        """Closes and drops a resource whose state is unknown, without resetting it or returning it to the pool"""
+
+        try:
+            self._close_quietly(resource)
+        finally:
+            self._slots.release()
+
+    @contextlib.contextmanager
+    def lease(self) -> PT.Iterator[PT.Any]:
+
+        """Acquires a resource for the with block, discarding it if the block raises"""
+
+        resource: PT.Any = self.acquire()
+        try:
+            yield resource
+        except BaseException:
+            self.discard(resource)
+            raise
+        self.release(resource)
+
+    def close(self) -> None:
+
+        """Closes the idle resources"""
+
+        with self._lock:
+            resources: PT.List[PT.Any] = list(self._idle)
+            self._idle.clear()
+        for resource in resources:
+            self._close_quietly(resource)
+
+    def __repr__(self) -> str:
+        return f"ResourcePool(factory={self._factory}, max_size={self._slots.specification[0]}, idle={len(self._idle)}, in_use={self.in_use})"
@@ -0,0 +1,375 @@
+#MIT License
+#
+#Copyright (c) 2022 I-and-D-Got-Accelerators
+#
+#Permission is hereby granted, free of charge, to any person obtaining a copy
+#of this software and associated documentation files (the "Software"), to deal
+#in the Software without restriction, including without limitation the rights
+#to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#copies of the Software, and to permit persons to whom the Software is
+#furnished to do so, subject to the following conditions:
+#
+#The above copyright notice and this permission notice shall be included in all
+#copies or substantial portions of the Software.
+#
+#THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#SOFTWARE.
+
+import contextlib
+import mmap
+import os
+import struct
+import threading
+import time
+import typing as PT
+from fault_tolerance.Exceptions import CircuitOpenError, IncorrectFaultToleranceSpecificationError
+from fault_tolerance.breaker import CircuitBreaker, CLOSED, OPEN, HALF_OPEN
+from fault_tolerance.budget import RetryBudget
+from fault_tolerance.checks import check_positive_int
+
+if os.name == 'nt':
+    import msvcrt
+
+    # msvcrt locks from the current file position, seeking and locking must not interleave between threads
+    _seek_lock: threading.Lock = threading.Lock()
+
+    def _lock_range(fd: int, start: int, length: int) -> None:
+        with _seek_lock:
+            os.lseek(fd, start, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_LOCK, length)
+
+    def _unlock_range(fd: int, start: int, length: int) -> None:
+        with _seek_lock:
+            os.lseek(fd, start, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_UNLCK, length)
+else:
+    import fcntl
+
+    def _lock_range(fd: int, start: int, length: int) -> None:
+        fcntl.lockf(fd, fcntl.LOCK_EX, length, start, os.SEEK_SET)
+
+    def _unlock_range(fd: int, start: int, length: int) -> None:
+        fcntl.lockf(fd, fcntl.LOCK_UN, length, start, os.SEEK_SET)
+
+# the layout of the file: a header followed by max_slots slots of fixed size, each holding the
+# state of one named breaker or budget. A slot is the name, the kind, the breaker state, the
+# number of probes in flight, the number of failures in the ring and its head, the time the
+# breaker opened or became half-open, the budget tokens and a ring of the latest failure times.
+_MAGIC: bytes = b'FTSS'
+_VERSION: int = 1
+_HEADER: struct.Struct = struct.Struct('<4sIII')
+_HEADER_SIZE: int = 64
+_SLOT: struct.Struct = struct.Struct('<48siiiiiidd')
+_MAX_NAME_LENGTH: int = 48
+MAX_FAILURE_THRESHOLD: int = 64
+_RING: struct.Struct = struct.Struct(f'<{MAX_FAILURE_THRESHOLD}d')
+_SLOT_SIZE: int = _SLOT.size + _RING.size
+_INT: struct.Struct = struct.Struct('<i')
+_DOUBLE: struct.Struct = struct.Struct('<d')
+_STATE_OFFSET: int = 52
+_TOKENS_OFFSET: int = 80
+
+_UNUSED: int = 0
+_BREAKER: int = 1
+_BUDGET: int = 2
+_KIND_NAMES: PT.Dict[int, str] = {_BREAKER: 'circuit breaker', _BUDGET: 'retry budget'}
+
+_STATE_CODES: PT.Dict[str, int] = {CLOSED: 0, OPEN: 1, HALF_OPEN: 2}
+_CLOSED_CODE: int = _STATE_CODES[CLOSED]
+_OPEN_CODE: int = _STATE_CODES[OPEN]
+_HALF_OPEN_CODE: int = _STATE_CODES[HALF_OPEN]
+_STATES: PT.Tuple[str, ...] = (CLOSED, OPEN, HALF_OPEN)
+
+# the locks of the threads of this process per file, shared by all SharedStateFile instances of
+# the same file, file locks are held by the process and do not exclude its threads
+_thread_locks: PT.Dict[PT.Tuple[str, int], PT.List[threading.Lock]] = {}
+_thread_locks_lock: threading.Lock = threading.Lock()
+
+class SharedStateFile:
+
+    """A memory-mapped file holding the state of named circuit breakers and retry budgets, shared
+       by all processes of a host mapping the same path, e.g. the workers of a pre-forking server.
+
+       The file has a fixed layout of max_slots slots, one per name. A slot is updated under a
+       lock of its byte range in the file, taken with fcntl.lockf on POSIX and msvcrt.locking on
+       Windows, together with a lock of the process, since file locks do not exclude the threads
+       of a process. Closing a file releases the file locks of the process on it, so it is
+       closed when the process no longer uses any breaker or budget in it. Times are taken from
+       time.monotonic, which is shared by the processes of a host."""
+
+    def __init__(self, path: str, max_slots: int = 256):
+        check_positive_int('max_slots', max_slots)
+        self._path: str = os.fspath(path)
+        self._max_slots: int = max_slots
+        self._size: int = _HEADER_SIZE + max_slots * _SLOT_SIZE
+        self._fd: int = os.open(self._path, os.O_RDWR | os.O_CREAT | getattr(os, 'O_BINARY', 0), 0o600)
+        with _thread_locks_lock:
+            self._thread_locks: PT.List[threading.Lock] = _thread_locks.setdefault((os.path.realpath(self._path), max_slots), 
+                                                                                   [threading.Lock() for _ in range(max_slots + 1)])
+        self._slots: PT.Dict[str, PT.Tuple[int, int]] = {}
+        try:
+            with self._locked(-1):
+                self._initialise()
+            self._mmap: mmap.mmap = mmap.mmap(self._fd, self._size)
+        except BaseException:
+            os.close(self._fd)
+            raise
+
+    def _initialise(self) -> None:
+        # the first process creates the layout, the others check that they agree with it
+        os.lseek(self._fd, 0, os.SEEK_SET)
+        header: bytes = os.read(self._fd, _HEADER.size)
+        if len(header) < _HEADER.size:
+            os.ftruncate(self._fd, self._size)
+            os.lseek(self._fd, 0, os.SEEK_SET)
+            os.write(self._fd, _HEADER.pack(_MAGIC, _VERSION, _SLOT_SIZE, self._max_slots))
+            return
+        magic, version, slot_size, max_slots = _HEADER.unpack(header)
+        if magic != _MAGIC or version != _VERSION or slot_size != _SLOT_SIZE:
+            raise IncorrectFaultToleranceSpecificationError(f"The parameter path is incorrect, '{self._path}' is not a shared state file of this version")
+        if max_slots != self._max_slots:
+            raise IncorrectFaultToleranceSpecificationError(f"The parameter max_slots is incorrect, '{self._path}' has {max_slots} slots (max_slots={self._max_slots})")
+
+    def _offset(self, index: int) -> int:
+        return _HEADER_SIZE + index * _SLOT_SIZE
+
+    @contextlib.contextmanager
+    def _locked(self, index: int) -> PT.Iterator[None]:
+        # index -1 is the header, which guards the allocation of slots
+        start, length = (0, _HEADER_SIZE) if index < 0 else (self._offset(index), _SLOT_SIZE)
+        with self._thread_locks[index + 1]:
+            _lock_range(self._fd, start, length)
+            try:
+                yield
+            finally:
+                _unlock_range(self._fd, start, length)
+
+    def _slot(self, name: str, kind: int, tokens: float = 0.0) -> int:
+
+        """Returns the index of the slot of name, allocating it with tokens if it does not exist yet"""
+
+        cached: PT.Tuple[int, int] = self._slots.get(name)
+        if cached is not None:
+            if cached[1] != kind:
+                raise IncorrectFaultToleranceSpecificationError(f"The parameter name is incorrect, '{name}' is the name of a {_KIND_NAMES[cached[1]]}")
+            return cached[0]
+        encoded: bytes = name.encode('utf-8') if isinstance(name, str) else b''
+        if not encoded or len(encoded) > _MAX_NAME_LENGTH or b'\0' in encoded:
+            raise IncorrectFaultToleranceSpecificationError(f"The parameter name is incorrect, expected a non-empty str of at most {_MAX_NAME_LENGTH} bytes, but got '{name}'")
+        with self._locked(-1):
+            free: int = None
+            for index in range(self._max_slots):
+                slot_name, slot_kind = _SLOT.unpack_from(self._mmap, self._offset(index))[:2]
+                if slot_kind == _UNUSED:
+                    if free is None:
+                        free = index
+                elif slot_name.rstrip(b'\0') == encoded:
+                    if slot_kind != kind:
+                        raise IncorrectFaultToleranceSpecificationError(f"The parameter name is incorrect, '{name}' is the name of a {_KIND_NAMES[slot_kind]}")
+                    self._slots[name] = (index, kind)
+                    return index
+            if free is None:
+                raise IncorrectFaultToleranceSpecificationError(f"The parameter max_slots is incorrect, all {self._max_slots} slots of '{self._path}' are in use")
+            _SLOT.pack_into(self._mmap, self._offset(free), encoded, kind, _CLOSED_CODE, 0, 0, 0, 0, 0.0, float(tokens))
+            _RING.pack_into(self._mmap, self._offset(free) + _SLOT.size, *([0.0] * MAX_FAILURE_THRESHOLD))
+            self._slots[name] = (free, kind)
+            return free
+
+    def names(self) -> PT.List[str]:
+
+        """The names of the breakers and budgets in the file"""
+
+        names: PT.List[str] = []
+        for index in range(self._max_slots):
+            slot_name, slot_kind = _SLOT.unpack_from(self._mmap, self._offset(index))[:2]
+            if slot_kind != _UNUSED:
+                names.append(slot_name.rstrip(b'\0').decode('utf-8'))
+        return names
+
+    def close(self) -> None:
+        self._mmap.close()
+        os.close(self._fd)
+
+    def __enter__(self) -> 'SharedStateFile':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __repr__(self) -> str:
+        return f"SharedStateFile(path={self._path!r}, max_slots={self._max_slots})"
+
+class SharedCircuitBreaker(CircuitBreaker):
+
+    """A circuit breaker whose state is kept in the slot name of a SharedStateFile, so that a
+       breaker opened by one process fails fast in all processes sharing the file. The failures
+       are counted over a sliding window as by CircuitBreaker, the times of the latest
+       failure_threshold failures are kept, so failure_threshold is at most MAX_FAILURE_THRESHOLD.
+       A half-open probe that is not reported back within recovery_timeout, e.g. because its
+       process died, no longer counts as in flight."""
+
+    def __init__(self, 
+                 name: str, 
+                 shared_state: SharedStateFile, 
+                 failure_threshold: int = 5, 
+                 window_duration: float = 60.0, 
+                 recovery_timeout: float = 30.0, 
+                 half_open_max_calls: int = 1):
+        super().__init__(failure_threshold, window_duration, recovery_timeout, half_open_max_calls)
+        if failure_threshold > MAX_FAILURE_THRESHOLD:
+            raise IncorrectFaultToleranceSpecificationError(f"The parameter failure_threshold is above {MAX_FAILURE_THRESHOLD} (failure_threshold={failure_threshold})")
+        if not isinstance(shared_state, SharedStateFile):
+            raise IncorrectFaultToleranceSpecificationError(f"The parameter shared_state is incorrect, expected a SharedStateFile, but got '{shared_state}'")
+        self._name: str = name
+        self._shared_state: SharedStateFile = shared_state
+        self._index: int = shared_state._slot(name, _BREAKER)
+        self._offset: int = shared_state._offset(self._index)
+
+    def _read(self) -> PT.List[PT.Any]:
+        return list(_SLOT.unpack_from(self._shared_state._mmap, self._offset))
+
+    def _write(self, slot: PT.List[PT.Any]) -> None:
+        _SLOT.pack_into(self._shared_state._mmap, self._offset, *slot)
+
+    @property
+    def state(self) -> str:
+        """The current state, one of CLOSED, OPEN or HALF_OPEN"""
+        slot: PT.List[PT.Any] = self._read()
+        if slot[2] == _OPEN_CODE and time.monotonic() - slot[7] >= self._recovery_timeout:
+            return HALF_OPEN
+        return _STATES[slot[2]]
+
+    def before_call(self) -> bool:
+
+        """Admits a call or raises CircuitOpenError. Returns True if the admitted call is a
+           half-open probe, which must be reported back with the probe flag set."""
+
+        # the closed state is the common case and is read without taking the lock
+        if _INT.unpack_from(self._shared_state._mmap, self._offset + _STATE_OFFSET)[0] == _CLOSED_CODE:
+            return False
+
+        with self._shared_state._locked(self._index):
+            slot: PT.List[PT.Any] = self._read()
+            now: float = time.monotonic()
+            if slot[2] == _CLOSED_CODE:
+                return False
+            if slot[2] == _OPEN_CODE:
+                remaining: float = self._recovery_timeout - (now - slot[7])
+                if remaining > 0:
+                    raise CircuitOpenError(f"Circuit breaker is open, failing fast for another {remaining:.3f} seconds")
+                slot[2], slot[3], slot[7] = _HALF_OPEN_CODE, 0, now
+            elif slot[3] >= self._half_open_max_calls:
+                if now - slot[7] < self._recovery_timeout:
+                    raise CircuitOpenError(f"Circuit breaker is half-open and all {self._half_open_max_calls} probe calls are in flight")
+                # the probes in flight are overdue, their processes are taken to have died
+                slot[3], slot[7] = 0, now
+            slot[3] += 1
+            self._write(slot)
+            return True
+
+    def record_success(self, probe: bool) -> None:
+
+        """Reports a successful call, a successful probe closes the breaker"""
+
+        if not probe:
+            return
+        with self._shared_state._locked(self._index):
+            slot: PT.List[PT.Any] = self._read()
+            slot[3] = max(0, slot[3] - 1)
+            if slot[2] == _HALF_OPEN_CODE:
+                slot[2], slot[4], slot[5] = _CLOSED_CODE, 0, 0
+            self._write(slot)
+
+    def record_failure(self, probe: bool) -> None:
+
+        """Reports a failed call, opening the breaker if the threshold is reached or if a probe failed"""
+
+        now: float = time.monotonic()
+        with self._shared_state._locked(self._index):
+            slot: PT.List[PT.Any] = self._read()
+            if probe:
+                slot[3] = max(0, slot[3] - 1)
+                if slot[2] == _HALF_OPEN_CODE:
+                    self._open(slot, now)
+                self._write(slot)
+                return
+            if slot[2] != _CLOSED_CODE:
+                return
+            # the failure times are a ring of MAX_FAILURE_THRESHOLD entries, the threshold is reached
+            # if the failure_threshold-th latest failure is within the window
+            head: int = slot[5]
+            _DOUBLE.pack_into(self._shared_state._mmap, self._offset + _SLOT.size + head * _DOUBLE.size, now)
+            slot[5] = (head + 1) % MAX_FAILURE_THRESHOLD
+            slot[4] = min(slot[4] + 1, MAX_FAILURE_THRESHOLD)
+            if slot[4] >= self._failure_threshold:
+                oldest: int = (slot[5] - self._failure_threshold) % MAX_FAILURE_THRESHOLD
+                if now - _DOUBLE.unpack_from(self._shared_state._mmap, self._offset + _SLOT.size + oldest * _DOUBLE.size)[0] <= self._window_duration:
+                    self._open(slot, now)
+            self._write(slot)
+
+    def record_ignored(self, probe: bool) -> None:
+
+        """Reports a call that failed with an exception not counted as a failure, releasing the probe slot"""
+
+        if not probe:
+            return
+        with self._shared_state._locked(self._index):
+            slot: PT.List[PT.Any] = self._read()
+            slot[3] = max(0, slot[3] - 1)
+            self._write(slot)
+
+    def _open(self, slot: PT.List[PT.Any], now: float) -> None:
+        slot[2], slot[4], slot[5], slot[7] = _OPEN_CODE, 0, 0, now
+
+    def __repr__(self) -> str:
+        return (f"SharedCircuitBreaker(name={self._name!r}, failure_threshold={self._failure_threshold}, window_duration={self._window_duration}, "
+                f"recovery_timeout={self._recovery_timeout}, half_open_max_calls={self._half_open_max_calls}, state={self.state})")
+
+class SharedRetryBudget(RetryBudget):
+
+    """A retry budget whose tokens are kept in the slot name of a SharedStateFile, so that the
+       retries of all processes sharing the file are bounded together. The bucket starts full
+       when the slot is allocated by the first process."""
+
+    def __init__(self, name: str, shared_state: SharedStateFile, max_tokens: float = 10.0, token_ratio: float = 0.1):
+        super().__init__(max_tokens, token_ratio)
+        if not isinstance(shared_state, SharedStateFile):
+            raise IncorrectFaultToleranceSpecificationError(f"The parameter shared_state is incorrect, expected a SharedStateFile, but got '{shared_state}'")
+        self._name: str = name
+        self._shared_state: SharedStateFile = shared_state
+        self._index: int = shared_state._slot(name, _BUDGET, self._max_tokens)
+        self._tokens_offset: int = shared_state._offset(self._index) + _TOKENS_OFFSET
+
+    @property
+    def tokens(self) -> float:
+        """The number of tokens currently available"""
+        return _DOUBLE.unpack_from(self._shared_state._mmap, self._tokens_offset)[0]
+
+    def record_success(self) -> None:
+
+        """Deposits token_ratio tokens for a successful call. When the bucket is full, which is
+           the normal state of a healthy dependency, this returns without taking the lock."""
+
+        if self.tokens >= self._max_tokens:
+            return
+        with self._shared_state._locked(self._index):
+            _DOUBLE.pack_into(self._shared_state._mmap, self._tokens_offset, min(self._max_tokens, self.tokens + self._token_ratio))
+
+    def try_acquire_retry(self) -> bool:
+
+        """Withdraws a token for a retry, returns False if the budget is exhausted"""
+
+        with self._shared_state._locked(self._index):
+            tokens: float = self.tokens
+            if tokens < 1.0:
+                return False
+            _DOUBLE.pack_into(self._shared_state._mmap, self._tokens_offset, tokens - 1.0)
+            return True
+
+    def __repr__(self) -> str:
+        return f"SharedRetryBudget(name={self._name!r}, max_tokens={self._max_tokens}, token_ratio={self._token_ratio}, tokens={self.tokens})"
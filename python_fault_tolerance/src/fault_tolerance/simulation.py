@@ -0,0 +1,246 @@
+#MIT License
+#
+#Copyright (c) 2022 I-and-D-Got-Accelerators
+#
+#Permission is hereby granted, free of charge, to any person obtaining a copy
+#of this software and associated documentation files (the "Software"), to deal
+#in the Software without restriction, including without limitation the rights
+#to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#copies of the Software, and to permit persons to whom the Software is
+#furnished to do so, subject to the following conditions:
+#
+#The above copyright notice and this permission notice shall be included in all
+#copies or substantial portions of the Software.
+#
+#THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#SOFTWARE.
+
+import array
+import collections
+import random
+import time
+import typing as PT
+from fault_tolerance.Exceptions import IncorrectFaultToleranceSpecificationError
+from fault_tolerance.backoff import _rng
+from fault_tolerance.breaker import CircuitBreaker
+from fault_tolerance.checks import check_non_negative_number, check_positive_int
+from fault_tolerance.clock import VirtualClock
+from fault_tolerance.decorators import circuit_breaker
+from fault_tolerance.lazy import lazy_import
+from fault_tolerance.policy import RetryPolicy
+
+asyncio = lazy_import('asyncio', globals())
+
+class SimulatedFailure(Exception):
+
+    """Raised by a call to a simulated dependency that fails"""
+
+    pass
+
+def _check_latency(name: str, latency: PT.Any) -> None:
+    if not isinstance(latency, PT.Callable):
+        check_non_negative_number(name, latency)
+
+class FailureModel:
+
+    """Scripted behaviour of a simulated dependency. A call fails with SimulatedFailure with the
+       probability error_rate, and always during the outages, given as (start, end) pairs of
+       seconds after the start of a simulation run. A successful call takes latency seconds and a
+       failed call failure_latency seconds, which defaults to latency. A latency is a number or a
+       function drawing one from the random number generator of the run, such as
+       lambda rng: rng.lognormvariate(-4.6, 0.5)."""
+
+    def __init__(self, 
+                 error_rate: float = 0.0, 
+                 outages: PT.List[PT.Tuple[float, float]] = [], 
+                 latency: PT.Union[float, PT.Callable[[random.Random], float]] = 0.01, 
+                 failure_latency: PT.Union[float, PT.Callable[[random.Random], float]] = None):
+
+        # check error_rate
+        if isinstance(error_rate, bool) or not isinstance(error_rate, (int, float)) or not 0 <= error_rate <= 1:
+            raise IncorrectFaultToleranceSpecificationError(f"The parameter error_rate is not a number, but a {type(error_rate)}"
+                                                            f" or the value is not between zero and one (error_rate={error_rate})")
+
+        # check outages
+        if not isinstance(outages, (list, tuple)) or not all(isinstance(outage, tuple) and len(outage) == 2 and 0 <= outage[0] < outage[1] for outage in outages):
+            raise IncorrectFaultToleranceSpecificationError(f"The parameter outages is incorrect, expected a list of (start, end) pairs with 0 <= start < end, but got '{outages}'")
+
+        # check latency and failure_latency
+        _check_latency('latency', latency)
+        if failure_latency is not None:
+            _check_latency('failure_latency', failure_latency)
+
+        self._error_rate: float = error_rate
+        self._outages: PT.Tuple[PT.Tuple[float, float], ...] = tuple(outages)
+        self._latency: PT.Union[float, PT.Callable[[random.Random], float]] = latency
+        self._failure_latency: PT.Union[float, PT.Callable[[random.Random], float]] = failure_latency if failure_latency is not None else latency
+
+    def fails(self, elapsed: float, rng: random.Random) -> bool:
+
+        """Whether a call made elapsed seconds after the start of the run fails"""
+
+        for start, end in self._outages:
+            if start <= elapsed < end:
+                return True
+        return self._error_rate > 0 and rng.random() < self._error_rate
+
+    def latency_of(self, failed: bool, rng: random.Random) -> float:
+
+        """The duration of a call in seconds"""
+
+        latency = self._failure_latency if failed else self._latency
+        return max(0.0, latency(rng)) if isinstance(latency, PT.Callable) else latency
+
+    def __repr__(self) -> str:
+        return (f"FailureModel(error_rate={self._error_rate}, outages={list(self._outages)}, latency={self._latency!r}, "
+                f"failure_latency={self._failure_latency!r})")
+
+class SimulationReport:
+
+    """The outcome of a simulation run. Latencies are in milliseconds of virtual time from the
+       first attempt of a call to its result, the wall time is the real time the run took."""
+
+    __slots__ = ('calls', 'successes', 'failures', 'attempts', 'latencies_ms', 'virtual_duration', 'wall_time')
+
+    def __init__(self, 
+                 calls: int, 
+                 successes: int, 
+                 failures: PT.Dict[str, int], 
+                 attempts: int, 
+                 latencies_ms: PT.Sequence[float], 
+                 virtual_duration: float, 
+                 wall_time: float):
+        self.calls: int = calls
+        self.successes: int = successes
+        self.failures: PT.Dict[str, int] = failures
+        self.attempts: int = attempts
+        self.latencies_ms: PT.List[float] = sorted(latencies_ms)
+        self.virtual_duration: float = virtual_duration
+        self.wall_time: float = wall_time
+
+    @property
+    def success_rate(self) -> float:
+        """The share of calls that succeeded"""
+        return self.successes / self.calls if self.calls else 0.0
+
+    @property
+    def load_amplification(self) -> float:
+        """The attempts the dependency received per call, 1.0 without any retry"""
+        return self.attempts / self.calls if self.calls else 0.0
+
+    def latency_percentile(self, percentile: float) -> float:
+
+        """Returns the latency in milliseconds at the given percentile (0 to 100) of all calls"""
+
+        if not self.latencies_ms:
+            return 0.0
+        return self.latencies_ms[min(len(self.latencies_ms) - 1, int(len(self.latencies_ms) * percentile / 100.0))]
+
+    def as_dict(self) -> PT.Dict[str, PT.Any]:
+        return {'calls': self.calls, 'successes': self.successes, 'failures': dict(self.failures), 'attempts': self.attempts,
+                'success_rate': self.success_rate, 'load_amplification': self.load_amplification,
+                'latency_ms': {'p50': self.latency_percentile(50), 'p90': self.latency_percentile(90), 
+                               'p99': self.latency_percentile(99), 'max': self.latency_percentile(100)},
+                'virtual_duration': self.virtual_duration, 'wall_time': self.wall_time}
+
+    def __repr__(self) -> str:
+        return (f"SimulationReport(calls={self.calls}, success_rate={self.success_rate:.4f}, load_amplification={self.load_amplification:.3f}, "
+                f"p50={self.latency_percentile(50):.1f}ms, p99={self.latency_percentile(99):.1f}ms, "
+                f"virtual_duration={self.virtual_duration:.1f}s, wall_time={self.wall_time:.3f}s)")
+
+class Simulation:
+
+    """Drives clients concurrent virtual clients against a dependency behaving as failure_model,
+       on a VirtualClock, so that retry, budget and breaker parameters are compared offline in a
+       fraction of the time the calls would take. Every client makes calls_per_client calls,
+       waiting an exponentially distributed think time with mean think_time seconds before each.
+       Runs with the same seed draw the same failures, latencies and jitter.
+
+       The breakers guarding the dependency must be created with the clock of the simulation, e.g.
+       CircuitBreaker(clock=simulation.clock). A retry budget or an AdaptiveBackoff keeps its state
+       from one run to the next, pass fresh ones to compare runs."""
+
+    def __init__(self, 
+                 failure_model: FailureModel, 
+                 clients: int = 100, 
+                 calls_per_client: int = 10, 
+                 think_time: float = 1.0, 
+                 seed: int = 0):
+
+        if not isinstance(failure_model, FailureModel):
+            raise IncorrectFaultToleranceSpecificationError(f"The parameter failure_model is incorrect, expected a FailureModel, but got '{failure_model}'")
+        check_positive_int('clients', clients)
+        check_positive_int('calls_per_client', calls_per_client)
+        check_non_negative_number('think_time', think_time)
+
+        self._failure_model: FailureModel = failure_model
+        self._clients: int = clients
+        self._calls_per_client: int = calls_per_client
+        self._think_time: float = think_time
+        self._seed: int = seed
+        self.clock: VirtualClock = VirtualClock()
+
+    def run(self, policy: RetryPolicy = None, breaker: CircuitBreaker = None) -> SimulationReport:
+
+        """Runs the clients against the dependency guarded by breaker, if given, with every call
+           retried by policy, if given, and returns the report"""
+
+        # check policy and breaker
+        if policy is not None and not isinstance(policy, RetryPolicy):
+            raise IncorrectFaultToleranceSpecificationError(f"The parameter policy is incorrect, expected a RetryPolicy, but got '{policy}'")
+        if breaker is not None and (not isinstance(breaker, CircuitBreaker) or breaker._clock is not self.clock):
+            raise IncorrectFaultToleranceSpecificationError(f"The parameter breaker is incorrect, expected a CircuitBreaker on the clock of the simulation, but got '{breaker}'")
+
+        clock: VirtualClock = self.clock
+        model: FailureModel = self._failure_model
+        rng: random.Random = random.Random(self._seed)
+        # the jittered backoff policies draw from the generator of the calling thread, the loop runs on it
+        _rng().seed(self._seed)
+        started: float = clock.monotonic()
+        attempts: PT.List[int] = [0]
+        successes: PT.List[int] = [0]
+        failures: PT.Counter[str] = collections.Counter()
+        latencies_ms: array.array = array.array('d')
+
+        async def dependency() -> None:
+            attempts[0] += 1
+            failed: bool = model.fails(clock.monotonic() - started, rng)
+            await asyncio.sleep(model.latency_of(failed, rng))
+            if failed:
+                raise SimulatedFailure()
+
+        call: PT.Callable[[], PT.Awaitable[None]] = dependency
+        if breaker is not None:
+            call = circuit_breaker(exc_lst=[SimulatedFailure], breaker=breaker)(call)
+        if policy is not None:
+            call = policy.replace(clock=clock)(call)
+
+        async def client() -> None:
+            for _ in range(self._calls_per_client):
+                if self._think_time > 0:
+                    await asyncio.sleep(rng.expovariate(1.0 / self._think_time))
+                called_at: float = clock.monotonic()
+                try:
+                    await call()
+                    successes[0] += 1
+                except Exception as e:
+                    failures[type(e).__name__] += 1
+                latencies_ms.append((clock.monotonic() - called_at) * 1e3)
+
+        async def main() -> None:
+            await asyncio.gather(*(client() for _ in range(self._clients)))
+
+        wall_start: float = time.perf_counter()
+        clock.run(main())
+        return SimulationReport(calls=self._clients * self._calls_per_client, 
+                                successes=successes[0], 
+                                failures=dict(failures), 
+                                attempts=attempts[0], 
+                                latencies_ms=latencies_ms, 
+                                virtual_duration=clock.monotonic() - started, 
+                                wall_time=time.perf_counter() - wall_start)
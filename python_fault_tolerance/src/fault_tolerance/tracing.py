@@ -0,0 +1,198 @@
+#MIT License
+#
+#Copyright (c) 2022 I-and-D-Got-Accelerators
+#
+#Permission is hereby granted, free of charge, to any person obtaining a copy
+#of this software and associated documentation files (the "Software"), to deal
+#in the Software without restriction, including without limitation the rights
+#to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#copies of the Software, and to permit persons to whom the Software is
+#furnished to do so, subject to the following conditions:
+#
+#The above copyright notice and this permission notice shall be included in all
+#copies or substantial portions of the Software.
+#
+#THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#SOFTWARE.
+
+import collections
+import threading
+import time
+import typing as PT
+from fault_tolerance.checks import check_positive_int
+from fault_tolerance.lazy import lazy_import
+
+# json is only needed to dump the traces, reprlib to format exceptions with arguments other than a message
+json = lazy_import('json', globals())
+reprlib = lazy_import('reprlib', globals())
+
+# the messages of the exceptions are cut to this length, so that the cost of a trace is bounded
+MAX_EXC_MESSAGE_LENGTH: int = 256
+
+class AttemptTrace(PT.NamedTuple):
+
+    """An attempt of a call: its number, the clock time it started and ended at, the type and the
+       message of the exception it failed with, None if it succeeded, and the backoff slept after
+       it. The start of a first attempt made without timeouts, hooks or resources is not measured,
+       it is None."""
+
+    attempt: int
+    started_at: PT.Optional[float]
+    ended_at: float
+    exc_type: PT.Optional[str]
+    exc_message: PT.Optional[str]
+    backoff: float
+
+class CallTrace:
+
+    """The attempts of a call that failed at least once, the name of the function and whether the
+       call recovered. recorded_at is the Unix time the call ended at."""
+
+    __slots__ = ('name', 'attempts', 'recovered', 'recorded_at')
+
+    def __init__(self, name: str, attempts: PT.Tuple[AttemptTrace, ...], recovered: bool, recorded_at: float):
+        self.name: str = name
+        self.attempts: PT.Tuple[AttemptTrace, ...] = attempts
+        self.recovered: bool = recovered
+        self.recorded_at: float = recorded_at
+
+    @property
+    def backoff(self) -> float:
+        """The total time slept between the attempts"""
+        return sum(attempt.backoff for attempt in self.attempts)
+
+    def as_dict(self) -> PT.Dict[str, PT.Any]:
+        return {'name': self.name, 'recovered': self.recovered, 'recorded_at': self.recorded_at,
+                'attempts': [attempt._asdict() for attempt in self.attempts]}
+
+    def __repr__(self) -> str:
+        return f"CallTrace(name={self.name!r}, attempts={len(self.attempts)}, recovered={self.recovered}, backoff={self.backoff:.3f})"
+
+def _summarize(exc: BaseException) -> PT.Tuple[str, str]:
+
+    """Returns the type and the message of exc, cut to MAX_EXC_MESSAGE_LENGTH. Tracing never changes
+       the outcome of a call, an exception that cannot be formatted is summarized by its type. The
+       message of an exception without a __str__ of its own is its message argument, or a repr of
+       bounded length of its arguments, so that formatting it costs little whatever its arguments."""
+
+    exc_type: str = type(exc).__qualname__
+    try:
+        if type(exc).__str__ is BaseException.__str__:
+            args: tuple = exc.args
+            if len(args) == 1 and isinstance(args[0], str):
+                message: str = args[0]
+            else:
+                message = reprlib.repr(args[0] if len(args) == 1 else args) if args else ""
+        else:
+            message = str(exc)
+        return exc_type, message[:MAX_EXC_MESSAGE_LENGTH]
+    except Exception:
+        return exc_type, exc_type
+
+def _exc_type(exc: PT.Any) -> PT.Optional[str]:
+    # an exception recorded in the ring is replaced by its type and message already
+    if exc is None or isinstance(exc, tuple):
+        return exc[0] if exc is not None else None
+    return type(exc).__qualname__
+
+def _exc_message(exc: PT.Any) -> PT.Optional[str]:
+    if exc is None or isinstance(exc, tuple):
+        return exc[1] if exc is not None else None
+    return _summarize(exc)[1]
+
+def make_trace(name: str, attempts: PT.List[PT.Any], recovered: bool, recorded_at: float = None) -> CallTrace:
+
+    """Builds the trace of a call from the flat list of (started_at, ended_at, exception, backoff)
+       entries kept by the retry loop, recorded at the Unix time recorded_at, or now"""
+
+    return CallTrace(name, 
+                     tuple(AttemptTrace(no + 1, attempts[i], attempts[i + 1], _exc_type(attempts[i + 2]), _exc_message(attempts[i + 2]), attempts[i + 3]) 
+                           for no, i in enumerate(range(0, len(attempts), 4))),
+                     recovered, 
+                     recorded_at if recorded_at is not None else time.time())
+
+class TraceRing:
+
+    """Keeps the attempts of the most recent calls that failed at least once, at most capacity
+       attempts. Recording a call keeps the flat attempts list of the retry loop as it is, with
+       its exceptions replaced by their type and message, so that their tracebacks are not kept
+       alive, and drops the oldest calls beyond capacity attempts. The traces are only built when
+       they are read. Calls that succeed at the first attempt are not recorded at all, nor are
+       calls with more than capacity attempts.
+
+       The ring is not preallocated: writing every attempt field by field into preallocated arrays
+       cost more than the retry itself, so the ring holds on to the lists the calls allocated anyway.
+       Its memory is bounded by capacity nonetheless, an attempt takes four references, three floats,
+       the type name and a message of at most MAX_EXC_MESSAGE_LENGTH characters, at most about 0.5 KiB,
+       so at most about 2 MiB at the default capacity."""
+
+    def __init__(self, capacity: int = 4096):
+
+        check_positive_int('capacity', capacity)
+
+        self.enabled: bool = True
+        self._capacity: int = capacity
+        self._no_of_attempts: int = 0
+        self._calls: PT.Deque[PT.Tuple[str, PT.List[PT.Any], bool, float]] = collections.deque()
+        self._lock: threading.Lock = threading.Lock()
+
+    @property
+    def capacity(self) -> int:
+        """The number of attempts kept"""
+        return self._capacity
+
+    def record(self, name: str, attempts: PT.List[PT.Any], recovered: bool, recorded_at: float = None) -> None:
+
+        """Records a call from the flat list of (started_at, ended_at, exception, backoff) entries
+           kept by the retry loop, which is taken over by the ring"""
+
+        if not self.enabled:
+            return
+        no_of_attempts: int = len(attempts) >> 2
+        if no_of_attempts > self._capacity:
+            return
+        for i in range(2, len(attempts), 4):
+            exc: PT.Any = attempts[i]
+            if exc is not None:
+                attempts[i] = _summarize(exc)
+        call: PT.Tuple = (name, attempts, recovered, recorded_at if recorded_at is not None else time.time())
+        calls: PT.Deque[PT.Tuple] = self._calls
+        with self._lock:
+            calls.append(call)
+            self._no_of_attempts += no_of_attempts
+            while self._no_of_attempts > self._capacity:
+                self._no_of_attempts -= len(calls.popleft()[1]) >> 2
+
+    def traces(self) -> PT.List[CallTrace]:
+
+        """Returns the calls kept, the oldest first"""
+
+        with self._lock:
+            calls: PT.List[PT.Tuple] = list(self._calls)
+        return [make_trace(name, attempts, recovered, recorded_at) for name, attempts, recovered, recorded_at in calls]
+
+    def dump(self, fp: PT.TextIO) -> int:
+
+        """Writes the calls kept to the text file fp as JSON lines, the oldest first, and returns the
+           number of calls written"""
+
+        traces: PT.List[CallTrace] = self.traces()
+        for trace in traces:
+            fp.write(json.dumps(trace.as_dict()) + "\n")
+        return len(traces)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._calls.clear()
+            self._no_of_attempts = 0
+
+    def __repr__(self) -> str:
+        return f"TraceRing(capacity={self._capacity}, enabled={self.enabled})"
+
+# the ring the retry decorators record their calls in
+TRACE_RING: TraceRing = TraceRing()
@@ -0,0 +1,254 @@
+#MIT License
+#
+#Copyright (c) 2022 I-and-D-Got-Accelerators
+#
+#Permission is hereby granted, free of charge, to any person obtaining a copy
+#of this software and associated documentation files (the "Software"), to deal
+#in the Software without restriction, including without limitation the rights
+#to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#copies of the Software, and to permit persons to whom the Software is
+#furnished to do so, subject to the following conditions:
+#
+#The above copyright notice and this permission notice shall be included in all
+#copies or substantial portions of the Software.
+#
+#THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#SOFTWARE.
+
+import functools
+import typing as PT
+from fault_tolerance.Exceptions import IncorrectFaultToleranceSpecificationError, WorkflowFailedError
+from fault_tolerance.cache import ResultCache, default_cache_key
+from fault_tolerance.checks import check_positive_int
+from fault_tolerance.decorators import _is_coroutine_function, _is_generator_function, _is_async_generator_function
+from fault_tolerance.lazy import lazy_import
+
+asyncio = lazy_import('asyncio', globals())
+concurrent = lazy_import('concurrent.futures', globals())
+
+class _Step:
+
+    """A step of a workflow, the function and the names of the steps and parameters it depends on"""
+
+    __slots__ = ('name', 'fx', 'depends_on')
+
+    def __init__(self, name: str, fx: PT.Callable, depends_on: PT.Tuple[str, ...]):
+        self.name: str = name
+        self.fx: PT.Callable = fx
+        self.depends_on: PT.Tuple[str, ...] = depends_on
+
+    def kwargs(self, values: PT.Dict[str, PT.Any]) -> PT.Dict[str, PT.Any]:
+        return {dependency: values[dependency] for dependency in self.depends_on}
+
+class Workflow:
+
+    """A DAG of steps, functions or coroutine functions that are typically decorated with
+       forward_err_recovery_by_retry, so that every step recovers on its own. A step is called with
+       the results of the steps it depends on, and with the parameters of the run it depends on, as
+       keyword arguments named after them. Steps whose dependencies are complete run concurrently,
+       on a thread pool of max_workers threads with run, or as tasks with run_async.
+
+       The result of every completed step is checkpointed in checkpoints, e.g. a SQLiteResultCache
+       keeping them on disk, under the name of the workflow, the run_id and the name of the step.
+       When a step fails, the steps that do not depend on it still complete, and WorkflowFailedError
+       is raised. Running again with the same run_id resumes from the checkpoints, only the failed
+       steps and those depending on them are run, so recovering costs the failed steps and not the
+       whole workflow. The run_id defaults to the parameters of the run, a run with the same run_id
+       as a completed one returns its checkpointed results until the checkpoints are cleared, or
+       until it is run with fresh=True, which runs all steps again and replaces their checkpoints.
+       A run without parameters has no default run_id, with checkpoints it must be given one, so
+       that every run of the workflow does not resume the first one."""
+
+    def __init__(self, name: str, checkpoints: ResultCache = None, max_workers: int = None):
+
+        # check name, checkpoints and max_workers
+        if not isinstance(name, str) or not name:
+            raise IncorrectFaultToleranceSpecificationError(f"The parameter name is incorrect, expected a non-empty str, but got '{name}'")
+        if checkpoints is not None and not isinstance(checkpoints, ResultCache):
+            raise IncorrectFaultToleranceSpecificationError(f"The parameter checkpoints is incorrect, expected a ResultCache, but got '{checkpoints}'")
+        if max_workers is not None:
+            check_positive_int('max_workers', max_workers)
+
+        self._name: str = name
+        self._checkpoints: ResultCache = checkpoints
+        self._max_workers: int = max_workers
+        self._steps: PT.Dict[str, _Step] = {}
+
+    @property
+    def steps(self) -> PT.Tuple[str, ...]:
+        """The names of the steps in the order they were declared"""
+        return tuple(self._steps)
+
+    def step(self, depends_on: PT.List[str] = [], name: str = None) -> PT.Callable:
+
+        """Declares the decorated function as a step depending on the steps and run parameters
+           named in depends_on. The step is named name, or after the function, and the function
+           is returned as it is."""
+
+        if not isinstance(depends_on, list) or any(not isinstance(dependency, str) for dependency in depends_on):
+            raise IncorrectFaultToleranceSpecificationError(f"The parameter depends_on is incorrect, expected a list of names of steps or parameters, but got '{depends_on}'")
+        if name is not None and (not isinstance(name, str) or not name):
+            raise IncorrectFaultToleranceSpecificationError(f"The parameter name is incorrect, expected a non-empty str, but got '{name}'")
+
+        def decorator(fx: PT.Callable) -> PT.Callable:
+            step_name: str = name if name is not None else getattr(fx, '__name__', None)
+            if _is_generator_function(fx) or _is_async_generator_function(fx):
+                raise IncorrectFaultToleranceSpecificationError(f"The generator function '{step_name}' cannot be a step, its result could not be checkpointed")
+            if step_name in self._steps:
+                raise IncorrectFaultToleranceSpecificationError(f"The workflow '{self._name}' already has a step named '{step_name}'")
+            if step_name in depends_on:
+                raise IncorrectFaultToleranceSpecificationError(f"The step '{step_name}' cannot depend on itself")
+            self._steps[step_name] = _Step(step_name, fx, tuple(depends_on))
+            return fx
+        return decorator
+
+    def _check_graph(self, params: PT.Dict[str, PT.Any]) -> None:
+
+        """Raises IncorrectFaultToleranceSpecificationError if a parameter is named like a step, if a
+           dependency is neither a step nor a parameter, or if the steps depend on each other in a cycle"""
+
+        for name in params:
+            if name in self._steps:
+                raise IncorrectFaultToleranceSpecificationError(f"The parameter '{name}' of the run is named like a step of the workflow '{self._name}'")
+        for step in self._steps.values():
+            for dependency in step.depends_on:
+                if dependency not in self._steps and dependency not in params:
+                    raise IncorrectFaultToleranceSpecificationError(f"The step '{step.name}' depends on '{dependency}', which is neither a step nor a parameter of the run")
+        # removes the steps without pending dependencies until none is left, the remaining ones are in a cycle
+        pending: PT.Dict[str, PT.Set[str]] = {step.name: {dependency for dependency in step.depends_on if dependency in self._steps} for step in self._steps.values()}
+        while pending:
+            ready: PT.List[str] = [name for name, dependencies in pending.items() if not dependencies]
+            if not ready:
+                raise IncorrectFaultToleranceSpecificationError(f"The steps {sorted(pending)} of the workflow '{self._name}' depend on each other in a cycle")
+            for name in ready:
+                del pending[name]
+            for dependencies in pending.values():
+                dependencies.difference_update(ready)
+
+    def _run_id(self, run_id: PT.Hashable, fresh: bool, params: PT.Dict[str, PT.Any]) -> PT.Hashable:
+
+        """Returns run_id, or the run_id of the parameters of the run, raises IncorrectFaultToleranceSpecificationError
+           if fresh is not a bool or if a run with checkpoints has neither a run_id nor parameters"""
+
+        if not isinstance(fresh, bool):
+            raise IncorrectFaultToleranceSpecificationError(f"The parameter fresh is incorrect, expected a bool, but got '{fresh}'")
+        if run_id is not None:
+            return run_id
+        if not params and self._checkpoints is not None:
+            raise IncorrectFaultToleranceSpecificationError(f"The parameter run_id is missing, a run of the workflow '{self._name}' without parameters"
+                                                            f" requires a run_id naming the checkpoints to resume from")
+        return default_cache_key(**params)
+
+    def _resume(self, run_id: PT.Hashable, fresh: bool, params: PT.Dict[str, PT.Any]) -> PT.Tuple[PT.Dict[str, PT.Any], PT.Dict[str, PT.Any]]:
+
+        """Returns the values the steps depend on, the parameters and the checkpointed results, and
+           the checkpointed results alone, none if the run is fresh"""
+
+        self._check_graph(params)
+        results: PT.Dict[str, PT.Any] = {}
+        if self._checkpoints is not None and not fresh:
+            for name in self._steps:
+                result = self._checkpoints.get((self._name, run_id, name))
+                if result is not ResultCache.MISSING:
+                    results[name] = result
+        return {**params, **results}, results
+
+    def _ready(self, values: PT.Dict[str, PT.Any], started: PT.Set[str]) -> PT.List[_Step]:
+        return [step for step in self._steps.values()
+                if step.name not in values and step.name not in started and all(dependency in values for dependency in step.depends_on)]
+
+    def _completed(self, run_id: PT.Hashable, step: _Step, result: PT.Any, values: PT.Dict[str, PT.Any], results: PT.Dict[str, PT.Any]) -> None:
+        if self._checkpoints is not None:
+            self._checkpoints.set((self._name, run_id, step.name), result)
+        values[step.name] = results[step.name] = result
+
+    def _outcome(self, results: PT.Dict[str, PT.Any], failures: PT.Dict[str, Exception]) -> PT.Dict[str, PT.Any]:
+        if failures:
+            first: Exception = next(iter(failures.values()))
+            raise WorkflowFailedError(f"Workflow '{self._name}' failed at the steps {list(failures)} after completing {len(results)} of {len(self._steps)} steps",
+                                      results=results, failures=failures) from first
+        return results
+
+    def run(self, run_id: PT.Hashable = None, fresh: bool = False, **params) -> PT.Dict[str, PT.Any]:
+
+        """Runs the steps not completed before in the run run_id, or all of them if fresh, on a thread
+           pool, and returns the results of all steps by their names. A coroutine function step runs
+           on an event loop of its own in its thread."""
+
+        run_id = self._run_id(run_id, fresh, params)
+        values, results = self._resume(run_id, fresh, params)
+        failures: PT.Dict[str, Exception] = {}
+        started: PT.Set[str] = set()
+        running: PT.Dict['concurrent.futures.Future', _Step] = {}
+
+        def call(step: _Step, kwargs: PT.Dict[str, PT.Any]) -> PT.Any:
+            if _is_coroutine_function(step.fx):
+                return asyncio.run(step.fx(**kwargs))
+            return step.fx(**kwargs)
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix=f"fault_tolerance-{self._name}") as pool:
+            while True:
+                for step in self._ready(values, started):
+                    started.add(step.name)
+                    running[pool.submit(call, step, step.kwargs(values))] = step
+                if not running:
+                    break
+                done, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    step: _Step = running.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        failures[step.name] = e
+                    else:
+                        self._completed(run_id, step, result, values, results)
+        return self._outcome(results, failures)
+
+    async def run_async(self, run_id: PT.Hashable = None, fresh: bool = False, **params) -> PT.Dict[str, PT.Any]:
+
+        """Runs the steps not completed before in the run run_id, or all of them if fresh, as tasks of
+           the running event loop, and returns the results of all steps by their names. A plain
+           function step runs on the default executor of the loop, so that it does not block the loop."""
+
+        run_id = self._run_id(run_id, fresh, params)
+        values, results = self._resume(run_id, fresh, params)
+        failures: PT.Dict[str, Exception] = {}
+        started: PT.Set[str] = set()
+        running: PT.Dict[asyncio.Future, _Step] = {}
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+
+        def call(step: _Step, kwargs: PT.Dict[str, PT.Any]) -> asyncio.Future:
+            if _is_coroutine_function(step.fx):
+                return asyncio.ensure_future(step.fx(**kwargs))
+            return loop.run_in_executor(None, functools.partial(step.fx, **kwargs))
+
+        try:
+            while True:
+                for step in self._ready(values, started):
+                    started.add(step.name)
+                    running[call(step, step.kwargs(values))] = step
+                if not running:
+                    break
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    step: _Step = running.pop(future)
+                    try:
+                        result = future.result()
+                    except asyncio.CancelledError:
+                        raise
+                    except Exception as e:
+                        failures[step.name] = e
+                    else:
+                        self._completed(run_id, step, result, values, results)
+        finally:
+            for future in running:
+                future.cancel()
+        return self._outcome(results, failures)
+
+    def __repr__(self) -> str:
+        return f"Workflow({self._name!r}, steps={list(self._steps)})"
@@ -0,0 +1,171 @@
+#MIT License
+#
+#Copyright (c) 2022 I-and-D-Got-Accelerators
+#
+#Permission is hereby granted, free of charge, to any person obtaining a copy
+#of this software and associated documentation files (the "Software"), to deal
+#in the Software without restriction, including without limitation the rights
+#to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#copies of the Software, and to permit persons to whom the Software is
+#furnished to do so, subject to the following conditions:
+#
+#The above copyright notice and this permission notice shall be included in all
+#copies or substantial portions of the Software.
+#
+#THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#SOFTWARE.
+
+import asyncio
+import inspect
+import time
+import pytest
+
+import fault_tolerance
+
+class DummyException(Exception):
+    pass
+
+class TestAsyncSuite:
+
+    def test_coroutine_wrapper_is_coroutine_function(self):
+        """Tests that decorating a coroutine function yields a coroutine function
+           that keeps the name of the decorated function."""
+
+        @fault_tolerance.forward_err_recovery_by_retry(exc_lst=[DummyException])
+        async def dummy():
+            return 42
+
+        assert inspect.iscoroutinefunction(dummy)
+        assert dummy.__name__ == 'dummy'
+        assert asyncio.run(dummy()) == 42
+
+    def test_awaited_failure_is_retried(self):
+        """Tests that a failure raised while awaiting the coroutine is retried until it succeeds."""
+
+        calls = []
+
+        @fault_tolerance.forward_err_recovery_by_retry(max_no_of_retries=3, exc_lst=[DummyException])
+        async def flaky():
+            calls.append(1)
+            if len(calls) < 3:
+                raise DummyException()
+            return 'done'
+
+        assert asyncio.run(flaky()) == 'done'
+        assert len(calls) == 3
+
+    def test_exhaustion_raises_failed_to_recover(self):
+        """Tests that the coroutine wrapper keeps the FailedToRecoverError semantics."""
+
+        calls = []
+
+        @fault_tolerance.forward_err_recovery_by_retry(max_no_of_retries=4, exc_lst=[DummyException])
+        async def faulty():
+            calls.append(1)
+            raise DummyException()
+
+        with pytest.raises(fault_tolerance.FailedToRecoverError):
+            asyncio.run(faulty())
+        assert len(calls) == 4
+
+    def test_unlisted_exception_is_not_retried(self):
+        """Tests that exceptions not in exc_lst are propagated after the first attempt."""
+
+        calls = []
+
+        @fault_tolerance.forward_err_recovery_by_retry(max_no_of_retries=4, exc_lst=[DummyException])
+        async def faulty():
+            calls.append(1)
+            raise ValueError()
+
+        with pytest.raises(ValueError):
+            asyncio.run(faulty())
+        assert len(calls) == 1
+
+    def test_backoff_does_not_block_event_loop(self):
+        """Tests that concurrent retrying coroutines back off concurrently, i.e. the total
+           duration is close to the backoff of a single call and not the sum of them."""
+
+        def backoff(attempt: int) -> float:
+            return 0.1
+
+        @fault_tolerance.forward_err_recovery_by_retry(max_no_of_retries=2, exc_lst=[DummyException], backoff_duration_fn=backoff)
+        async def faulty():
+            raise DummyException()
+
+        async def main():
+            return await asyncio.gather(*[faulty() for _ in range(50)], return_exceptions=True)
+
+        t1 = time.monotonic()
+        results = asyncio.run(main())
+        duration = time.monotonic() - t1
+
+        assert all(isinstance(r, fault_tolerance.FailedToRecoverError) for r in results)
+        assert duration < 1.0
+
+    def test_cancellation_is_not_retried(self):
+        """Tests that cancelling a retrying coroutine cancels it, even if Exception is in exc_lst."""
+
+        calls = []
+
+        @fault_tolerance.forward_err_recovery_by_retry(max_no_of_retries=100, exc_lst=[Exception])
+        async def slow():
+            calls.append(1)
+            await asyncio.sleep(10)
+
+        async def main():
+            task = asyncio.ensure_future(slow())
+            await asyncio.sleep(0.01)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(main())
+        assert len(calls) == 1
+
+    def test_legacy_cancellation_is_not_recovered(self):
+        """Tests that the asynchronous decorators propagate cancellation where CancelledError is an Exception, as before Python 3.8"""
+
+        class LegacyCancelledError(asyncio.CancelledError, Exception):
+            pass
+
+        calls = []
+
+        @fault_tolerance.forward_err_recovery_by_retry(max_no_of_retries=3, exc_lst=[Exception])
+        async def stream():
+            calls.append('stream')
+            yield 1
+            raise LegacyCancelledError()
+
+        async def consume():
+            return [item async for item in stream()]
+
+        @fault_tolerance.forward_err_recovery_by_fallback(exc_lst=[Exception], fallbacks=[lambda: calls.append('fallback')])
+        async def fallible():
+            raise LegacyCancelledError()
+
+        @fault_tolerance.forward_err_recovery_by_hedging(exc_lst=[Exception], max_no_of_hedges=1, hedge_delay=0.01)
+        async def hedged():
+            calls.append('hedged')
+            raise LegacyCancelledError()
+
+        breaker = fault_tolerance.CircuitBreaker(failure_threshold=1)
+
+        @fault_tolerance.circuit_breaker(exc_lst=[Exception], breaker=breaker)
+        async def guarded():
+            raise LegacyCancelledError()
+
+        async def main():
+            # awaited within one coroutine, since Python 3.7 turns a CancelledError leaving a task into a plain one
+            for coro in (consume, fallible, hedged, guarded):
+                with pytest.raises(asyncio.CancelledError):
+                    await coro()
+
+        asyncio.run(main())
+        assert calls == ['stream', 'hedged']
+        assert breaker.state == 'closed'
@@ -0,0 +1,257 @@
+#MIT License
+#
+#Copyright (c) 2022 I-and-D-Got-Accelerators
+#
+#Permission is hereby granted, free of charge, to any person obtaining a copy
+#of this software and associated documentation files (the "Software"), to deal
+#in the Software without restriction, including without limitation the rights
+#to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#copies of the Software, and to permit persons to whom the Software is
+#furnished to do so, subject to the following conditions:
+#
+#The above copyright notice and this permission notice shall be included in all
+#copies or substantial portions of the Software.
+#
+#THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#SOFTWARE.
+
+import threading
+import time
+import pytest
+
+import fault_tolerance
+from fault_tolerance import backoff as ft_backoff
+
+class DummyException(Exception):
+    pass
+
+class TestBackoffPolicySuite:
+
+    def test_incorrect_policy_spec(self):
+        """Tests the error-detection concerning the specification of the policies"""
+
+        with pytest.raises(fault_tolerance.IncorrectFaultToleranceSpecificationError, match=r"^The parameter initial is not a number"):
+            fault_tolerance.ExponentialBackoff(initial=0)
+
+        with pytest.raises(fault_tolerance.IncorrectFaultToleranceSpecificationError, match=r"^The parameter cap is beneath the parameter floor"):
+            fault_tolerance.ConstantBackoff(1.0, floor=2.0, cap=1.0)
+
+        with pytest.raises(fault_tolerance.IncorrectFaultToleranceSpecificationError, match=r"^The parameter floor is not a number"):
+            fault_tolerance.LinearBackoff(0.1, 0.1, floor=-1)
+
+    def test_deterministic_policies(self):
+        """Tests the durations of the policies without jitter, including floor and cap"""
+
+        assert [fault_tolerance.ConstantBackoff(0.5)(a) for a in range(1, 4)] == [0.5, 0.5, 0.5]
+        assert [fault_tolerance.LinearBackoff(1.0, 2.0, cap=4.0)(a) for a in range(1, 5)] == [1.0, 3.0, 4.0, 4.0]
+        assert [fault_tolerance.ExponentialBackoff(1.0, floor=2.0, cap=10.0)(a) for a in range(1, 6)] == [2.0, 2.0, 4.0, 8.0, 10.0]
+        assert [fault_tolerance.FibonacciBackoff(1.0)(a) for a in range(1, 8)] == [1.0, 1.0, 2.0, 3.0, 5.0, 8.0, 13.0]
+
+    def test_exponential_overflow_is_capped(self):
+        """Tests that very large attempt numbers do not overflow"""
+
+        assert fault_tolerance.ExponentialBackoff(1.0, cap=30.0)(100000) == 30.0
+
+    def test_precomputed_schedule(self):
+        """Tests that policies without jitter precompute a schedule and jittered ones do not"""
+
+        schedule = fault_tolerance.ExponentialBackoff(0.1, cap=1.0).schedule(5)
+        assert list(schedule) == pytest.approx([0.1, 0.2, 0.4, 0.8, 1.0])
+        assert len(fault_tolerance.ConstantBackoff(0.1).schedule(10 ** 9)) == ft_backoff.MAX_SCHEDULE_LENGTH
+        assert fault_tolerance.FullJitterBackoff(0.1).schedule(5) is None
+        assert fault_tolerance.DecorrelatedJitterBackoff(0.1).schedule(5) is None
+
+    def test_jittered_policies_stay_within_bounds(self):
+        """Tests that jittered durations are drawn within floor, cap and the policy bounds"""
+
+        full = fault_tolerance.FullJitterBackoff(0.1, cap=1.0)
+        decorrelated = fault_tolerance.DecorrelatedJitterBackoff(0.1, cap=1.0)
+        for attempt in range(1, 200):
+            assert 0.0 <= full(attempt) <= min(1.0, 0.1 * 2 ** (attempt - 1))
+            assert 0.1 <= decorrelated(attempt) <= 1.0
+        assert len(set(full(10) for _ in range(100))) > 1
+
+    def test_jitter_from_many_threads(self):
+        """Tests that jittered policies can be used from many threads at once"""
+
+        policy = fault_tolerance.DecorrelatedJitterBackoff(0.01, cap=0.5)
+        durations = []
+
+        def draw():
+            durations.extend(policy(attempt) for attempt in range(1, 100))
+
+        threads = [threading.Thread(target=draw) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert len(durations) == 8 * 99
+        assert all(0.01 <= d <= 0.5 for d in durations)
+
+    def test_decorrelated_jitter_is_kept_per_call(self):
+        """Tests that decorrelated jitter draws from the previous backoff duration the retry loop passes per call"""
+
+        policy = fault_tolerance.DecorrelatedJitterBackoff(0.01, cap=5.0)
+        for _ in range(100):
+            assert 0.01 <= policy.next_duration(1, 4.0) <= 0.03
+            assert 0.01 <= policy.next_duration(2, 1.0) <= 3.0
+        assert any(policy.next_duration(2, 1.0) > 0.03 for _ in range(100))
+
+        drawn = []
+
+        class RecordingBackoff(fault_tolerance.DecorrelatedJitterBackoff):
+            def next_duration(self, attempt, previous):
+                duration = super().next_duration(attempt, previous)
+                drawn.append((attempt, previous, duration))
+                return duration
+
+        calls = []
+
+        @fault_tolerance.forward_err_recovery_by_retry(max_no_of_retries=4, exc_lst=[DummyException], 
+                                                       backoff_duration_fn=RecordingBackoff(0.001, cap=0.01))
+        def faulty():
+            calls.append(1)
+            if len(calls) % 4:
+                raise DummyException()
+            return 1
+
+        assert faulty() == 1
+        assert faulty() == 1
+        assert [attempt for attempt, _, _ in drawn] == [1, 2, 3, 1, 2, 3]
+        for (_, _, duration), (attempt, previous, _) in zip(drawn, drawn[1:]):
+            assert previous == (duration if attempt > 1 else 0.0)
+
+    def test_policy_as_backoff_duration_fn(self):
+        """Tests that a policy is accepted as backoff_duration_fn without type annotation checks and used by the retry loop"""
+
+        slept = []
+
+        class RecordingBackoff(fault_tolerance.ConstantBackoff):
+            def __call__(self, attempt):
+                slept.append(attempt)
+                return super().__call__(attempt)
+
+        calls = []
+
+        @fault_tolerance.forward_err_recovery_by_retry(max_no_of_retries=3, exc_lst=[DummyException], 
+                                                       backoff_duration_fn=fault_tolerance.LinearBackoff(0.0, 0.01))
+        def faulty():
+            calls.append(1)
+            raise DummyException()
+
+        with pytest.raises(fault_tolerance.FailedToRecoverError):
+            faulty()
+        assert len(calls) == 3
+
+        # the schedule is computed once at decoration time, the loop never calls the policy
+        policy = RecordingBackoff(0.0)
+
+        @fault_tolerance.forward_err_recovery_by_retry(max_no_of_retries=3, exc_lst=[DummyException], backoff_duration_fn=policy)
+        def faulty2():
+            raise DummyException()
+
+        assert slept == [1, 2, 3]
+        with pytest.raises(fault_tolerance.FailedToRecoverError):
+            faulty2()
+        assert slept == [1, 2, 3]
+
+class RateLimitedException(Exception):
+
+    def __init__(self, retry_after):
+        super().__init__("rate limited")
+        self.retry_after = retry_after
+
+class Response:
+
+    def __init__(self, headers):
+        self.headers = headers
+
+class HTTPException(Exception):
+
+    def __init__(self, headers):
+        super().__init__("unavailable")
+        self.response = Response(headers)
+
+class BackoffRecorder(fault_tolerance.RetryHooks):
+
+    def __init__(self):
+        self.durations = []
+
+    def on_retry(self, name, attempt, elapsed, exc, backoff_duration):
+        self.durations.append(backoff_duration)
+
+class TestAdaptiveBackoffSuite:
+
+    def test_incorrect_adaptive_spec(self):
+        """Tests the error-detection concerning the specification of adaptive backoff"""
+
+        with pytest.raises(fault_tolerance.IncorrectFaultToleranceSpecificationError, match=r"^The parameter hint_fn is incorrect"):
+            fault_tolerance.AdaptiveBackoff(hint_fn=None)
+
+        with pytest.raises(fault_tolerance.IncorrectFaultToleranceSpecificationError, match=r"^The parameter smoothing is above one"):
+            fault_tolerance.AdaptiveBackoff(smoothing=1.5)
+
+        with pytest.raises(fault_tolerance.IncorrectFaultToleranceSpecificationError, match=r"^The parameter fallback is incorrect"):
+            fault_tolerance.AdaptiveBackoff(fallback=1.0)
+
+    def test_retry_after_hint(self):
+        """Tests the extraction of retry hints from attributes and headers"""
+
+        assert fault_tolerance.retry_after_hint(RateLimitedException(1.5)) == 1.5
+        assert fault_tolerance.retry_after_hint(HTTPException({'Retry-After': '2'})) == 2.0
+        assert fault_tolerance.retry_after_hint(HTTPException({'Retry-After': 'Wed, 21 Oct 2015 07:28:00 GMT'})) is None
+        assert fault_tolerance.retry_after_hint(RateLimitedException(-1)) is None
+        assert fault_tolerance.retry_after_hint(DummyException()) is None
+
+    def test_hint_is_honoured(self):
+        """Tests that the retry hint of the exception replaces the fallback curve, within the cap"""
+
+        hints = [0.02, 60.0]
+        recorder = BackoffRecorder()
+
+        @fault_tolerance.forward_err_recovery_by_retry(max_no_of_retries=3, exc_lst=[RateLimitedException], hooks=[recorder],
+                                                       backoff_duration_fn=fault_tolerance.AdaptiveBackoff(fallback=fault_tolerance.ConstantBackoff(1.0), cap=0.03))
+        def rate_limited():
+            if hints:
+                raise RateLimitedException(hints.pop(0))
+            return 1
+
+        assert rate_limited() == 1
+        assert recorder.durations == [0.02, 0.03]
+
+    def test_recovery_time_is_learned(self):
+        """Tests that the policy backs off until the expected recovery once a recovery was observed"""
+
+        policy = fault_tolerance.AdaptiveBackoff(fallback=fault_tolerance.ConstantBackoff(0.01), smoothing=0.5)
+        recorder = BackoffRecorder()
+        outage = {'until': 0.0}
+
+        @fault_tolerance.forward_err_recovery_by_retry(max_no_of_retries=20, exc_lst=[DummyException], backoff_duration_fn=policy, hooks=[recorder])
+        def dependency():
+            if time.monotonic() < outage['until']:
+                raise DummyException()
+            return 1
+
+        name = f"{dependency.__module__}.{dependency.__qualname__}"
+        assert policy.recovery_estimate(name) is None
+        outage['until'] = time.monotonic() + 0.05
+        assert dependency() == 1
+        estimate = policy.recovery_estimate(name)
+        assert 0.04 <= estimate
+        assert all(duration == 0.01 for duration in recorder.durations)
+
+        recorder.durations.clear()
+        outage['until'] = time.monotonic() + 0.05
+        assert dependency() == 1
+        assert 0.01 < recorder.durations[0] <= estimate
+        assert len(recorder.durations) <= 2
+
+        before = policy.recovery_estimate(name)
+        policy.record_recovery(name, 0.0, 0.0)
+        assert policy.recovery_estimate(name) == pytest.approx(before / 2)
+        assert policy(1) == 0.01
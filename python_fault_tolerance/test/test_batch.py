@@ -0,0 +1,166 @@
+#MIT License
+#
+#Copyright (c) 2022 I-and-D-Got-Accelerators
+#
+#Permission is hereby granted, free of charge, to any person obtaining a copy
+#of this software and associated documentation files (the "Software"), to deal
+#in the Software without restriction, including without limitation the rights
+#to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#copies of the Software, and to permit persons to whom the Software is
+#furnished to do so, subject to the following conditions:
+#
+#The above copyright notice and this permission notice shall be included in all
+#copies or substantial portions of the Software.
+#
+#THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#SOFTWARE.
+
+import asyncio
+import pytest
+
+import fault_tolerance
+
+class DummyException(Exception):
+    pass
+
+class TestBatchRetrySuite:
+
+    def test_incorrect_batch_spec(self):
+        """Tests the error-detection concerning the specification of the batch retry"""
+
+        with pytest.raises(fault_tolerance.IncorrectFaultToleranceSpecificationError, match=r"^The parameter exc_lst is incorrect"):
+            fault_tolerance.forward_err_recovery_by_batch_retry()
+
+        with pytest.raises(fault_tolerance.IncorrectFaultToleranceSpecificationError, match=r"^The parameter max_no_of_retries is not an int"):
+            fault_tolerance.forward_err_recovery_by_batch_retry(max_no_of_retries=0, exc_lst=[DummyException])
+
+        with pytest.raises(fault_tolerance.IncorrectFaultToleranceSpecificationError, match=r"^The parameter backoff_duration_fn is incorrect"):
+            fault_tolerance.forward_err_recovery_by_batch_retry(exc_lst=[DummyException], backoff_duration_fn=1)
+
+    def test_batch_methods_and_items_arg(self):
+        """Tests retrying bulk methods, items passed as a keyword argument, and items at another position"""
+
+        with pytest.raises(fault_tolerance.IncorrectFaultToleranceSpecificationError, match=r"^The parameter items_arg is incorrect, expected"):
+            fault_tolerance.forward_err_recovery_by_batch_retry(exc_lst=[DummyException], items_arg=-1)
+        with pytest.raises(fault_tolerance.IncorrectFaultToleranceSpecificationError, match=r"^The parameter items_arg is incorrect, .* has no parameter 'rows'"):
+            fault_tolerance.forward_err_recovery_by_batch_retry(exc_lst=[DummyException], items_arg='rows')(lambda items: items)
+
+        class Client:
+            def __init__(self):
+                self.batches = []
+
+            @fault_tolerance.forward_err_recovery_by_batch_retry(max_no_of_retries=2, exc_lst=[DummyException])
+            def bulk_write(self, records, table='t'):
+                self.batches.append((list(records), table))
+                return [DummyException() if record == 2 and len(self.batches) == 1 else f"{table}:{record}" for record in records]
+
+            @classmethod
+            @fault_tolerance.forward_err_recovery_by_batch_retry(exc_lst=[DummyException])
+            async def bulk_read(cls, keys):
+                return [(cls.__name__, key) for key in keys]
+
+        client = Client()
+        assert client.bulk_write([1, 2, 3], table='users') == ['users:1', 'users:2', 'users:3']
+        assert client.batches == [([1, 2, 3], 'users'), ([2], 'users')]
+        client.batches.clear()
+        assert client.bulk_write(records=[1, 2]) == ['t:1', 't:2']
+        assert client.batches == [([1, 2], 't'), ([2], 't')]
+        assert asyncio.run(Client.bulk_read([1])) == [('Client', 1)]
+
+        @fault_tolerance.forward_err_recovery_by_batch_retry(exc_lst=[DummyException], items_arg=1)
+        def bulk_delete(table, keys):
+            return [(table, key) for key in keys]
+
+        assert bulk_delete('t', [1, 2]) == [('t', 1), ('t', 2)]
+        with pytest.raises(TypeError, match=r"missing its items argument"):
+            bulk_delete('t')
+
+    def test_only_failed_items_are_retried(self):
+        """Tests that only the failed items are passed again and that the results keep the original order"""
+
+        batches = []
+        failing = {2: 1, 5: 2}
+
+        @fault_tolerance.forward_err_recovery_by_batch_retry(max_no_of_retries=3, exc_lst=[DummyException])
+        def bulk_write(items):
+            batches.append(list(items))
+            results = []
+            for item in items:
+                if failing.get(item, 0) > 0:
+                    failing[item] -= 1
+                    results.append(DummyException(item))
+                else:
+                    results.append(item * 10)
+            return results
+
+        assert bulk_write(range(8)) == [0, 10, 20, 30, 40, 50, 60, 70]
+        assert batches == [list(range(8)), [2, 5], [5]]
+
+    def test_exhausted_and_unlisted_items(self):
+        """Tests that items failing for good, exhausted or with an unlisted exception, are reported in BatchFailedToRecoverError"""
+
+        batches = []
+
+        @fault_tolerance.forward_err_recovery_by_batch_retry(max_no_of_retries=2, exc_lst=[DummyException])
+        def bulk_write(items):
+            batches.append(list(items))
+            return [DummyException() if item == 'a' else ValueError() if item == 'b' else item for item in items]
+
+        with pytest.raises(fault_tolerance.BatchFailedToRecoverError) as exc_info:
+            bulk_write(['a', 'b', 'c'])
+
+        assert batches == [['a', 'b', 'c'], ['a']]
+        assert sorted(exc_info.value.failures) == [0, 1]
+        assert isinstance(exc_info.value.results[0], DummyException)
+        assert isinstance(exc_info.value.results[1], ValueError)
+        assert exc_info.value.results[2] == 'c'
+        assert isinstance(exc_info.value, fault_tolerance.FailedToRecoverError)
+
+    def test_failure_of_whole_round(self):
+        """Tests that an exception in exc_lst raised by the whole call fails every item of the round, others are raised"""
+
+        calls = []
+
+        @fault_tolerance.forward_err_recovery_by_batch_retry(max_no_of_retries=2, exc_lst=[DummyException])
+        def bulk_write(items, prefix):
+            calls.append(1)
+            if len(calls) == 1:
+                raise DummyException()
+            return [prefix + item for item in items]
+
+        assert bulk_write(['a', 'b'], 'x') == ['xa', 'xb']
+
+        @fault_tolerance.forward_err_recovery_by_batch_retry(max_no_of_retries=2, exc_lst=[DummyException])
+        def broken(items):
+            raise ValueError()
+
+        with pytest.raises(ValueError):
+            broken([1])
+
+    def test_incorrect_batch_result(self):
+        """Tests that a result list of the wrong length is detected"""
+
+        @fault_tolerance.forward_err_recovery_by_batch_retry(exc_lst=[DummyException])
+        def bulk_write(items):
+            return []
+
+        with pytest.raises(fault_tolerance.IncorrectFaultToleranceSpecificationError, match=r"^The batch function is incorrect"):
+            bulk_write([1, 2])
+
+    def test_coroutine_batch(self):
+        """Tests batch retry of a coroutine function"""
+
+        failing = {1}
+
+        @fault_tolerance.forward_err_recovery_by_batch_retry(max_no_of_retries=2, exc_lst=[DummyException])
+        async def bulk_write(items):
+            results = [DummyException() if item in failing else item for item in items]
+            failing.clear()
+            return results
+
+        assert asyncio.run(bulk_write([0, 1, 2])) == [0, 1, 2]
@@ -0,0 +1,157 @@
+#MIT License
+#
+#Copyright (c) 2022 I-and-D-Got-Accelerators
+#
+#Permission is hereby granted, free of charge, to any person obtaining a copy
+#of this software and associated documentation files (the "Software"), to deal
+#in the Software without restriction, including without limitation the rights
+#to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#copies of the Software, and to permit persons to whom the Software is
+#furnished to do so, subject to the following conditions:
+#
+#The above copyright notice and this permission notice shall be included in all
+#copies or substantial portions of the Software.
+#
+#THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#SOFTWARE.
+
+import asyncio
+import time
+import pytest
+
+import fault_tolerance
+from fault_tolerance import breaker as ft_breaker
+
+class DummyException(Exception):
+    pass
+
+class TestCircuitBreakerSuite:
+
+    def test_incorrect_breaker_spec(self):
+        """Tests the error-detection concerning the specification of the circuit breaker"""
+
+        with pytest.raises(fault_tolerance.IncorrectFaultToleranceSpecificationError, match=r"^The parameter exc_lst is incorrect"):
+            fault_tolerance.circuit_breaker()
+
+        with pytest.raises(fault_tolerance.IncorrectFaultToleranceSpecificationError, match=r"^The parameter failure_threshold is not an int"):
+            fault_tolerance.circuit_breaker(exc_lst=[DummyException], failure_threshold=0)
+
+        with pytest.raises(fault_tolerance.IncorrectFaultToleranceSpecificationError, match=r"^The parameter recovery_timeout is not a number"):
+            fault_tolerance.circuit_breaker(exc_lst=[DummyException], recovery_timeout='1')
+
+        with pytest.raises(fault_tolerance.IncorrectFaultToleranceSpecificationError, match=r"^The parameter breaker is incorrect"):
+            fault_tolerance.circuit_breaker(exc_lst=[DummyException], breaker=1)
+
+    def test_breaker_opens_and_fails_fast(self):
+        """Tests that the breaker opens after failure_threshold failures and that subsequent
+           calls fail fast without calling the function."""
+
+        calls = []
+
+        @fault_tolerance.circuit_breaker(exc_lst=[DummyException], failure_threshold=3, recovery_timeout=60)
+        def faulty():
+            calls.append(1)
+            raise DummyException()
+
+        for _ in range(3):
+            with pytest.raises(DummyException):
+                faulty()
+        assert faulty.circuit_breaker.state == ft_breaker.OPEN
+
+        with pytest.raises(fault_tolerance.CircuitOpenError):
+            faulty()
+        assert len(calls) == 3
+
+    def test_unlisted_exceptions_are_not_failures(self):
+        """Tests that exceptions outside exc_lst do not open the breaker"""
+
+        @fault_tolerance.circuit_breaker(exc_lst=[DummyException], failure_threshold=1)
+        def faulty():
+            raise ValueError()
+
+        for _ in range(3):
+            with pytest.raises(ValueError):
+                faulty()
+        assert faulty.circuit_breaker.state == ft_breaker.CLOSED
+
+    def test_half_open_probe_closes_breaker(self):
+        """Tests that after the recovery timeout a successful probe closes the breaker and a failing probe reopens it"""
+
+        fail = [True]
+
+        @fault_tolerance.circuit_breaker(exc_lst=[DummyException], failure_threshold=1, recovery_timeout=0.05)
+        def dependency():
+            if fail[0]:
+                raise DummyException()
+            return 'ok'
+
+        with pytest.raises(DummyException):
+            dependency()
+        assert dependency.circuit_breaker.state == ft_breaker.OPEN
+
+        time.sleep(0.06)
+        assert dependency.circuit_breaker.state == ft_breaker.HALF_OPEN
+        with pytest.raises(DummyException):
+            dependency()
+        assert dependency.circuit_breaker.state == ft_breaker.OPEN
+
+        time.sleep(0.06)
+        fail[0] = False
+        assert dependency() == 'ok'
+        assert dependency.circuit_breaker.state == ft_breaker.CLOSED
+
+    def test_half_open_bounds_probes(self):
+        """Tests that at most half_open_max_calls probes are let through concurrently"""
+
+        breaker = fault_tolerance.CircuitBreaker(failure_threshold=1, recovery_timeout=0.01, half_open_max_calls=2)
+        breaker.record_failure(False)
+        time.sleep(0.02)
+
+        assert breaker.before_call()
+        assert breaker.before_call()
+        with pytest.raises(fault_tolerance.CircuitOpenError):
+            breaker.before_call()
+
+    def test_sliding_window(self):
+        """Tests that failures older than window_duration are forgotten"""
+
+        breaker = fault_tolerance.CircuitBreaker(failure_threshold=2, window_duration=0.05)
+        breaker.record_failure(False)
+        time.sleep(0.06)
+        breaker.record_failure(False)
+        assert breaker.state == ft_breaker.CLOSED
+        breaker.record_failure(False)
+        assert breaker.state == ft_breaker.OPEN
+
+    def test_stacked_with_retry(self):
+        """Tests that an open circuit ends the retry loop immediately, even when the retry
+           decorator recovers from all exceptions."""
+
+        calls = []
+
+        @fault_tolerance.forward_err_recovery_by_retry(max_no_of_retries=10, exc_lst=[Exception])
+        @fault_tolerance.circuit_breaker(exc_lst=[DummyException], failure_threshold=2, recovery_timeout=60)
+        def faulty():
+            calls.append(1)
+            raise DummyException()
+
+        with pytest.raises(fault_tolerance.CircuitOpenError):
+            faulty()
+        assert len(calls) == 2
+
+    def test_coroutine_breaker(self):
+        """Tests that the breaker guards coroutine functions"""
+
+        @fault_tolerance.circuit_breaker(exc_lst=[DummyException], failure_threshold=1, recovery_timeout=60)
+        async def faulty():
+            raise DummyException()
+
+        with pytest.raises(DummyException):
+            asyncio.run(faulty())
+        with pytest.raises(fault_tolerance.CircuitOpenError):
+            asyncio.run(faulty())
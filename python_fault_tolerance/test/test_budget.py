@@ -0,0 +1,109 @@
+#MIT License
+#
+#Copyright (c) 2022 I-and-D-Got-Accelerators
+#
+#Permission is hereby granted, free of charge, to any person obtaining a copy
+#of this software and associated documentation files (the "Software"), to deal
+#in the Software without restriction, including without limitation the rights
+#to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#copies of the Software, and to permit persons to whom the Software is
+#furnished to do so, subject to the following conditions:
+#
+#The above copyright notice and this permission notice shall be included in all
+#copies or substantial portions of the Software.
+#
+#THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#SOFTWARE.
+
+import threading
+import pytest
+
+import fault_tolerance
+
+class DummyException(Exception):
+    pass
+
+class TestRetryBudgetSuite:
+
+    def test_incorrect_budget_spec(self):
+        """Tests the error-detection concerning the specification of the budget and the decorator parameter"""
+
+        with pytest.raises(fault_tolerance.IncorrectFaultToleranceSpecificationError, match=r"^The parameter max_tokens is not a number"):
+            fault_tolerance.RetryBudget(max_tokens=0)
+
+        with pytest.raises(fault_tolerance.IncorrectFaultToleranceSpecificationError, match=r"^The parameter token_ratio is not a number"):
+            fault_tolerance.RetryBudget(token_ratio=-1)
+
+        with pytest.raises(fault_tolerance.IncorrectFaultToleranceSpecificationError, match=r"^The parameter retry_budget is incorrect, expected a RetryBudget"):
+            @fault_tolerance.forward_err_recovery_by_retry(exc_lst=[DummyException], retry_budget=10)
+            def dummy():
+                pass
+
+    def test_budget_shared_across_call_sites(self):
+        """Tests that two decorated functions draw from the same budget and that retries stop
+           once it is exhausted."""
+
+        budget = fault_tolerance.RetryBudget(max_tokens=3, token_ratio=0.5)
+        calls = []
+
+        @fault_tolerance.forward_err_recovery_by_retry(max_no_of_retries=10, exc_lst=[DummyException], retry_budget=budget)
+        def faulty1():
+            calls.append(1)
+            raise DummyException()
+
+        @fault_tolerance.forward_err_recovery_by_retry(max_no_of_retries=10, exc_lst=[DummyException], retry_budget=budget)
+        def faulty2():
+            calls.append(2)
+            raise DummyException()
+
+        with pytest.raises(fault_tolerance.RetryBudgetExhaustedError):
+            faulty1()
+        assert calls == [1, 1, 1, 1]
+
+        with pytest.raises(fault_tolerance.RetryBudgetExhaustedError):
+            faulty2()
+        assert calls == [1, 1, 1, 1, 2]
+
+    def test_budget_exhausted_is_failed_to_recover(self):
+        """Tests that callers handling FailedToRecoverError also handle an exhausted budget"""
+
+        assert issubclass(fault_tolerance.RetryBudgetExhaustedError, fault_tolerance.FailedToRecoverError)
+
+    def test_success_refills_budget(self):
+        """Tests that successful calls deposit tokens, capped at max_tokens"""
+
+        budget = fault_tolerance.RetryBudget(max_tokens=2, token_ratio=0.5)
+        assert budget.try_acquire_retry()
+        assert budget.try_acquire_retry()
+        assert not budget.try_acquire_retry()
+
+        @fault_tolerance.forward_err_recovery_by_retry(exc_lst=[DummyException], retry_budget=budget)
+        def healthy():
+            return 1
+
+        for _ in range(10):
+            healthy()
+        assert budget.tokens == 2.0
+
+    def test_budget_thread_safety(self):
+        """Tests that concurrent withdrawals never hand out more retries than there are tokens"""
+
+        budget = fault_tolerance.RetryBudget(max_tokens=1000, token_ratio=0.1)
+        granted = []
+
+        def withdraw():
+            granted.append(sum(budget.try_acquire_retry() for _ in range(500)))
+
+        threads = [threading.Thread(target=withdraw) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert sum(granted) == 1000
+        assert budget.tokens == 0.0
@@ -0,0 +1,173 @@
+#MIT License
+#
+#Copyright (c) 2022 I-and-D-Got-Accelerators
+#
+#Permission is hereby granted, free of charge, to any person obtaining a copy
+#of this software and associated documentation files (the "Software"), to deal
+#in the Software without restriction, including without limitation the rights
+#to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#copies of the Software, and to permit persons to whom the Software is
+#furnished to do so, subject to the following conditions:
+#
+#The above copyright notice and this permission notice shall be included in all
+#copies or substantial portions of the Software.
+#
+#THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#SOFTWARE.
+
+import asyncio
+import threading
+import time
+import pytest
+
+import fault_tolerance
+
+class DummyException(Exception):
+    pass
+
+class TestBulkheadSuite:
+
+    def test_incorrect_bulkhead_spec(self):
+        """Tests the error-detection concerning the specification of the bulkhead"""
+
+        with pytest.raises(fault_tolerance.IncorrectFaultToleranceSpecificationError, match=r"^The parameter max_concurrent_calls is not an int"):
+            fault_tolerance.bulkhead(max_concurrent_calls=0)
+
+        with pytest.raises(fault_tolerance.IncorrectFaultToleranceSpecificationError, match=r"^The parameter max_queue_size is not an int"):
+            fault_tolerance.bulkhead(max_queue_size=-1)
+
+        with pytest.raises(fault_tolerance.IncorrectFaultToleranceSpecificationError, match=r"^The parameter key is incorrect"):
+            fault_tolerance.bulkhead(key=1)
+
+        fault_tolerance.bulkhead(max_concurrent_calls=2, key='test_incorrect_bulkhead_spec')
+        with pytest.raises(fault_tolerance.IncorrectFaultToleranceSpecificationError, match=r"^The bulkhead with key 'test_incorrect_bulkhead_spec' is already specified differently"):
+            fault_tolerance.bulkhead(max_concurrent_calls=3, key='test_incorrect_bulkhead_spec')
+
+    def test_concurrency_is_capped(self):
+        """Tests that no more than max_concurrent_calls threads are in flight and that queued callers get their turn"""
+
+        in_flight = []
+        peak = [0]
+        lock = threading.Lock()
+
+        @fault_tolerance.bulkhead(max_concurrent_calls=3, max_queue_size=100)
+        def dependency():
+            with lock:
+                in_flight.append(1)
+                peak[0] = max(peak[0], len(in_flight))
+            time.sleep(0.01)
+            with lock:
+                in_flight.pop()
+
+        threads = [threading.Thread(target=dependency) for _ in range(20)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert peak[0] == 3
+        assert dependency.bulkhead.in_flight == 0
+
+    def test_full_queue_fails_fast(self):
+        """Tests that callers fail fast with BulkheadFullError when the queue is full"""
+
+        limiter = fault_tolerance.Bulkhead(max_concurrent_calls=1, max_queue_size=0)
+        limiter.acquire()
+        t1 = time.monotonic()
+        with pytest.raises(fault_tolerance.BulkheadFullError, match=r"^Bulkhead is full"):
+            limiter.acquire()
+        assert time.monotonic() - t1 < 0.1
+        limiter.release()
+        limiter.acquire()
+
+    def test_queue_timeout(self):
+        """Tests that a queued caller gives up after queue_timeout and leaves the queue"""
+
+        limiter = fault_tolerance.Bulkhead(max_concurrent_calls=1, max_queue_size=1, queue_timeout=0.05)
+        limiter.acquire()
+        with pytest.raises(fault_tolerance.BulkheadFullError, match=r"^Bulkhead queue timeout"):
+            limiter.acquire()
+        assert limiter.queued == 0
+        limiter.release()
+        assert limiter.in_flight == 0
+
+    def test_shared_key_between_sync_and_async(self):
+        """Tests that functions with the same key share the limit, threads and coroutines alike"""
+
+        @fault_tolerance.bulkhead(max_concurrent_calls=1, max_queue_size=0, key='test_shared_key_between_sync_and_async')
+        def sync_call():
+            return 1
+
+        @fault_tolerance.bulkhead(max_concurrent_calls=1, max_queue_size=0, key='test_shared_key_between_sync_and_async')
+        async def async_call():
+            return 2
+
+        assert sync_call.bulkhead is async_call.bulkhead
+        sync_call.bulkhead.acquire()
+        with pytest.raises(fault_tolerance.BulkheadFullError):
+            asyncio.run(async_call())
+        sync_call.bulkhead.release()
+        assert asyncio.run(async_call()) == 2
+
+    def test_coroutines_are_queued(self):
+        """Tests that coroutines wait in the queue without blocking the event loop"""
+
+        peak = [0]
+        in_flight = [0]
+
+        @fault_tolerance.bulkhead(max_concurrent_calls=2, max_queue_size=10)
+        async def dependency(i):
+            in_flight[0] += 1
+            peak[0] = max(peak[0], in_flight[0])
+            await asyncio.sleep(0.01)
+            in_flight[0] -= 1
+            return i
+
+        async def main():
+            return await asyncio.gather(*[dependency(i) for i in range(10)])
+
+        assert asyncio.run(main()) == list(range(10))
+        assert peak[0] == 2
+
+    def test_cancelled_waiter_leaves_queue(self):
+        """Tests that a cancelled coroutine leaves the queue and does not leak a slot"""
+
+        limiter = fault_tolerance.Bulkhead(max_concurrent_calls=1, max_queue_size=1)
+
+        async def main():
+            await limiter.acquire_async()
+            task = asyncio.ensure_future(limiter.acquire_async())
+            await asyncio.sleep(0.01)
+            assert limiter.queued == 1
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            limiter.release()
+
+        asyncio.run(main())
+        assert limiter.queued == 0
+        assert limiter.in_flight == 0
+
+    def test_retry_attempts_take_a_slot(self):
+        """Tests that every retry attempt takes a slot and releases it while backing off"""
+
+        in_flight_during_backoff = []
+
+        @fault_tolerance.bulkhead(max_concurrent_calls=1)
+        def dependency():
+            raise DummyException()
+
+        def backoff(attempt: int) -> float:
+            in_flight_during_backoff.append(dependency.bulkhead.in_flight)
+            return 0.0
+
+        retried = fault_tolerance.forward_err_recovery_by_retry(max_no_of_retries=3, exc_lst=[DummyException], backoff_duration_fn=backoff)(dependency)
+
+        with pytest.raises(fault_tolerance.FailedToRecoverError):
+            retried()
+        assert in_flight_during_backoff == [0, 0, 0]
@@ -0,0 +1,246 @@
+#MIT License
+#
+#Copyright (c) 2022 I-and-D-Got-Accelerators
+#
+#Permission is hereby granted, free of charge, to any person obtaining a copy
+#of this software and associated documentation files (the "Software"), to deal
+#in the Software without restriction, including without limitation the rights
+#to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#copies of the Software, and to permit persons to whom the Software is
+#furnished to do so, subject to the following conditions:
+#
+#The above copyright notice and this permission notice shall be included in all
+#copies or substantial portions of the Software.
+#
+#THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#SOFTWARE.
+
+import asyncio
+import os
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+import pytest
+
+import fault_tolerance
+import fault_tolerance.cache as ft_cache
+
+class DummyException(Exception):
+    pass
+
+class TestCacheSuite:
+
+    def test_incorrect_cache_spec(self):
+        """Tests the error-detection concerning the specification of result caches"""
+
+        with pytest.raises(fault_tolerance.IncorrectFaultToleranceSpecificationError, match=r"^The parameter result_cache is incorrect, expected a ResultCache"):
+            fault_tolerance.forward_err_recovery_by_retry(exc_lst=[DummyException], result_cache={})
+
+        with pytest.raises(fault_tolerance.IncorrectFaultToleranceSpecificationError, match=r"^The parameter cache_key_fn is incorrect, it only applies together"):
+            fault_tolerance.forward_err_recovery_by_retry(exc_lst=[DummyException], cache_key_fn=lambda x: x)
+
+        with pytest.raises(fault_tolerance.IncorrectFaultToleranceSpecificationError, match=r"^The parameter result_cache is incorrect, the results of generator function"):
+            @fault_tolerance.forward_err_recovery_by_retry(exc_lst=[DummyException], result_cache=fault_tolerance.InMemoryResultCache())
+            def dummy():
+                yield 1
+
+        with pytest.raises(fault_tolerance.IncorrectFaultToleranceSpecificationError, match=r"^The parameter cache_namespace is incorrect, it only applies together"):
+            fault_tolerance.forward_err_recovery_by_retry(exc_lst=[DummyException], cache_namespace='users')
+
+        with pytest.raises(fault_tolerance.IncorrectFaultToleranceSpecificationError, match=r"^The parameter cache_namespace is incorrect, expected a non-empty str"):
+            fault_tolerance.forward_err_recovery_by_retry(exc_lst=[DummyException], result_cache=fault_tolerance.InMemoryResultCache(), cache_namespace='')
+
+        with pytest.raises(fault_tolerance.IncorrectFaultToleranceSpecificationError, match=r"^The parameter max_entries is not an int"):
+            fault_tolerance.InMemoryResultCache(max_entries=0)
+
+    def test_completed_call_is_not_repeated(self):
+        """Tests that a recovered call caches its result and a repeated call does not redo the work"""
+
+        calls = []
+
+        @fault_tolerance.forward_err_recovery_by_retry(max_no_of_retries=2, exc_lst=[DummyException], 
+                                                       result_cache=fault_tolerance.InMemoryResultCache())
+        def expensive(x):
+            calls.append(x)
+            if len(calls) == 1:
+                raise DummyException()
+            return x * 2
+
+        assert expensive(21) == 42
+        assert expensive(21) == 42
+        assert len(calls) == 2
+        assert expensive(x=1) == 2
+        assert len(calls) == 3
+
+    def test_failures_are_not_cached(self):
+        """Tests that a call which failed to recover is attempted again next time"""
+
+        calls = []
+
+        @fault_tolerance.forward_err_recovery_by_retry(max_no_of_retries=1, exc_lst=[DummyException], 
+                                                       result_cache=fault_tolerance.InMemoryResultCache(), cache_key_fn=lambda request: request["id"])
+        def expensive(request):
+            calls.append(request)
+            if len(calls) == 1:
+                raise DummyException()
+            return "done"
+
+        with pytest.raises(fault_tolerance.FailedToRecoverError):
+            expensive({"id": 7})
+        assert expensive({"id": 7}) == "done"
+        assert expensive({"id": 7, "other": 1}) == "done"
+        assert len(calls) == 2
+
+    def test_lru_and_ttl(self):
+        """Tests that the in-memory cache evicts the least recently used entry and forgets expired entries"""
+
+        cache = fault_tolerance.InMemoryResultCache(max_entries=2, ttl=0.05)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        assert cache.get("a") == 1
+        cache.set("c", 3)
+        assert cache.get("b") is fault_tolerance.ResultCache.MISSING
+        assert cache.get("a") == 1 and cache.get("c") == 3
+        assert len(cache) == 2
+        time.sleep(0.06)
+        assert cache.get("a") is fault_tolerance.ResultCache.MISSING
+
+    def test_sqlite_cache_survives_restart(self, tmp_path):
+        """Tests that the SQLite cache keeps results across instances and evicts beyond max_entries"""
+
+        path = tmp_path / "results.db"
+        cache = fault_tolerance.SQLiteResultCache(path, max_entries=2)
+        cache.set(("f", (1,)), {"value": 1})
+        cache.set(("f", (2,)), None)
+        cache.set(("f", (3,)), [3])
+        cache.close()
+
+        cache = fault_tolerance.SQLiteResultCache(path, max_entries=2)
+        assert cache.get(("f", (1,))) is fault_tolerance.ResultCache.MISSING
+        assert cache.get(("f", (2,))) is None
+        assert cache.get(("f", (3,))) == [3]
+        cache.close()
+
+    def test_sqlite_keys_are_stable(self):
+        """Tests that the keys of the SQLite cache do not depend on the hash seed of the process"""
+
+        key = ("f", ((1, 2.5, None, True, b"x", frozenset({"a", "b", "c"})), (("k", "v"),)))
+        src = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
+        code = f"import fault_tolerance.cache as c; print(c.stable_key_digest({key!r}).hex())"
+        digests = {subprocess.run([sys.executable, '-c', code], env=dict(os.environ, PYTHONPATH=src, PYTHONHASHSEED=seed), 
+                                  capture_output=True, text=True, check=True).stdout.strip()
+                   for seed in ('1', '2', '3')}
+        assert digests == {ft_cache.stable_key_digest(key).hex()}
+        assert ft_cache.stable_key_digest((1,)) != ft_cache.stable_key_digest((1.0,))
+        assert ft_cache.stable_key_digest(("ab", "c")) != ft_cache.stable_key_digest(("a", "bc"))
+
+    def test_sqlite_reads_do_not_write(self, tmp_path):
+        """Tests that reads of the SQLite cache only record the use of results in memory until the next write"""
+
+        path = tmp_path / "results.db"
+        cache = fault_tolerance.SQLiteResultCache(path, max_entries=2)
+        cache.set(("f", (1,)), 1)
+        cache.set(("f", (2,)), 2)
+        observer = sqlite3.connect(str(path))
+        used_at = observer.execute("SELECT used_at FROM results ORDER BY used_at").fetchall()
+
+        assert cache.get(("f", (1,))) == 1
+        assert observer.execute("SELECT used_at FROM results ORDER BY used_at").fetchall() == used_at
+
+        # the read is written with the next write, so that the result read is not evicted
+        cache.set(("f", (3,)), 3)
+        assert cache.get(("f", (1,))) == 1
+        assert cache.get(("f", (2,))) is fault_tolerance.ResultCache.MISSING
+        cache.close()
+        observer.close()
+
+        with pytest.raises(fault_tolerance.IncorrectFaultToleranceSpecificationError, match=r"^The parameter touch_batch_size is not an int"):
+            fault_tolerance.SQLiteResultCache(path, touch_batch_size=0)
+
+    def test_decorations_do_not_share_results(self):
+        """Tests that functions with the same qualified name, closures decorated per instance, keep their results apart"""
+
+        cache = fault_tolerance.InMemoryResultCache()
+
+        def make(prefix):
+            @fault_tolerance.forward_err_recovery_by_retry(exc_lst=[DummyException], result_cache=cache)
+            def lookup(x):
+                return (prefix, x)
+            return lookup
+
+        assert make('a')(1) == ('a', 1)
+        assert make('b')(1) == ('b', 1)
+
+    def test_persistent_cache_requires_namespace(self, tmp_path):
+        """Tests that a persistent cache needs a namespace and shares the results of the namespace across restarts"""
+
+        path = tmp_path / "results.db"
+        with pytest.raises(fault_tolerance.IncorrectFaultToleranceSpecificationError, match=r"^The parameter cache_namespace is missing"):
+            fault_tolerance.forward_err_recovery_by_retry(exc_lst=[DummyException], result_cache=fault_tolerance.SQLiteResultCache(path))
+
+        calls = []
+
+        def make(namespace):
+            @fault_tolerance.forward_err_recovery_by_retry(exc_lst=[DummyException], result_cache=fault_tolerance.SQLiteResultCache(path), 
+                                                           cache_namespace=namespace)
+            def lookup(x):
+                calls.append(namespace)
+                return (namespace, x)
+            return lookup
+
+        assert make('a')(1) == ('a', 1)
+        assert make('a')(1) == ('a', 1)
+        assert make('b')(1) == ('b', 1)
+        assert calls == ['a', 'b']
+
+    def test_concurrent_duplicates_are_collapsed(self):
+        """Tests that concurrent calls with the same key share one execution"""
+
+        calls = []
+        started = threading.Event()
+
+        @fault_tolerance.forward_err_recovery_by_retry(exc_lst=[DummyException], result_cache=fault_tolerance.InMemoryResultCache())
+        def expensive(x):
+            calls.append(x)
+            started.set()
+            time.sleep(0.05)
+            return x + 1
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(expensive(1))) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert results == [2] * 8
+        assert calls == [1]
+
+    def test_async_duplicates_are_collapsed(self):
+        """Tests that concurrent coroutine calls with the same key share one execution, including its failure"""
+
+        calls = []
+
+        @fault_tolerance.forward_err_recovery_by_retry(max_no_of_retries=1, exc_lst=[DummyException], 
+                                                       result_cache=fault_tolerance.InMemoryResultCache())
+        async def expensive(x):
+            calls.append(x)
+            await asyncio.sleep(0.01)
+            if x < 0:
+                raise DummyException()
+            return x + 1
+
+        async def main():
+            assert await asyncio.gather(*(expensive(1) for _ in range(5))) == [2] * 5
+            assert await expensive(1) == 2
+            outcomes = await asyncio.gather(*(expensive(-1) for _ in range(3)), return_exceptions=True)
+            assert all(isinstance(outcome, fault_tolerance.FailedToRecoverError) for outcome in outcomes)
+
+        asyncio.run(main())
+        assert calls == [1, -1]
@@ -0,0 +1,176 @@
+#MIT License
+#
+#Copyright (c) 2022 I-and-D-Got-Accelerators
+#
+#Permission is hereby granted, free of charge, to any person obtaining a copy
+#of this software and associated documentation files (the "Software"), to deal
+#in the Software without restriction, including without limitation the rights
+#to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#copies of the Software, and to permit persons to whom the Software is
+#furnished to do so, subject to the following conditions:
+#
+#The above copyright notice and this permission notice shall be included in all
+#copies or substantial portions of the Software.
+#
+#THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#SOFTWARE.
+
+import asyncio
+import errno
+import pytest
+
+import fault_tolerance
+
+class DummyException(Exception):
+    pass
+
+class HTTPError(Exception):
+
+    def __init__(self, status: int):
+        super().__init__(f"HTTP {status}")
+        self.status = status
+
+class NotFoundError(HTTPError):
+
+    def __init__(self):
+        super().__init__(404)
+
+class TestClassifierSuite:
+
+    def test_incorrect_classifier_spec(self):
+        """Tests the error-detection concerning the specification of exception classifiers"""
+
+        with pytest.raises(fault_tolerance.IncorrectFaultToleranceSpecificationError, match=r"^The parameter exc_type is incorrect"):
+            fault_tolerance.ExceptionClassifier().retry_on(int)
+
+        with pytest.raises(fault_tolerance.IncorrectFaultToleranceSpecificationError, match=r"^The parameter predicate is incorrect"):
+            fault_tolerance.ExceptionClassifier().retry_on(DummyException, predicate=1)
+
+        with pytest.raises(fault_tolerance.IncorrectFaultToleranceSpecificationError, match=r"^The parameter max_no_of_retries is not an int"):
+            fault_tolerance.ExceptionClassifier().retry_on(DummyException, max_no_of_retries=0)
+
+        with pytest.raises(fault_tolerance.IncorrectFaultToleranceSpecificationError, match=r"^The parameter exc_lst is incorrect, expected a list of exceptions or an ExceptionClassifier"):
+            fault_tolerance.forward_err_recovery_by_retry(exc_lst=fault_tolerance.ExceptionClassifier())
+
+        with pytest.raises(fault_tolerance.IncorrectFaultToleranceSpecificationError, match=r"^The parameter exc_lst is incorrect"):
+            fault_tolerance.circuit_breaker(exc_lst=fault_tolerance.ExceptionClassifier().retry_on(DummyException))
+
+    def test_predicates_and_specificity(self):
+        """Tests that the rules of the most specific class apply first and predicates narrow the rules"""
+
+        classifier = (fault_tolerance.ExceptionClassifier()
+                      .retry_on(OSError, predicate=lambda e: e.errno in (errno.ECONNRESET, errno.EAGAIN))
+                      .retry_on(HTTPError, predicate=lambda e: e.status >= 500 or e.status == 429)
+                      .give_up_on(NotFoundError)
+                      .retry_on(HTTPError, predicate=lambda e: e.status == 404))
+
+        assert classifier.is_retryable(OSError(errno.ECONNRESET, "reset"))
+        assert classifier.is_retryable(ConnectionResetError(errno.ECONNRESET, "reset"))
+        assert not classifier.is_retryable(OSError(errno.ENOENT, "missing"))
+        assert classifier.is_retryable(HTTPError(503))
+        assert classifier.is_retryable(HTTPError(429))
+        assert not classifier.is_retryable(HTTPError(400))
+        assert classifier.is_retryable(HTTPError(404))
+        assert not classifier.is_retryable(NotFoundError())
+        assert not classifier.is_retryable(DummyException())
+        assert classifier.rule_for(DummyException()) is None
+        assert len(classifier) == 4
+
+    def test_exception_chains(self):
+        """Tests that an exception is classified by its cause if no rule applies to it"""
+
+        def chained():
+            try:
+                raise DummyException()
+            except DummyException as e:
+                raise RuntimeError("wrapped") from e
+
+        def classify(classifier):
+            try:
+                chained()
+            except RuntimeError as e:
+                return classifier.is_retryable(e)
+
+        assert classify(fault_tolerance.ExceptionClassifier().retry_on(DummyException))
+        assert not classify(fault_tolerance.ExceptionClassifier(follow_cause=False).retry_on(DummyException))
+        assert not classify(fault_tolerance.ExceptionClassifier().retry_on(DummyException).give_up_on(RuntimeError))
+
+    def test_retry_with_classifier(self):
+        """Tests that the decorator retries the exceptions the classifier retries and raises the others"""
+
+        statuses = [503, 429, 400]
+
+        @fault_tolerance.forward_err_recovery_by_retry(max_no_of_retries=5, 
+                                                       exc_lst=fault_tolerance.ExceptionClassifier().retry_on(HTTPError, predicate=lambda e: e.status >= 429))
+        def request():
+            raise HTTPError(statuses.pop(0))
+
+        with pytest.raises(HTTPError, match=r"^HTTP 400$"):
+            request()
+        assert statuses == []
+
+    def test_per_class_overrides(self):
+        """Tests that a rule overrides the max_no_of_retries and the backoff of the decorator"""
+
+        backoffs = []
+
+        def throttled_backoff(attempt: int) -> float:
+            backoffs.append(attempt)
+            return 0.0
+
+        classifier = (fault_tolerance.ExceptionClassifier()
+                      .retry_on(HTTPError, predicate=lambda e: e.status == 429, max_no_of_retries=4, backoff_duration_fn=throttled_backoff)
+                      .retry_on(DummyException))
+        calls = []
+
+        @fault_tolerance.forward_err_recovery_by_retry(max_no_of_retries=2, exc_lst=classifier)
+        def throttled():
+            calls.append(1)
+            raise HTTPError(429)
+
+        with pytest.raises(fault_tolerance.FailedToRecoverError, match=r"after 4 attempts$"):
+            throttled()
+        assert len(calls) == 4
+        assert backoffs == [1, 2, 3, 4]
+
+        @fault_tolerance.forward_err_recovery_by_retry(max_no_of_retries=2, exc_lst=classifier)
+        def failing():
+            calls.append(2)
+            raise DummyException()
+
+        with pytest.raises(fault_tolerance.FailedToRecoverError, match=r"after 2 attempts$"):
+            failing()
+        assert calls.count(2) == 2
+        assert backoffs == [1, 2, 3, 4]
+
+    def test_async_and_streaming_with_classifier(self):
+        """Tests that coroutine and generator functions are retried as the classifier decides"""
+
+        classifier = fault_tolerance.ExceptionClassifier().retry_on(HTTPError, predicate=lambda e: e.status >= 500, max_no_of_retries=3)
+        calls = []
+
+        @fault_tolerance.forward_err_recovery_by_retry(exc_lst=classifier)
+        async def request():
+            calls.append(1)
+            if len(calls) < 3:
+                raise HTTPError(502)
+            return "ok"
+
+        assert asyncio.run(request()) == "ok"
+        assert len(calls) == 3
+
+        failures = [HTTPError(500), HTTPError(503)]
+
+        @fault_tolerance.forward_err_recovery_by_retry(exc_lst=classifier)
+        def stream():
+            for i in range(3):
+                if i == 1 and failures:
+                    raise failures.pop(0)
+                yield i
+
+        assert list(stream()) == [0, 1, 2]
@@ -0,0 +1,141 @@
+#MIT License
+#
+#Copyright (c) 2022 I-and-D-Got-Accelerators
+#
+#Permission is hereby granted, free of charge, to any person obtaining a copy
+#of this software and associated documentation files (the "Software"), to deal
+#in the Software without restriction, including without limitation the rights
+#to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#copies of the Software, and to permit persons to whom the Software is
+#furnished to do so, subject to the following conditions:
+#
+#The above copyright notice and this permission notice shall be included in all
+#copies or substantial portions of the Software.
+#
+#THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#SOFTWARE.
+
+import concurrent.futures
+import multiprocessing
+import threading
+import time
+import pytest
+
+import fault_tolerance
+
+class DummyException(Exception):
+    pass
+
+def fails_on_odd_attempts(path: str) -> int:
+    """Fails every first attempt, the attempts are counted in a file so that it works across processes"""
+    with open(path, 'a+') as f:
+        f.seek(0)
+        attempts = len(f.read())
+        f.write('x')
+    if attempts % 2 == 0:
+        raise DummyException()
+    return attempts
+
+class TestRetryingExecutorSuite:
+
+    def test_incorrect_executor_spec(self):
+        """Tests the error-detection concerning the specification of the executor"""
+
+        with pytest.raises(fault_tolerance.IncorrectFaultToleranceSpecificationError, match=r"^The parameter exc_lst is incorrect"):
+            fault_tolerance.RetryingExecutor()
+
+        with pytest.raises(fault_tolerance.IncorrectFaultToleranceSpecificationError, match=r"^The parameter executor is incorrect"):
+            fault_tolerance.RetryingExecutor(exc_lst=[DummyException], executor=1)
+
+    def test_failed_tasks_are_retried(self):
+        """Tests that failed tasks are retried and their results returned through the futures"""
+
+        attempts = {}
+        lock = threading.Lock()
+
+        def flaky(i):
+            with lock:
+                attempts[i] = attempts.get(i, 0) + 1
+                if attempts[i] < 3:
+                    raise DummyException()
+            return i * 2
+
+        with fault_tolerance.RetryingExecutor(max_no_of_retries=3, exc_lst=[DummyException], max_workers=4) as executor:
+            futures = [executor.submit(flaky, i) for i in range(50)]
+            assert [future.result() for future in futures] == [i * 2 for i in range(50)]
+        assert all(count == 3 for count in attempts.values())
+
+    def test_exhaustion_and_unlisted_exceptions(self):
+        """Tests that exhausted tasks fail with FailedToRecoverError caused by the last exception and others fail at once"""
+
+        def faulty():
+            raise DummyException()
+
+        def broken():
+            raise ValueError()
+
+        with fault_tolerance.RetryingExecutor(max_no_of_retries=2, exc_lst=[DummyException]) as executor:
+            with pytest.raises(fault_tolerance.FailedToRecoverError) as exc_info:
+                executor.submit(faulty).result()
+            assert isinstance(exc_info.value.__cause__, DummyException)
+            with pytest.raises(ValueError):
+                executor.submit(broken).result()
+
+    def test_backoff_does_not_occupy_workers(self):
+        """Tests that a task backing off does not keep a worker busy, other tasks run meanwhile"""
+
+        def backoff(attempt: int) -> float:
+            return 0.3
+
+        calls = []
+
+        def faulty_once():
+            calls.append(1)
+            if len(calls) == 1:
+                raise DummyException()
+            return 'recovered'
+
+        with fault_tolerance.RetryingExecutor(max_no_of_retries=2, exc_lst=[DummyException], backoff_duration_fn=backoff, max_workers=1) as executor:
+            backing_off = executor.submit(faulty_once)
+            time.sleep(0.05)
+            t1 = time.monotonic()
+            assert executor.submit(lambda: 'ready').result() == 'ready'
+            assert time.monotonic() - t1 < 0.2
+            assert backing_off.result() == 'recovered'
+
+    def test_map_and_map_unordered(self):
+        """Tests the streaming results of map, in order, and map_unordered, as completed"""
+
+        def square(x):
+            time.sleep(0.001 * (10 - x))
+            return x * x
+
+        with fault_tolerance.RetryingExecutor(exc_lst=[DummyException], max_workers=4) as executor:
+            assert list(executor.map(square, range(10))) == [x * x for x in range(10)]
+            assert sorted(executor.map_unordered(square, range(10))) == [x * x for x in range(10)]
+
+    def test_process_pool(self, tmp_path):
+        """Tests retrying on a process pool"""
+
+        try:
+            context = multiprocessing.get_context('fork')
+        except ValueError:
+            pytest.skip("the fork start method is not available")
+
+        with concurrent.futures.ProcessPoolExecutor(max_workers=2, mp_context=context) as pool:
+            with fault_tolerance.RetryingExecutor(max_no_of_retries=2, exc_lst=[DummyException], executor=pool) as executor:
+                futures = [executor.submit(fails_on_odd_attempts, str(tmp_path / f"{i}.txt")) for i in range(4)]
+                assert [future.result() for future in futures] == [1, 1, 1, 1]
+
+    def test_submit_after_shutdown(self):
+        """Tests that no calls are accepted after shutdown"""
+
+        executor = fault_tolerance.RetryingExecutor(exc_lst=[DummyException])
+        executor.shutdown()
+        with pytest.raises(RuntimeError):
+            executor.submit(lambda: 1)
@@ -0,0 +1,186 @@
+#MIT License
+#
+#Copyright (c) 2022 I-and-D-Got-Accelerators
+#
+#Permission is hereby granted, free of charge, to any person obtaining a copy
+#of this software and associated documentation files (the "Software"), to deal
+#in the Software without restriction, including without limitation the rights
+#to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#copies of the Software, and to permit persons to whom the Software is
+#furnished to do so, subject to the following conditions:
+#
+#The above copyright notice and this permission notice shall be included in all
+#copies or substantial portions of the Software.
+#
+#THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#SOFTWARE.
+
+import asyncio
+import time
+import pytest
+
+import fault_tolerance
+
+class DummyException(Exception):
+    pass
+
+class OtherException(Exception):
+    pass
+
+class TestFallbackSuite:
+
+    def test_incorrect_fallback_spec(self):
+        """Tests the error-detection concerning the specification of fallbacks"""
+
+        with pytest.raises(fault_tolerance.IncorrectFaultToleranceSpecificationError, match=r"^The parameter exc_lst is incorrect"):
+            fault_tolerance.forward_err_recovery_by_fallback(fallbacks=[print])
+
+        with pytest.raises(fault_tolerance.IncorrectFaultToleranceSpecificationError, match=r"^The parameter fallbacks is incorrect"):
+            fault_tolerance.forward_err_recovery_by_fallback(exc_lst=[DummyException])
+
+        with pytest.raises(fault_tolerance.IncorrectFaultToleranceSpecificationError, match=r"^The parameter fallbacks is incorrect"):
+            fault_tolerance.forward_err_recovery_by_fallback(exc_lst=[DummyException], fallbacks=[1])
+
+        with pytest.raises(fault_tolerance.IncorrectFaultToleranceSpecificationError, match=r"^The parameter exc_lst is incorrect"):
+            fault_tolerance.Fallback(print, exc_lst=[])
+
+        with pytest.raises(fault_tolerance.IncorrectFaultToleranceSpecificationError, match=r"^The parameter cache_key_fn is incorrect"):
+            fault_tolerance.forward_err_recovery_by_fallback(exc_lst=[DummyException], fallbacks=[print], cache_key_fn=str)
+
+        with pytest.raises(fault_tolerance.IncorrectFaultToleranceSpecificationError, match=r"^The generator function"):
+            @fault_tolerance.forward_err_recovery_by_fallback(exc_lst=[DummyException], fallbacks=[print])
+            def dummy():
+                yield 1
+
+    def test_chain_of_alternatives(self):
+        """Tests that the alternatives are tried in order, each falling through on its own exceptions"""
+
+        calls = []
+
+        def replica(key):
+            calls.append('replica')
+            raise OtherException()
+
+        def default(key):
+            calls.append('default')
+            return 'default'
+
+        @fault_tolerance.forward_err_recovery_by_fallback(exc_lst=[fault_tolerance.FailedToRecoverError], 
+                                                          fallbacks=[fault_tolerance.Fallback(replica, exc_lst=[OtherException]), default])
+        @fault_tolerance.forward_err_recovery_by_retry(max_no_of_retries=2, exc_lst=[DummyException])
+        def primary(key):
+            calls.append('primary')
+            raise DummyException()
+
+        assert primary('key') == 'default'
+        assert calls == ['primary', 'primary', 'replica', 'default']
+
+        @fault_tolerance.forward_err_recovery_by_fallback(exc_lst=[DummyException], fallbacks=[replica])
+        def unrecoverable(key):
+            raise DummyException()
+
+        with pytest.raises(OtherException):
+            unrecoverable('key')
+
+        @fault_tolerance.forward_err_recovery_by_fallback(exc_lst=[DummyException, OtherException], fallbacks=[replica])
+        def exhausted(key):
+            raise DummyException()
+
+        with pytest.raises(fault_tolerance.FailedToRecoverError, match=r"^Failed to recover from exceptions after 1 fallbacks") as exc_info:
+            exhausted('key')
+        assert isinstance(exc_info.value.__cause__, OtherException)
+
+    def test_stale_results(self):
+        """Tests that the last good result for the same arguments is served while it is not older than the maximum staleness"""
+
+        stale = fault_tolerance.InMemoryResultCache(max_entries=2, ttl=0.05)
+        healthy = [True]
+
+        @fault_tolerance.forward_err_recovery_by_fallback(exc_lst=[DummyException], fallbacks=[stale, lambda key: None])
+        def fetch(key):
+            if not healthy[0]:
+                raise DummyException()
+            return key.upper()
+
+        assert fetch('a') == 'A' and fetch('b') == 'B'
+        healthy[0] = False
+        assert fetch('a') == 'A'
+        assert fetch('c') is None
+        time.sleep(0.06)
+        assert fetch('a') is None
+
+    def test_storing_stale_results_is_best_effort(self):
+        """Tests that a call whose result cannot be cached, with unhashable arguments or a failing cache, returns its result"""
+
+        class BrokenCache(fault_tolerance.InMemoryResultCache):
+            def set(self, key, value):
+                raise OSError("disk full")
+
+        stale = fault_tolerance.InMemoryResultCache()
+        healthy = [True]
+
+        @fault_tolerance.forward_err_recovery_by_fallback(exc_lst=[DummyException], fallbacks=[BrokenCache(), stale, lambda rows, options: 'default'])
+        def query(rows, options):
+            if not healthy[0]:
+                raise DummyException()
+            return len(rows)
+
+        assert query([1, 2], {'limit': 1}) == 2
+        assert query((1, 2), None) == 2
+        healthy[0] = False
+        assert query([1, 2], {'limit': 1}) == 'default'
+        assert query((1, 2), None) == 2
+
+    def test_async_fallback(self):
+        """Tests that coroutine functions fall back to coroutine functions and plain functions alike"""
+
+        stale = fault_tolerance.InMemoryResultCache()
+        healthy = [True]
+
+        async def replica(key):
+            await asyncio.sleep(0)
+            if key == 'missing':
+                raise DummyException()
+            return f"replica {key}"
+
+        @fault_tolerance.forward_err_recovery_by_fallback(exc_lst=[DummyException], fallbacks=[stale, replica, lambda key: 'default'], 
+                                                          cache_key_fn=lambda key: key)
+        async def fetch(key):
+            if not healthy[0]:
+                raise DummyException()
+            return f"primary {key}"
+
+        async def main():
+            first = await fetch('a')
+            healthy[0] = False
+            return first, await fetch('a'), await fetch('b'), await fetch('missing')
+
+        assert asyncio.run(main()) == ('primary a', 'primary a', 'replica b', 'default')
+
+    def test_fallback_caches_are_per_decoration(self, tmp_path):
+        """Tests that functions with the same qualified name do not serve each other's stale results, and that a persistent cache needs a namespace"""
+
+        stale = fault_tolerance.InMemoryResultCache()
+
+        def make(prefix, healthy):
+            @fault_tolerance.forward_err_recovery_by_fallback(exc_lst=[DummyException], fallbacks=[stale, lambda x: 'default'])
+            def fetch(x):
+                if not healthy[0]:
+                    raise DummyException()
+                return (prefix, x)
+            return fetch
+
+        a_healthy, b_healthy = [True], [False]
+        fetch_a, fetch_b = make('a', a_healthy), make('b', b_healthy)
+        assert fetch_a(1) == ('a', 1)
+        assert fetch_b(1) == 'default'
+        a_healthy[0] = False
+        assert fetch_a(1) == ('a', 1)
+
+        with pytest.raises(fault_tolerance.IncorrectFaultToleranceSpecificationError, match=r"^The parameter cache_namespace is missing"):
+            fault_tolerance.forward_err_recovery_by_fallback(exc_lst=[DummyException], fallbacks=[fault_tolerance.SQLiteResultCache(tmp_path / 'stale.db')])
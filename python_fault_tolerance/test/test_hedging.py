@@ -0,0 +1,204 @@
+#MIT License
+#
+#Copyright (c) 2022 I-and-D-Got-Accelerators
+#
+#Permission is hereby granted, free of charge, to any person obtaining a copy
+#of this software and associated documentation files (the "Software"), to deal
+#in the Software without restriction, including without limitation the rights
+#to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#copies of the Software, and to permit persons to whom the Software is
+#furnished to do so, subject to the following conditions:
+#
+#The above copyright notice and this permission notice shall be included in all
+#copies or substantial portions of the Software.
+#
+#THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#SOFTWARE.
+
+import asyncio
+import concurrent.futures
+import threading
+import time
+import pytest
+
+import fault_tolerance
+
+class DummyException(Exception):
+    pass
+
+class TestHedgingSuite:
+
+    def test_incorrect_hedging_spec(self):
+        """Tests the error-detection concerning the specification of hedging"""
+
+        with pytest.raises(fault_tolerance.IncorrectFaultToleranceSpecificationError, match=r"^The parameter exc_lst is incorrect"):
+            fault_tolerance.forward_err_recovery_by_hedging()
+
+        with pytest.raises(fault_tolerance.IncorrectFaultToleranceSpecificationError, match=r"^The parameter max_no_of_hedges is not an int"):
+            fault_tolerance.forward_err_recovery_by_hedging(exc_lst=[DummyException], max_no_of_hedges=0)
+
+        with pytest.raises(fault_tolerance.IncorrectFaultToleranceSpecificationError, match=r"^The parameter hedge_percentile is incorrect"):
+            fault_tolerance.forward_err_recovery_by_hedging(exc_lst=[DummyException], hedge_percentile=100)
+
+        with pytest.raises(fault_tolerance.IncorrectFaultToleranceSpecificationError, match=r"^The parameter executor is incorrect"):
+            fault_tolerance.forward_err_recovery_by_hedging(exc_lst=[DummyException], executor=1)
+
+        with pytest.raises(fault_tolerance.IncorrectFaultToleranceSpecificationError, match=r"^The parameter clock is incorrect"):
+            fault_tolerance.forward_err_recovery_by_hedging(exc_lst=[DummyException], clock=time)
+
+    def test_slow_attempt_is_hedged(self):
+        """Tests that a slow first attempt is overtaken by a hedged attempt"""
+
+        calls = []
+        lock = threading.Lock()
+
+        @fault_tolerance.forward_err_recovery_by_hedging(exc_lst=[DummyException], max_no_of_hedges=1, hedge_delay=0.02)
+        def sometimes_slow():
+            with lock:
+                calls.append(1)
+                attempt = len(calls)
+            if attempt == 1:
+                time.sleep(0.5)
+            return attempt
+
+        t1 = time.monotonic()
+        assert sometimes_slow() == 2
+        assert time.monotonic() - t1 < 0.3
+
+    def test_fast_attempt_is_not_hedged(self):
+        """Tests that no hedge is started when the first attempt completes within the delay"""
+
+        calls = []
+
+        @fault_tolerance.forward_err_recovery_by_hedging(exc_lst=[DummyException], hedge_delay=1.0)
+        def fast():
+            calls.append(1)
+            return 1
+
+        assert fast() == 1
+        assert len(calls) == 1
+
+    def test_failures_count_toward_budget(self):
+        """Tests that failing attempts start the next hedge and FailedToRecoverError is raised when all attempts failed"""
+
+        calls = []
+
+        @fault_tolerance.forward_err_recovery_by_hedging(exc_lst=[DummyException], max_no_of_hedges=2, hedge_delay=10.0)
+        def faulty():
+            calls.append(1)
+            raise DummyException()
+
+        t1 = time.monotonic()
+        with pytest.raises(fault_tolerance.FailedToRecoverError):
+            faulty()
+        assert len(calls) == 3
+        assert time.monotonic() - t1 < 1.0
+
+    def test_unlisted_exception_is_raised(self):
+        """Tests that exceptions outside exc_lst are raised at once"""
+
+        @fault_tolerance.forward_err_recovery_by_hedging(exc_lst=[DummyException], hedge_delay=10.0)
+        def broken():
+            raise ValueError()
+
+        with pytest.raises(ValueError):
+            broken()
+
+    def test_own_executor_and_percentile(self):
+        """Tests hedging on a given executor with a hedge delay tracked from recent latencies"""
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
+
+            @fault_tolerance.forward_err_recovery_by_hedging(exc_lst=[DummyException], hedge_delay=10.0, hedge_percentile=90, executor=executor)
+            def fast():
+                return 1
+
+            for _ in range(20):
+                assert fast() == 1
+            assert fast.latency_tracker.percentile(90) < 1.0
+
+    def test_coroutine_hedging(self):
+        """Tests that a slow coroutine attempt is overtaken and cancelled"""
+
+        calls = []
+        cancelled = []
+
+        @fault_tolerance.forward_err_recovery_by_hedging(exc_lst=[DummyException], max_no_of_hedges=2, hedge_delay=0.02)
+        async def sometimes_slow():
+            calls.append(1)
+            attempt = len(calls)
+            if attempt == 1:
+                try:
+                    await asyncio.sleep(1)
+                except asyncio.CancelledError:
+                    cancelled.append(attempt)
+                    raise
+            return attempt
+
+        async def main():
+            result = await sometimes_slow()
+            await asyncio.sleep(0)
+            return result
+
+        assert asyncio.run(main()) == 2
+        assert cancelled == [1]
+
+    def test_coroutine_hedging_on_virtual_clock(self):
+        """Tests that hedge delays and latencies of coroutine functions are on the given clock"""
+
+        clock = fault_tolerance.VirtualClock()
+        calls = []
+
+        @fault_tolerance.forward_err_recovery_by_hedging(exc_lst=[DummyException], hedge_delay=60.0, clock=clock)
+        async def slow():
+            calls.append(1)
+            await clock.sleep_async(100.0 if len(calls) == 1 else 30.0)
+            return len(calls)
+
+        async def main():
+            assert await slow() == 2
+            for _ in range(15):
+                await slow()
+
+        t1 = time.monotonic()
+        clock.run(main())
+        assert time.monotonic() - t1 < 5.0
+        assert len(calls) == 17
+        assert slow.latency_tracker.percentile(50) == 30.0
+        assert clock.monotonic() == 60.0 + 16 * 30.0
+
+class TestLatencyTrackerSuite:
+
+    def test_percentile(self):
+        """Tests the percentiles reported over the ring buffer"""
+
+        tracker = fault_tolerance.LatencyTracker(window_size=10, min_samples=5)
+        for latency in range(4):
+            tracker.record(float(latency))
+        assert tracker.percentile(50) is None
+        for latency in range(4, 20):
+            tracker.record(float(latency))
+        assert tracker.percentile(0.1) == 10.0
+        assert tracker.percentile(50) == 15.0
+        assert tracker.percentile(99) == 19.0
+
+    def test_percentile_is_refreshed_every_n_samples(self):
+        """Tests that the window is only sorted again after refresh_every latencies are recorded"""
+
+        tracker = fault_tolerance.LatencyTracker(window_size=4, min_samples=2, refresh_every=3)
+        tracker.record(1.0)
+        tracker.record(2.0)
+        assert tracker.percentile(99) == 2.0
+        tracker.record(3.0)
+        tracker.record(4.0)
+        assert tracker.percentile(99) == 2.0
+        tracker.record(5.0)
+        assert tracker.percentile(99) == 5.0
+
+        with pytest.raises(fault_tolerance.IncorrectFaultToleranceSpecificationError, match=r"^The parameter refresh_every is not an int"):
+            fault_tolerance.LatencyTracker(refresh_every=0)
@@ -0,0 +1,179 @@
+#MIT License
+#
+#Copyright (c) 2022 I-and-D-Got-Accelerators
+#
+#Permission is hereby granted, free of charge, to any person obtaining a copy
+#of this software and associated documentation files (the "Software"), to deal
+#in the Software without restriction, including without limitation the rights
+#to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#copies of the Software, and to permit persons to whom the Software is
+#furnished to do so, subject to the following conditions:
+#
+#The above copyright notice and this permission notice shall be included in all
+#copies or substantial portions of the Software.
+#
+#THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#SOFTWARE.
+
+import asyncio
+import pytest
+
+import fault_tolerance
+
+class DummyException(Exception):
+    pass
+
+class RecordingHooks(fault_tolerance.RetryHooks):
+
+    def __init__(self):
+        self.events = []
+
+    def on_attempt(self, name, attempt, elapsed, exc):
+        self.events.append(('attempt', attempt, type(exc).__name__ if exc else None))
+
+    def on_retry(self, name, attempt, elapsed, exc, backoff_duration):
+        self.events.append(('retry', attempt, type(exc).__name__, backoff_duration))
+
+    def on_success(self, name, attempt, elapsed, exc):
+        self.events.append(('success', attempt, type(exc).__name__ if exc else None))
+
+    def on_giveup(self, name, attempt, elapsed, exc):
+        self.events.append(('giveup', attempt, type(exc).__name__))
+
+class TestHooksSuite:
+
+    def test_incorrect_hooks_spec(self):
+        """Tests the error-detection concerning the specification of hooks"""
+
+        with pytest.raises(fault_tolerance.IncorrectFaultToleranceSpecificationError, match=r"^The parameter hooks is incorrect, expected a list of RetryHooks"):
+            fault_tolerance.forward_err_recovery_by_retry(exc_lst=[DummyException], hooks=[object()])
+
+    def test_hooks_on_recovery(self):
+        """Tests the order and arguments of the hooks when a call recovers after a retry"""
+
+        def backoff(attempt: int) -> float:
+            return 0.01
+
+        hooks = RecordingHooks()
+        calls = []
+
+        @fault_tolerance.forward_err_recovery_by_retry(max_no_of_retries=3, exc_lst=[DummyException], backoff_duration_fn=backoff, hooks=[hooks])
+        def flaky():
+            calls.append(1)
+            if len(calls) < 2:
+                raise DummyException()
+            return 1
+
+        assert flaky() == 1
+        assert hooks.events == [('attempt', 1, None), ('retry', 1, 'DummyException', 0.01),
+                                ('attempt', 2, 'DummyException'), ('success', 2, 'DummyException')]
+
+    def test_hooks_on_giveup(self):
+        """Tests that on_giveup is called on exhaustion and on exceptions outside exc_lst"""
+
+        hooks = RecordingHooks()
+
+        @fault_tolerance.forward_err_recovery_by_retry(max_no_of_retries=2, exc_lst=[DummyException], hooks=[hooks])
+        def faulty():
+            raise DummyException()
+
+        with pytest.raises(fault_tolerance.FailedToRecoverError):
+            faulty()
+        assert hooks.events[-1] == ('giveup', 2, 'DummyException')
+        assert [event[0] for event in hooks.events] == ['attempt', 'retry', 'attempt', 'giveup']
+
+        hooks.events.clear()
+
+        @fault_tolerance.forward_err_recovery_by_retry(max_no_of_retries=2, exc_lst=[DummyException], hooks=[hooks])
+        def broken():
+            raise ValueError()
+
+        with pytest.raises(ValueError):
+            broken()
+        assert hooks.events == [('attempt', 1, None), ('giveup', 1, 'ValueError')]
+
+    def test_coroutine_hooks(self):
+        """Tests that hooks are called for coroutine functions"""
+
+        hooks = RecordingHooks()
+        calls = []
+
+        @fault_tolerance.forward_err_recovery_by_retry(max_no_of_retries=3, exc_lst=[DummyException], hooks=[hooks])
+        async def flaky():
+            calls.append(1)
+            if len(calls) < 2:
+                raise DummyException()
+            return 1
+
+        assert asyncio.run(flaky()) == 1
+        assert [event[0] for event in hooks.events] == ['attempt', 'retry', 'attempt', 'success']
+
+    def test_several_hooks(self):
+        """Tests that every hook in the list is called"""
+
+        hooks1, hooks2 = RecordingHooks(), RecordingHooks()
+
+        @fault_tolerance.forward_err_recovery_by_retry(exc_lst=[DummyException], hooks=[hooks1, hooks2])
+        def healthy():
+            return 1
+
+        healthy()
+        assert hooks1.events == hooks2.events == [('attempt', 1, None), ('success', 1, None)]
+
+class TestMetricsCollectorSuite:
+
+    def test_incorrect_buckets_spec(self):
+        """Tests the error-detection concerning the specification of the histogram buckets"""
+
+        with pytest.raises(fault_tolerance.IncorrectFaultToleranceSpecificationError, match=r"^The parameter buckets is incorrect"):
+            fault_tolerance.MetricsCollector(buckets=[1.0, 0.5])
+
+    def test_counters_and_histogram(self):
+        """Tests the counters and histogram collected for a function"""
+
+        collector = fault_tolerance.MetricsCollector(buckets=[0.5, 10.0])
+        calls = []
+
+        @fault_tolerance.forward_err_recovery_by_retry(max_no_of_retries=2, exc_lst=[DummyException], hooks=[collector])
+        def flaky():
+            calls.append(1)
+            if len(calls) % 2:
+                raise DummyException()
+            return 1
+
+        flaky()
+        flaky()
+        snapshot = collector.snapshot()
+        metrics = snapshot[f"{__name__}.TestMetricsCollectorSuite.test_counters_and_histogram.<locals>.flaky"]
+        assert metrics['calls'] == 2
+        assert metrics['attempts'] == 4
+        assert metrics['retries'] == 2
+        assert metrics['successes'] == 2
+        assert metrics['giveups'] == 0
+        assert metrics['retry_exceptions'] == {'DummyException': 2}
+        assert metrics['latency']['buckets'] == {0.5: 2, 10.0: 2, float('inf'): 2}
+        assert metrics['latency']['count'] == 2
+
+    def test_prometheus_export(self):
+        """Tests the Prometheus text export"""
+
+        collector = fault_tolerance.MetricsCollector(buckets=[1.0])
+
+        @fault_tolerance.forward_err_recovery_by_retry(max_no_of_retries=2, exc_lst=[DummyException], hooks=[collector])
+        def faulty():
+            raise DummyException()
+
+        with pytest.raises(fault_tolerance.FailedToRecoverError):
+            faulty()
+
+        text = collector.to_prometheus()
+        name = f"{__name__}.TestMetricsCollectorSuite.test_prometheus_export.<locals>.faulty"
+        assert f'fault_tolerance_giveups_total{{function="{name}"}} 1\n' in text
+        assert f'fault_tolerance_retries_total{{function="{name}",exception="DummyException"}} 1\n' in text
+        assert f'fault_tolerance_call_duration_seconds_bucket{{function="{name}",le="+Inf"}} 1\n' in text
+        assert '# TYPE fault_tolerance_call_duration_seconds histogram\n' in text
@@ -0,0 +1,260 @@
+#MIT License
+#
+#Copyright (c) 2022 I-and-D-Got-Accelerators
+#
+#Permission is hereby granted, free of charge, to any person obtaining a copy
+#of this software and associated documentation files (the "Software"), to deal
+#in the Software without restriction, including without limitation the rights
+#to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#copies of the Software, and to permit persons to whom the Software is
+#furnished to do so, subject to the following conditions:
+#
+#The above copyright notice and this permission notice shall be included in all
+#copies or substantial portions of the Software.
+#
+#THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#SOFTWARE.
+
+import asyncio
+import functools
+import inspect
+import os
+import subprocess
+import sys
+import types
+import pytest
+
+import fault_tolerance
+
+class DummyException(Exception):
+    pass
+
+class OtherException(Exception):
+    pass
+
+class TestPolicySuite:
+
+    def test_incorrect_policy_spec(self):
+        """Tests that a policy is validated when it is created"""
+
+        with pytest.raises(fault_tolerance.IncorrectFaultToleranceSpecificationError, match=r"^The parameter exc_lst is incorrect"):
+            fault_tolerance.RetryPolicy(max_no_of_retries=2)
+
+        policy = fault_tolerance.RetryPolicy(max_no_of_retries=2, exc_lst=[DummyException])
+        with pytest.raises(fault_tolerance.IncorrectFaultToleranceSpecificationError, match=r"^The parameter max_no_of_retries is not an int"):
+            policy.replace(max_no_of_retries=0)
+
+    def test_policy_applied_to_many_functions(self):
+        """Tests that one policy retries every function it is applied to, and that replace leaves it unchanged"""
+
+        exc_lst = [DummyException]
+        policy = fault_tolerance.RetryPolicy(max_no_of_retries=2, exc_lst=exc_lst)
+        exc_lst.append(OtherException)
+        calls = []
+
+        @policy
+        def first():
+            calls.append('first')
+            if len(calls) == 1:
+                raise DummyException()
+            return 1
+
+        def second():
+            calls.append('second')
+            raise OtherException()
+
+        assert first() == 1
+        with pytest.raises(OtherException):
+            policy(second)()
+        assert calls == ['first', 'first', 'second']
+        assert first.__name__ == 'first'
+
+        tolerant = policy.replace(exc_lst=[DummyException, OtherException])
+        with pytest.raises(fault_tolerance.FailedToRecoverError):
+            tolerant(second)()
+        assert calls.count('second') == 3
+        assert policy.spec['exc_lst'] == [DummyException]
+        assert tolerant.spec['max_no_of_retries'] == 2
+        assert repr(policy) == f"RetryPolicy(max_no_of_retries=2, exc_lst=[{DummyException!r}], hooks=[], resource_kwarg='resource')"
+
+    def test_identical_specs_are_validated_once(self, monkeypatch):
+        """Tests that the signature of a backoff function is only inspected the first time it is used"""
+
+        def backoff(attempt: int) -> float:
+            return 0.0
+
+        inspected = []
+        getfullargspec = inspect.getfullargspec
+        monkeypatch.setattr(inspect, 'getfullargspec', lambda fx: inspected.append(fx) or getfullargspec(fx))
+
+        for _ in range(3):
+            fault_tolerance.forward_err_recovery_by_retry(max_no_of_retries=2, exc_lst=[DummyException], backoff_duration_fn=backoff)
+        assert inspected == [backoff]
+
+    def test_callables_without_code(self):
+        """Tests decorating callables without a code object of their own, builtins, partials of builtins and callable objects"""
+
+        class Adder:
+            def __init__(self):
+                self.calls = 0
+
+            def __call__(self, x, y):
+                self.calls += 1
+                if self.calls == 1:
+                    raise DummyException()
+                return x + y
+
+        retried_len = fault_tolerance.forward_err_recovery_by_retry(max_no_of_retries=2, exc_lst=[DummyException])(len)
+        assert retried_len([1, 2, 3]) == 3
+        guarded_max = fault_tolerance.circuit_breaker(exc_lst=[DummyException])(functools.partial(max, 0))
+        assert guarded_max(-1, 2) == 2
+        retried_add = fault_tolerance.forward_err_recovery_by_retry(max_no_of_retries=2, exc_lst=[DummyException])(Adder())
+        assert retried_add(1, 2) == 3
+
+    def test_import_is_lazy(self):
+        """Tests that importing the package does not import asyncio, concurrent.futures, inspect, sqlite3, mmap,
+           fcntl or the modules exported lazily, and that their exports are imported on use"""
+
+        src = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
+        code = ("import sys, fault_tolerance; "
+                "print(sorted(name for name in ('asyncio', 'concurrent.futures', 'inspect', 'sqlite3', 'mmap', 'fcntl', "
+                "'fault_tolerance.shared_state', 'fault_tolerance.policy', 'fault_tolerance.workflow', 'fault_tolerance.simulation') "
+                "if name in sys.modules))")
+        env = dict(os.environ, PYTHONPATH=src)
+        output = subprocess.run([sys.executable, '-c', code], env=env, capture_output=True, text=True, check=True).stdout
+        assert output.strip() == "[]"
+        code = "import fault_tolerance; print(fault_tolerance.RetryingExecutor.__name__)"
+        output = subprocess.run([sys.executable, '-c', code], env=env, capture_output=True, text=True, check=True).stdout
+        assert output.strip() == "RetryingExecutor"
+        code = ("import fault_tolerance; "
+                "print(' '.join(getattr(fault_tolerance, name).__name__ for name in ('SharedCircuitBreaker', 'retry_methods', 'Workflow', 'Simulation')))")
+        output = subprocess.run([sys.executable, '-c', code], env=env, capture_output=True, text=True, check=True).stdout
+        assert output.strip() == "SharedCircuitBreaker retry_methods Workflow Simulation"
+
+class TestBulkPolicySuite:
+
+    def test_incorrect_bulk_spec(self):
+        """Tests the error-detection concerning the bulk application of a policy"""
+
+        policy = fault_tolerance.RetryPolicy(max_no_of_retries=2, exc_lst=[DummyException])
+
+        with pytest.raises(fault_tolerance.IncorrectFaultToleranceSpecificationError, match=r"^The parameter policy is incorrect"):
+            fault_tolerance.retry_methods(policy.spec)
+
+        with pytest.raises(fault_tolerance.IncorrectFaultToleranceSpecificationError, match=r"^The parameter pattern is incorrect"):
+            fault_tolerance.retry_methods(policy, pattern=1)
+
+        with pytest.raises(fault_tolerance.IncorrectFaultToleranceSpecificationError, match=r"^The parameter namespace is incorrect"):
+            fault_tolerance.retry_functions([], policy)
+
+    def test_retry_methods(self):
+        """Tests that one policy retries methods of every kind of a class, and leaves the private ones alone"""
+
+        policy = fault_tolerance.RetryPolicy(max_no_of_retries=2, exc_lst=[DummyException])
+        calls = []
+
+        def flaky(name, result):
+            calls.append(name)
+            if calls.count(name) % 2:
+                raise DummyException()
+            return result
+
+        @fault_tolerance.retry_methods(policy)
+        class Client:
+
+            __slots__ = ('value',)
+
+            def __init__(self, value):
+                self.value = value
+
+            def get(self, key):
+                return flaky('get', (self.value, key))
+
+            async def get_async(self):
+                return flaky('get_async', self.value)
+
+            @staticmethod
+            def ping():
+                return flaky('ping', 'pong')
+
+            @classmethod
+            def create(cls, value):
+                return flaky('create', cls(value))
+
+            @property
+            def size(self):
+                return flaky('size', len(self.value))
+
+            def _private(self):
+                return flaky('_private', None)
+
+        assert type(vars(Client)['get']).__name__ == '_RetriedMember'
+        client = Client.create("abc")
+        assert client.get(1) == ("abc", 1)
+        assert asyncio.run(client.get_async()) == "abc"
+        assert Client.ping() == client.ping() == 'pong'
+        assert client.size == 3
+        with pytest.raises(DummyException):
+            client._private()
+        assert calls == ['create', 'create', 'get', 'get', 'get_async', 'get_async', 'ping', 'ping', 'ping', 'ping', 'size', 'size', '_private']
+
+        # once looked up, the retried functions replace the stand-ins in the class
+        assert inspect.isfunction(vars(Client)['get']) and Client.get.__name__ == 'get'
+        assert inspect.iscoroutinefunction(Client.get_async)
+        assert isinstance(vars(Client)['ping'], staticmethod) and isinstance(vars(Client)['create'], classmethod)
+
+    def test_retry_selected_methods_and_functions(self):
+        """Tests that a pattern and a predicate select the methods and module functions a policy is applied to"""
+
+        policy = fault_tolerance.RetryPolicy(max_no_of_retries=3, exc_lst=[DummyException])
+
+        @fault_tolerance.retry_methods(policy, pattern='fetch_*', predicate=lambda name, member: name != 'fetch_once')
+        class Client:
+
+            def __init__(self):
+                self.calls = 0
+
+            def fetch_all(self):
+                self.calls += 1
+                raise DummyException()
+
+            def fetch_once(self):
+                self.calls += 1
+                raise DummyException()
+
+            def store(self):
+                self.calls += 1
+                raise DummyException()
+
+        class Subclass(Client):
+            pass
+
+        client = Subclass()
+        with pytest.raises(fault_tolerance.FailedToRecoverError):
+            client.fetch_all()
+        with pytest.raises(DummyException):
+            client.fetch_once()
+        with pytest.raises(DummyException):
+            client.store()
+        assert client.calls == 5
+
+        module = types.ModuleType('client_module')
+        exec("import os\n"
+             "calls = []\n"
+             "def fetch():\n"
+             "    calls.append('fetch')\n"
+             "    if len(calls) < 3:\n"
+             "        raise DummyException()\n"
+             "    return len(calls)\n"
+             "def _helper():\n"
+             "    raise DummyException()\n", vars(module))
+        module.DummyException = DummyException
+        module.getcwd = os.getcwd
+        assert fault_tolerance.retry_functions(module, policy) == ['fetch']
+        assert module.fetch() == 3
+        assert module.getcwd is os.getcwd
@@ -0,0 +1,197 @@
+#MIT License
+#
+#Copyright (c) 2022 I-and-D-Got-Accelerators
+#
+#Permission is hereby granted, free of charge, to any person obtaining a copy
+#of this software and associated documentation files (the "Software"), to deal
+#in the Software without restriction, including without limitation the rights
+#to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#copies of the Software, and to permit persons to whom the Software is
+#furnished to do so, subject to the following conditions:
+#
+#The above copyright notice and this permission notice shall be included in all
+#copies or substantial portions of the Software.
+#
+#THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#SOFTWARE.
+
+import asyncio
+import itertools
+import threading
+import time
+import pytest
+
+import fault_tolerance
+
+class DummyException(Exception):
+    pass
+
+class Connection:
+
+    ids = itertools.count()
+
+    def __init__(self, broken=False):
+        self.id = next(Connection.ids)
+        self.broken = broken
+        self.closed = False
+        self.rolled_back = 0
+
+    def close(self):
+        self.closed = True
+
+    def rollback(self):
+        self.rolled_back += 1
+
+class TestResourcesSuite:
+
+    def test_incorrect_resources_spec(self):
+        """Tests the error-detection concerning the specification of resource recovery"""
+
+        with pytest.raises(fault_tolerance.IncorrectFaultToleranceSpecificationError, match=r"^The parameter factory is incorrect"):
+            fault_tolerance.ResourcePool(None)
+
+        with pytest.raises(fault_tolerance.IncorrectFaultToleranceSpecificationError, match=r"^The parameter reset is incorrect"):
+            fault_tolerance.ResourcePool(Connection, reset=1)
+
+        with pytest.raises(fault_tolerance.IncorrectFaultToleranceSpecificationError, match=r"^The parameter resource_pool is incorrect"):
+            fault_tolerance.forward_err_recovery_by_retry(exc_lst=[DummyException], resource_pool=[])
+
+        with pytest.raises(fault_tolerance.IncorrectFaultToleranceSpecificationError, match=r"^The parameter resource_kwarg is incorrect"):
+            fault_tolerance.forward_err_recovery_by_retry(exc_lst=[DummyException], resource_pool=fault_tolerance.ResourcePool(Connection), resource_kwarg="a-b")
+
+        with pytest.raises(fault_tolerance.IncorrectFaultToleranceSpecificationError, match=r"^The parameter on_failure is incorrect"):
+            fault_tolerance.forward_err_recovery_by_retry(exc_lst=[DummyException], on_failure=1)
+
+        with pytest.raises(fault_tolerance.IncorrectFaultToleranceSpecificationError, match=r"^The parameters on_failure, prepare_retry and resource_pool do not apply"):
+            @fault_tolerance.forward_err_recovery_by_retry(exc_lst=[DummyException], prepare_retry=print)
+            def dummy():
+                yield 1
+
+    def test_pool(self):
+        """Tests that released resources are reused, discarded ones reset or closed, and stale ones replaced"""
+
+        pool = fault_tolerance.ResourcePool(Connection, max_size=2, acquire_timeout=0.01, close=Connection.close, validate=lambda c: not c.broken)
+        first = pool.acquire()
+        second = pool.acquire()
+        assert pool.in_use == 2
+        with pytest.raises(fault_tolerance.BulkheadFullError):
+            pool.acquire()
+        pool.release(first)
+        pool.discard(second)
+        assert second.closed and not first.closed
+        assert (pool.idle, pool.in_use) == (1, 0)
+        assert pool.acquire() is first
+        pool.release(first)
+
+        first.broken = True
+        replacement = pool.acquire()
+        assert replacement is not first and first.closed
+        pool.release(replacement)
+
+        resettable = fault_tolerance.ResourcePool(Connection, reset=Connection.rollback)
+        with pytest.raises(DummyException):
+            with resettable.lease() as connection:
+                raise DummyException()
+        assert connection.rolled_back == 1 and resettable.idle == 1
+        pool.close()
+        assert replacement.closed
+
+    def test_failed_attempt_gets_a_fresh_resource(self):
+        """Tests that a failed attempt discards its connection only, is rolled back, and the retry uses a healthy one"""
+
+        pool = fault_tolerance.ResourcePool(Connection, close=Connection.close)
+        idle = Connection()
+        pool.release(pool.acquire())
+        poisoned = pool.acquire()
+        poisoned.broken = True
+        pool.release(poisoned)
+        events = []
+
+        @fault_tolerance.forward_err_recovery_by_retry(max_no_of_retries=3, exc_lst=[DummyException], resource_pool=pool, resource_kwarg='connection',
+                                                       on_failure=lambda e, key, connection: (connection.rollback(), events.append(('rollback', connection.id))),
+                                                       prepare_retry=lambda attempt, key: events.append(('prepare', attempt)))
+        def write(key, connection):
+            if connection.broken:
+                raise DummyException()
+            return connection
+
+        connection = write("key")
+        assert connection is not poisoned and not connection.broken
+        assert poisoned.closed and poisoned.rolled_back == 1
+        assert events == [('rollback', poisoned.id), ('prepare', 2)]
+        assert (pool.idle, pool.in_use) == (1, 0)
+        assert not idle.closed
+
+    def test_async_resource_recovery(self):
+        """Tests resource recovery for coroutine functions with an async factory and an async rollback"""
+
+        async def connect():
+            await asyncio.sleep(0)
+            return Connection(broken=not created)
+
+        created = []
+        rolled_back = []
+
+        async def rollback(e, resource):
+            rolled_back.append(resource)
+
+        pool = fault_tolerance.ResourcePool(connect, close=Connection.close)
+
+        @fault_tolerance.forward_err_recovery_by_retry(max_no_of_retries=2, exc_lst=[DummyException], resource_pool=pool, on_failure=rollback)
+        async def query(resource):
+            created.append(resource)
+            if resource.broken:
+                raise DummyException()
+            return resource.id
+
+        assert asyncio.run(query()) == created[1].id
+        assert rolled_back == [created[0]] and created[0].closed
+        assert (pool.idle, pool.in_use) == (1, 0)
+
+    def test_timed_out_attempt_abandons_its_resource(self):
+        """Tests that the resource of a timed out attempt is closed and not reset, and keeps its slot while the abandoned thread uses it"""
+
+        pool = fault_tolerance.ResourcePool(Connection, max_size=2, reset=Connection.rollback, close=Connection.close)
+        hang = threading.Event()
+        used = []
+
+        @fault_tolerance.forward_err_recovery_by_retry(max_no_of_retries=2, exc_lst=[DummyException], resource_pool=pool, attempt_timeout=0.05)
+        def query(resource):
+            used.append(resource)
+            if len(used) == 1:
+                hang.wait(5)
+            return resource
+
+        connection = query()
+        hung = used[0]
+        assert connection is not hung
+        assert (pool.idle, pool.in_use) == (1, 1)
+        assert not hung.closed and hung.rolled_back == 0
+        hang.set()
+        for _ in range(100):
+            if pool.in_use == 0:
+                break
+            time.sleep(0.01)
+        assert (pool.idle, pool.in_use) == (1, 0)
+        assert hung.closed and hung.rolled_back == 0
+        assert query() is connection
+
+        async_pool = fault_tolerance.ResourcePool(Connection, reset=Connection.rollback, close=Connection.close)
+
+        @fault_tolerance.forward_err_recovery_by_retry(max_no_of_retries=2, exc_lst=[DummyException], resource_pool=async_pool, attempt_timeout=0.05)
+        async def query_async(resource):
+            used_async.append(resource)
+            if len(used_async) == 1:
+                await asyncio.sleep(5)
+            return resource
+
+        used_async = []
+        connection = asyncio.run(query_async())
+        assert connection is not used_async[0]
+        assert used_async[0].closed and used_async[0].rolled_back == 0
+        assert (async_pool.idle, async_pool.in_use) == (1, 0)
@@ -0,0 +1,160 @@
+#MIT License
+#
+#Copyright (c) 2022 I-and-D-Got-Accelerators
+#
+#Permission is hereby granted, free of charge, to any person obtaining a copy
+#of this software and associated documentation files (the "Software"), to deal
+#in the Software without restriction, including without limitation the rights
+#to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#copies of the Software, and to permit persons to whom the Software is
+#furnished to do so, subject to the following conditions:
+#
+#The above copyright notice and this permission notice shall be included in all
+#copies or substantial portions of the Software.
+#
+#THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#SOFTWARE.
+
+import os
+import subprocess
+import sys
+import textwrap
+import time
+import pytest
+
+import fault_tolerance
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
+
+class DummyException(Exception):
+    pass
+
+def run_worker(code, *args):
+    """Runs code in a fresh worker process and returns its output"""
+    env = dict(os.environ, PYTHONPATH=SRC)
+    return subprocess.run([sys.executable, '-c', textwrap.dedent(code), *map(str, args)], 
+                          env=env, capture_output=True, text=True, check=True).stdout.strip()
+
+class TestSharedStateSuite:
+
+    def test_incorrect_shared_state_spec(self, tmp_path):
+        """Tests the error-detection concerning the specification of shared state"""
+
+        with fault_tolerance.SharedStateFile(tmp_path / "state", max_slots=1) as shared_state:
+            with pytest.raises(fault_tolerance.IncorrectFaultToleranceSpecificationError, match=r"^The parameter failure_threshold is above 64"):
+                fault_tolerance.SharedCircuitBreaker("db", shared_state, failure_threshold=65)
+
+            with pytest.raises(fault_tolerance.IncorrectFaultToleranceSpecificationError, match=r"^The parameter name is incorrect, expected a non-empty str"):
+                fault_tolerance.SharedCircuitBreaker("x" * 49, shared_state)
+
+            with pytest.raises(fault_tolerance.IncorrectFaultToleranceSpecificationError, match=r"^The parameter shared_state is incorrect"):
+                fault_tolerance.SharedRetryBudget("db", None)
+
+            fault_tolerance.SharedCircuitBreaker("db", shared_state)
+            with pytest.raises(fault_tolerance.IncorrectFaultToleranceSpecificationError, match=r"^The parameter name is incorrect, 'db' is the name of a circuit breaker"):
+                fault_tolerance.SharedRetryBudget("db", shared_state)
+
+            with pytest.raises(fault_tolerance.IncorrectFaultToleranceSpecificationError, match=r"^The parameter max_slots is incorrect, all 1 slots"):
+                fault_tolerance.SharedRetryBudget("api", shared_state)
+
+        with pytest.raises(fault_tolerance.IncorrectFaultToleranceSpecificationError, match=r"^The parameter max_slots is incorrect, '.*' has 1 slots"):
+            fault_tolerance.SharedStateFile(tmp_path / "state", max_slots=2)
+
+    def test_breaker_state_is_shared(self, tmp_path):
+        """Tests that a breaker opened by one process fails fast in another one, and that a probe closes it for all"""
+
+        path = tmp_path / "state"
+        with fault_tolerance.SharedStateFile(path) as shared_state:
+            breaker = fault_tolerance.SharedCircuitBreaker("db", shared_state, failure_threshold=3, recovery_timeout=0.5)
+            assert breaker.state == fault_tolerance.breaker.CLOSED
+
+            output = run_worker("""
+                import sys, fault_tolerance
+                shared_state = fault_tolerance.SharedStateFile(sys.argv[1])
+                breaker = fault_tolerance.SharedCircuitBreaker("db", shared_state, failure_threshold=3, recovery_timeout=0.5)
+                for _ in range(3):
+                    breaker.record_failure(breaker.before_call())
+                print(breaker.state)
+            """, path)
+            assert output == fault_tolerance.breaker.OPEN
+            assert breaker.state == fault_tolerance.breaker.OPEN
+            with pytest.raises(fault_tolerance.CircuitOpenError):
+                breaker.before_call()
+
+            time.sleep(0.5)
+            probe = breaker.before_call()
+            assert probe
+            output = run_worker("""
+                import sys, fault_tolerance
+                breaker = fault_tolerance.SharedCircuitBreaker("db", fault_tolerance.SharedStateFile(sys.argv[1]), recovery_timeout=0.5)
+                try:
+                    breaker.before_call()
+                except fault_tolerance.CircuitOpenError as e:
+                    print(type(e).__name__)
+            """, path)
+            assert output == "CircuitOpenError"
+            breaker.record_success(probe)
+            assert breaker.state == fault_tolerance.breaker.CLOSED
+            assert shared_state.names() == ["db"]
+
+    def test_failures_outside_the_window(self, tmp_path):
+        """Tests that only failures within the window count towards the threshold"""
+
+        with fault_tolerance.SharedStateFile(tmp_path / "state") as shared_state:
+            breaker = fault_tolerance.SharedCircuitBreaker("db", shared_state, failure_threshold=2, window_duration=0.05)
+            breaker.record_failure(False)
+            time.sleep(0.06)
+            breaker.record_failure(False)
+            assert breaker.state == fault_tolerance.breaker.CLOSED
+            breaker.record_failure(False)
+            assert breaker.state == fault_tolerance.breaker.OPEN
+
+    def test_budget_is_shared(self, tmp_path):
+        """Tests that concurrent processes withdraw from one bucket and never more tokens than it holds"""
+
+        path = tmp_path / "state"
+        with fault_tolerance.SharedStateFile(path) as shared_state:
+            budget = fault_tolerance.SharedRetryBudget("api", shared_state, max_tokens=50, token_ratio=0.5)
+            assert budget.tokens == 50
+            code = """
+                import sys, fault_tolerance
+                budget = fault_tolerance.SharedRetryBudget("api", fault_tolerance.SharedStateFile(sys.argv[1]), max_tokens=50, token_ratio=0.5)
+                print(sum(budget.try_acquire_retry() for _ in range(40)))
+            """
+            env = dict(os.environ, PYTHONPATH=SRC)
+            workers = [subprocess.Popen([sys.executable, '-c', textwrap.dedent(code), str(path)], env=env, stdout=subprocess.PIPE, text=True) for _ in range(3)]
+            acquired = sum(int(worker.communicate()[0]) for worker in workers)
+            assert acquired == 50
+            assert budget.tokens == 0
+            assert not budget.try_acquire_retry()
+            budget.record_success()
+            budget.record_success()
+            assert budget.tokens == 1.0
+            assert budget.try_acquire_retry()
+
+    def test_decorators_with_shared_state(self, tmp_path):
+        """Tests that the shared breaker and budget plug into the decorators"""
+
+        with fault_tolerance.SharedStateFile(tmp_path / "state") as shared_state:
+            budget = fault_tolerance.SharedRetryBudget("api", shared_state, max_tokens=1)
+            breaker = fault_tolerance.SharedCircuitBreaker("api-breaker", shared_state, failure_threshold=2)
+            calls = []
+
+            @fault_tolerance.forward_err_recovery_by_retry(max_no_of_retries=5, exc_lst=[DummyException], retry_budget=budget)
+            @fault_tolerance.circuit_breaker(exc_lst=[DummyException], breaker=breaker)
+            def request():
+                calls.append(1)
+                raise DummyException()
+
+            with pytest.raises(fault_tolerance.RetryBudgetExhaustedError):
+                request()
+            assert len(calls) == 2
+            assert breaker.state == fault_tolerance.breaker.OPEN
+            with pytest.raises(fault_tolerance.CircuitOpenError):
+                request()
+            assert len(calls) == 2
@@ -0,0 +1,159 @@
+#MIT License
+#
+#Copyright (c) 2022 I-and-D-Got-Accelerators
+#
+#Permission is hereby granted, free of charge, to any person obtaining a copy
+#of this software and associated documentation files (the "Software"), to deal
+#in the Software without restriction, including without limitation the rights
+#to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#copies of the Software, and to permit persons to whom the Software is
+#furnished to do so, subject to the following conditions:
+#
+#The above copyright notice and this permission notice shall be included in all
+#copies or substantial portions of the Software.
+#
+#THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#SOFTWARE.
+
+import asyncio
+import time
+import pytest
+
+import fault_tolerance
+
+class DummyException(Exception):
+    pass
+
+class TestVirtualClockSuite:
+
+    def test_incorrect_clock_spec(self):
+        """Tests the error-detection concerning the specification of the clock"""
+
+        with pytest.raises(fault_tolerance.IncorrectFaultToleranceSpecificationError, match=r"^The parameter clock is incorrect"):
+            fault_tolerance.forward_err_recovery_by_retry(exc_lst=[DummyException], clock=time)
+
+        with pytest.raises(fault_tolerance.IncorrectFaultToleranceSpecificationError, match=r"^The parameter clock is incorrect"):
+            fault_tolerance.CircuitBreaker(clock=1.0)
+
+        with pytest.raises(fault_tolerance.IncorrectFaultToleranceSpecificationError, match=r"^The parameter start is not a number"):
+            fault_tolerance.VirtualClock(start=-1)
+
+    def test_backoff_on_virtual_time(self):
+        """Tests that a realistic exponential backoff is slept on the virtual clock without taking real time"""
+
+        clock = fault_tolerance.VirtualClock()
+        backoff = fault_tolerance.ExponentialBackoff(1.0, cap=30.0)
+        calls = []
+
+        @fault_tolerance.forward_err_recovery_by_retry(max_no_of_retries=10, exc_lst=[DummyException], backoff_duration_fn=backoff, clock=clock)
+        def dummy():
+            calls.append(clock.monotonic())
+            raise DummyException()
+
+        start = time.monotonic()
+        with pytest.raises(fault_tolerance.FailedToRecoverError):
+            dummy()
+        assert time.monotonic() - start < 1.0
+        assert calls == [0.0, 1.0, 3.0, 7.0, 15.0, 31.0, 61.0, 91.0, 121.0, 151.0]
+        assert clock.monotonic() == 181.0
+
+    def test_deadline_and_breaker_on_virtual_time(self):
+        """Tests that the overall deadline and the recovery timeout of a breaker are measured on the virtual clock"""
+
+        clock = fault_tolerance.VirtualClock()
+
+        @fault_tolerance.forward_err_recovery_by_retry(max_no_of_retries=100, exc_lst=[DummyException], backoff_duration_fn=fault_tolerance.ConstantBackoff(10.0), 
+                                                       total_deadline=45.0, clock=clock)
+        def dummy():
+            raise DummyException()
+
+        with pytest.raises(fault_tolerance.DeadlineExceededError):
+            dummy()
+        assert clock.monotonic() == 40.0
+
+        breaker = fault_tolerance.CircuitBreaker(failure_threshold=1, recovery_timeout=30.0, clock=clock)
+        breaker.record_failure(False)
+        assert breaker.state == fault_tolerance.breaker.OPEN
+        clock.advance(30.0)
+        assert breaker.state == fault_tolerance.breaker.HALF_OPEN
+
+    def test_coroutines_on_virtual_time(self):
+        """Tests that concurrent coroutines retried on the virtual clock wake up in the order of their virtual deadlines"""
+
+        clock = fault_tolerance.VirtualClock()
+        events = []
+
+        def retried(name, delay):
+            @fault_tolerance.forward_err_recovery_by_retry(max_no_of_retries=2, exc_lst=[DummyException], backoff_duration_fn=fault_tolerance.ConstantBackoff(delay), clock=clock)
+            async def dummy():
+                events.append((name, clock.monotonic()))
+                if len(events) <= 2:
+                    raise DummyException()
+                await asyncio.sleep(1.0)
+                return name
+            return dummy
+
+        async def main():
+            return await asyncio.gather(retried('slow', 60.0)(), retried('fast', 5.0)())
+
+        start = time.monotonic()
+        assert clock.run(main()) == ['slow', 'fast']
+        assert time.monotonic() - start < 1.0
+        assert events == [('slow', 0.0), ('fast', 0.0), ('fast', 5.0), ('slow', 60.0)]
+        assert clock.monotonic() == 61.0
+
+        with pytest.raises(RuntimeError, match=r"^A virtual clock can only be slept on asynchronously"):
+            asyncio.run(clock.sleep_async(1.0))
+
+class TestSimulationSuite:
+
+    def test_incorrect_simulation_spec(self):
+        """Tests the error-detection concerning the specification of a simulation"""
+
+        with pytest.raises(fault_tolerance.IncorrectFaultToleranceSpecificationError, match=r"^The parameter error_rate is not a number"):
+            fault_tolerance.FailureModel(error_rate=1.5)
+
+        with pytest.raises(fault_tolerance.IncorrectFaultToleranceSpecificationError, match=r"^The parameter outages is incorrect"):
+            fault_tolerance.FailureModel(outages=[(10, 5)])
+
+        with pytest.raises(fault_tolerance.IncorrectFaultToleranceSpecificationError, match=r"^The parameter failure_model is incorrect"):
+            fault_tolerance.Simulation(None)
+
+        simulation = fault_tolerance.Simulation(fault_tolerance.FailureModel())
+        with pytest.raises(fault_tolerance.IncorrectFaultToleranceSpecificationError, match=r"^The parameter breaker is incorrect"):
+            simulation.run(breaker=fault_tolerance.CircuitBreaker())
+
+    def test_simulation_report(self):
+        """Tests that a simulation run reports the load amplification of retries and is reproducible"""
+
+        model = fault_tolerance.FailureModel(error_rate=0.1, outages=[(5.0, 15.0)], latency=lambda rng: rng.uniform(0.005, 0.015))
+        simulation = fault_tolerance.Simulation(model, clients=50, calls_per_client=10, think_time=2.0, seed=7)
+
+        baseline = simulation.run()
+        assert baseline.calls == 500 and baseline.attempts == 500
+        assert baseline.load_amplification == 1.0
+        assert 0 < baseline.failures['SimulatedFailure'] == baseline.calls - baseline.successes
+        assert 5.0 <= baseline.latency_percentile(50) <= 15.0
+
+        policy = fault_tolerance.RetryPolicy(max_no_of_retries=10, exc_lst=[fault_tolerance.SimulatedFailure], 
+                                             backoff_duration_fn=fault_tolerance.FullJitterBackoff(0.5, cap=8.0))
+        retried = simulation.run(policy)
+        assert retried.success_rate > baseline.success_rate
+        assert retried.load_amplification > 1.0
+        assert retried.latency_percentile(99) > 1000.0
+        assert retried.wall_time < retried.virtual_duration
+
+        assert simulation.run(policy).as_dict()['attempts'] == retried.attempts
+
+        budgeted = simulation.run(policy.replace(retry_budget=fault_tolerance.RetryBudget(max_tokens=10, token_ratio=0.1)))
+        assert budgeted.load_amplification < retried.load_amplification
+        assert budgeted.failures['RetryBudgetExhaustedError'] > 0
+
+        breaker = fault_tolerance.CircuitBreaker(failure_threshold=5, window_duration=1.0, recovery_timeout=2.0, clock=simulation.clock)
+        guarded = simulation.run(policy, breaker=breaker)
+        assert guarded.load_amplification < retried.load_amplification
@@ -0,0 +1,138 @@
+#MIT License
+#
+#Copyright (c) 2022 I-and-D-Got-Accelerators
+#
+#Permission is hereby granted, free of charge, to any person obtaining a copy
+#of this software and associated documentation files (the "Software"), to deal
+#in the Software without restriction, including without limitation the rights
+#to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#copies of the Software, and to permit persons to whom the Software is
+#furnished to do so, subject to the following conditions:
+#
+#The above copyright notice and this permission notice shall be included in all
+#copies or substantial portions of the Software.
+#
+#THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#SOFTWARE.
+
+import asyncio
+import pytest
+
+import fault_tolerance
+
+class DummyException(Exception):
+    pass
+
+class TestStreamingSuite:
+
+    def test_incorrect_streaming_spec(self):
+        """Tests the error-detection concerning the specification of streaming retries"""
+
+        with pytest.raises(fault_tolerance.IncorrectFaultToleranceSpecificationError, match=r"^The parameter resume_fn is incorrect, expected a function"):
+            fault_tolerance.forward_err_recovery_by_retry(exc_lst=[DummyException], resume_fn=1)
+
+        with pytest.raises(fault_tolerance.IncorrectFaultToleranceSpecificationError, match=r"^The parameter resume_fn is incorrect, it only applies to generator functions"):
+            @fault_tolerance.forward_err_recovery_by_retry(exc_lst=[DummyException], resume_fn=lambda offset: [])
+            def dummy():
+                return []
+
+        with pytest.raises(fault_tolerance.IncorrectFaultToleranceSpecificationError, match=r"^The parameters attempt_timeout and total_deadline do not apply"):
+            @fault_tolerance.forward_err_recovery_by_retry(exc_lst=[DummyException], attempt_timeout=1)
+            def dummy2():
+                yield 1
+
+    def test_resume_by_skipping(self):
+        """Tests that a failure mid-stream re-creates the generator and skips the items already yielded"""
+
+        failures = {3: 1, 7: 1}
+        opened = []
+
+        @fault_tolerance.forward_err_recovery_by_retry(max_no_of_retries=3, exc_lst=[DummyException])
+        def paged_read(n):
+            opened.append(1)
+            for i in range(n):
+                if failures.get(i, 0) > 0:
+                    failures[i] -= 1
+                    raise DummyException()
+                yield i
+
+        assert list(paged_read(10)) == list(range(10))
+        assert len(opened) == 3
+
+    def test_resume_fn(self):
+        """Tests that resume_fn is given the offset of the next item and the arguments of the call"""
+
+        offsets = []
+        failed = []
+
+        def source(start, n):
+            for i in range(start, n):
+                if i == 5 and not failed:
+                    failed.append(1)
+                    raise DummyException()
+                yield i
+
+        def resume(offset: int, n: int):
+            offsets.append(offset)
+            return source(offset, n)
+
+        @fault_tolerance.forward_err_recovery_by_retry(max_no_of_retries=2, exc_lst=[DummyException], resume_fn=resume)
+        def paged_read(n):
+            return (yield from source(0, n))
+
+        assert list(paged_read(8)) == list(range(8))
+        assert offsets == [5]
+
+    def test_stream_exhaustion(self):
+        """Tests that a stream failing more than max_no_of_retries times raises FailedToRecoverError after the items it yielded"""
+
+        @fault_tolerance.forward_err_recovery_by_retry(max_no_of_retries=2, exc_lst=[DummyException])
+        def faulty():
+            yield 1
+            raise DummyException()
+
+        items = []
+        with pytest.raises(fault_tolerance.FailedToRecoverError):
+            for item in faulty():
+                items.append(item)
+        assert items == [1]
+
+    def test_consumer_exceptions_are_not_retried(self):
+        """Tests that exceptions thrown into the generator by the consumer are not mistaken for failures of the source"""
+
+        opened = []
+
+        @fault_tolerance.forward_err_recovery_by_retry(max_no_of_retries=3, exc_lst=[DummyException])
+        def numbers():
+            opened.append(1)
+            yield from range(10)
+
+        stream = numbers()
+        assert next(stream) == 0
+        with pytest.raises(DummyException):
+            stream.throw(DummyException())
+        assert len(opened) == 1
+
+    def test_async_generator(self):
+        """Tests that async generators are resumed mid-stream by skipping the items already yielded"""
+
+        failed = []
+
+        @fault_tolerance.forward_err_recovery_by_retry(max_no_of_retries=2, exc_lst=[DummyException])
+        async def paged_read(n):
+            for i in range(n):
+                if i == 4 and not failed:
+                    failed.append(1)
+                    raise DummyException()
+                await asyncio.sleep(0)
+                yield i
+
+        async def main():
+            return [item async for item in paged_read(8)]
+
+        assert asyncio.run(main()) == list(range(8))
@@ -0,0 +1,159 @@
+#MIT License
+#
+#Copyright (c) 2022 I-and-D-Got-Accelerators
+#
+#Permission is hereby granted, free of charge, to any person obtaining a copy
+#of this software and associated documentation files (the "Software"), to deal
+#in the Software without restriction, including without limitation the rights
+#to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#copies of the Software, and to permit persons to whom the Software is
+#furnished to do so, subject to the following conditions:
+#
+#The above copyright notice and this permission notice shall be included in all
+#copies or substantial portions of the Software.
+#
+#THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#SOFTWARE.
+
+import asyncio
+import time
+import pytest
+
+import fault_tolerance
+
+class DummyException(Exception):
+    pass
+
+class TestTimeoutSuite:
+
+    def test_incorrect_timeout_spec(self):
+        """Tests the error-detection concerning the specification of attempt_timeout and total_deadline"""
+
+        with pytest.raises(fault_tolerance.IncorrectFaultToleranceSpecificationError, match=r"^The parameter attempt_timeout is not a number"):
+            fault_tolerance.forward_err_recovery_by_retry(exc_lst=[DummyException], attempt_timeout=0)
+
+        with pytest.raises(fault_tolerance.IncorrectFaultToleranceSpecificationError, match=r"^The parameter total_deadline is not a number"):
+            fault_tolerance.forward_err_recovery_by_retry(exc_lst=[DummyException], total_deadline='1')
+
+    def test_hanging_attempt_is_abandoned_and_retried(self):
+        """Tests that an attempt exceeding attempt_timeout is abandoned and retried"""
+
+        calls = []
+
+        @fault_tolerance.forward_err_recovery_by_retry(max_no_of_retries=3, exc_lst=[DummyException], attempt_timeout=0.05)
+        def sometimes_hangs():
+            calls.append(1)
+            if len(calls) == 1:
+                time.sleep(1)
+            return len(calls)
+
+        t1 = time.monotonic()
+        assert sometimes_hangs() == 2
+        assert time.monotonic() - t1 < 0.5
+
+    def test_own_timeout_error_is_not_an_expired_attempt(self):
+        """Tests that a TimeoutError raised by the function is classified by exc_lst and not as an expired attempt"""
+
+        calls = []
+
+        @fault_tolerance.forward_err_recovery_by_retry(max_no_of_retries=3, exc_lst=[DummyException], attempt_timeout=1)
+        def faulty():
+            calls.append(1)
+            raise TimeoutError()
+
+        with pytest.raises(TimeoutError):
+            faulty()
+        assert len(calls) == 1
+
+    def test_attempt_timeout_error_of_the_function_is_classified_by_exc_lst(self):
+        """Tests that an AttemptTimeoutError raised by the function propagates alike on the plain and the instrumented path"""
+
+        calls = []
+
+        def raise_attempt_timeout():
+            calls.append(1)
+            raise fault_tolerance.AttemptTimeoutError("nested")
+
+        specs = [dict(), dict(total_deadline=10), dict(hooks=[fault_tolerance.RetryHooks()]), dict(attempt_timeout=1)]
+        for spec in specs:
+            calls.clear()
+            retried = fault_tolerance.forward_err_recovery_by_retry(max_no_of_retries=3, exc_lst=[DummyException], **spec)(raise_attempt_timeout)
+            with pytest.raises(fault_tolerance.AttemptTimeoutError, match=r"^nested$"):
+                retried()
+            assert len(calls) == 1
+
+        calls.clear()
+        retried = fault_tolerance.forward_err_recovery_by_retry(max_no_of_retries=3, exc_lst=[fault_tolerance.AttemptTimeoutError], total_deadline=10)(raise_attempt_timeout)
+        with pytest.raises(fault_tolerance.FailedToRecoverError):
+            retried()
+        assert len(calls) == 3
+
+    def test_total_deadline(self):
+        """Tests that the overall deadline bounds the total duration and surfaces as DeadlineExceededError"""
+
+        def backoff(attempt: int) -> float:
+            return 0.05
+
+        @fault_tolerance.forward_err_recovery_by_retry(max_no_of_retries=100, exc_lst=[DummyException], 
+                                                       backoff_duration_fn=backoff, total_deadline=0.2)
+        def faulty():
+            raise DummyException()
+
+        t1 = time.monotonic()
+        with pytest.raises(fault_tolerance.DeadlineExceededError):
+            faulty()
+        assert time.monotonic() - t1 < 0.2
+        assert issubclass(fault_tolerance.DeadlineExceededError, fault_tolerance.FailedToRecoverError)
+
+    def test_backoff_past_deadline_is_skipped(self):
+        """Tests that a backoff that would run past the deadline is not slept"""
+
+        def backoff(attempt: int) -> float:
+            return 10.0
+
+        @fault_tolerance.forward_err_recovery_by_retry(max_no_of_retries=3, exc_lst=[DummyException], 
+                                                       backoff_duration_fn=backoff, total_deadline=1)
+        def faulty():
+            raise DummyException()
+
+        t1 = time.monotonic()
+        with pytest.raises(fault_tolerance.DeadlineExceededError):
+            faulty()
+        assert time.monotonic() - t1 < 0.5
+
+    def test_coroutine_attempt_timeout(self):
+        """Tests that an awaited attempt exceeding attempt_timeout is cancelled and retried"""
+
+        calls = []
+        cancelled = []
+
+        @fault_tolerance.forward_err_recovery_by_retry(max_no_of_retries=3, exc_lst=[DummyException], attempt_timeout=0.05)
+        async def sometimes_hangs():
+            calls.append(1)
+            if len(calls) == 1:
+                try:
+                    await asyncio.sleep(1)
+                except asyncio.CancelledError:
+                    cancelled.append(1)
+                    raise
+            return len(calls)
+
+        assert asyncio.run(sometimes_hangs()) == 2
+        assert cancelled == [1]
+
+    def test_coroutine_total_deadline(self):
+        """Tests that the overall deadline applies to coroutines"""
+
+        @fault_tolerance.forward_err_recovery_by_retry(max_no_of_retries=3, exc_lst=[DummyException], total_deadline=0.1)
+        async def hangs():
+            await asyncio.sleep(1)
+
+        t1 = time.monotonic()
+        with pytest.raises(fault_tolerance.FailedToRecoverError):
+            asyncio.run(hangs())
+        assert time.monotonic() - t1 < 0.5
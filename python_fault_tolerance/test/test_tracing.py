@@ -0,0 +1,196 @@
+#MIT License
+#
+#Copyright (c) 2022 I-and-D-Got-Accelerators
+#
+#Permission is hereby granted, free of charge, to any person obtaining a copy
+#of this software and associated documentation files (the "Software"), to deal
+#in the Software without restriction, including without limitation the rights
+#to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#copies of the Software, and to permit persons to whom the Software is
+#furnished to do so, subject to the following conditions:
+#
+#The above copyright notice and this permission notice shall be included in all
+#copies or substantial portions of the Software.
+#
+#THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#SOFTWARE.
+
+import asyncio
+import io
+import json
+import weakref
+import pytest
+
+import fault_tolerance
+
+class DummyException(Exception):
+    pass
+
+class OtherException(Exception):
+    pass
+
+class TestTracingSuite:
+
+    def test_trace_of_failed_call(self):
+        """Tests that FailedToRecoverError carries the attempts, exceptions and backoffs of the call and is caused by the last exception"""
+
+        fault_tolerance.TRACE_RING.clear()
+        clock = fault_tolerance.VirtualClock()
+        calls = []
+
+        @fault_tolerance.forward_err_recovery_by_retry(max_no_of_retries=3, exc_lst=[DummyException], 
+                                                       backoff_duration_fn=fault_tolerance.ExponentialBackoff(1.0), clock=clock)
+        def dummy():
+            calls.append(None)
+            clock.advance(0.25)
+            raise DummyException(f"attempt {len(calls)}")
+
+        with pytest.raises(fault_tolerance.FailedToRecoverError) as exc_info:
+            dummy()
+        error = exc_info.value
+        assert isinstance(error.__cause__, DummyException) and str(error.__cause__) == "attempt 3"
+        trace = error.trace
+        assert trace.name.endswith("dummy") and not trace.recovered
+        assert [attempt.attempt for attempt in trace.attempts] == [1, 2, 3]
+        assert [attempt.started_at for attempt in trace.attempts] == [None, 1.25, 3.5]
+        assert [attempt.ended_at for attempt in trace.attempts] == [0.25, 1.5, 3.75]
+        assert [attempt.exc_type for attempt in trace.attempts] == ['DummyException'] * 3
+        assert [attempt.exc_message for attempt in trace.attempts] == ["attempt 1", "attempt 2", "attempt 3"]
+        assert [attempt.backoff for attempt in trace.attempts] == [1.0, 2.0, 4.0]
+        assert trace.backoff == 7.0
+
+        traces = fault_tolerance.TRACE_RING.traces()
+        assert len(traces) == 1 and traces[0].attempts == trace.attempts
+
+        # the trace is built from the attempts kept by the error even if the ring does not record them
+        fault_tolerance.TRACE_RING.enabled = False
+        try:
+            calls.clear()
+            with pytest.raises(fault_tolerance.FailedToRecoverError) as exc_info:
+                dummy()
+        finally:
+            fault_tolerance.TRACE_RING.enabled = True
+        assert [attempt.exc_message for attempt in exc_info.value.trace.attempts] == ["attempt 1", "attempt 2", "attempt 3"]
+        assert exc_info.value.trace is exc_info.value.trace
+        assert len(fault_tolerance.TRACE_RING.traces()) == 1
+
+    def test_trace_of_exhausted_budget_and_deadline(self):
+        """Tests that a call given up on by its deadline or its retry budget is traced too"""
+
+        clock = fault_tolerance.VirtualClock()
+
+        @fault_tolerance.forward_err_recovery_by_retry(max_no_of_retries=10, exc_lst=[DummyException], total_deadline=2.5,
+                                                       backoff_duration_fn=fault_tolerance.ConstantBackoff(1.0), clock=clock)
+        def dummy():
+            raise DummyException()
+
+        with pytest.raises(fault_tolerance.DeadlineExceededError) as exc_info:
+            dummy()
+        assert isinstance(exc_info.value.__cause__, DummyException)
+        assert [attempt.started_at for attempt in exc_info.value.trace.attempts] == [0.0, 1.0, 2.0]
+
+        @fault_tolerance.forward_err_recovery_by_retry(max_no_of_retries=10, exc_lst=[DummyException], 
+                                                       retry_budget=fault_tolerance.RetryBudget(max_tokens=1))
+        async def dummy_async():
+            raise DummyException()
+
+        with pytest.raises(fault_tolerance.RetryBudgetExhaustedError) as exc_info:
+            asyncio.run(dummy_async())
+        assert isinstance(exc_info.value.__cause__, DummyException)
+        assert len(exc_info.value.trace.attempts) == 2
+
+    def test_trace_ring(self):
+        """Tests that the ring keeps the most recent whole calls that failed at least once, and dumps them as JSON lines"""
+
+        fault_tolerance.TRACE_RING.clear()
+        outcomes = []
+
+        @fault_tolerance.forward_err_recovery_by_retry(max_no_of_retries=3, exc_lst=[DummyException])
+        def dummy():
+            outcome = outcomes.pop(0)
+            if outcome is not None:
+                raise outcome
+            return 1
+
+        outcomes[:] = [None, DummyException("x" * 1000), None, DummyException(), OtherException("fatal")]
+        assert dummy() == 1
+        assert dummy() == 1
+        with pytest.raises(OtherException):
+            dummy()
+
+        traces = fault_tolerance.TRACE_RING.traces()
+        assert [(trace.recovered, len(trace.attempts)) for trace in traces] == [(True, 2), (False, 2)]
+        assert traces[0].attempts[0].exc_message == "x" * fault_tolerance.tracing.MAX_EXC_MESSAGE_LENGTH
+        assert traces[0].attempts[1].exc_type is None
+        assert traces[1].attempts[1].exc_type == 'OtherException'
+
+        fp = io.StringIO()
+        assert fault_tolerance.TRACE_RING.dump(fp) == 2
+        lines = [json.loads(line) for line in fp.getvalue().splitlines()]
+        assert lines[1]['recovered'] is False and lines[1]['attempts'][1]['exc_message'] == "fatal"
+        assert lines[0]['attempts'][0]['started_at'] is None
+
+        ring = fault_tolerance.TraceRing(capacity=5)
+        for no in range(3):
+            ring.record('call', [None, 1.0, DummyException(), 0.5, 1.5, 2.0, None, 0.0], True)
+        assert len(ring.traces()) == 2
+        ring.enabled = False
+        ring.record('call', [None, 1.0, DummyException(), 0.5, 1.5, 2.0, None, 0.0], True)
+        assert len(ring.traces()) == 2
+        ring.enabled = True
+        ring.record('long call', [None, 1.0, DummyException(), 0.0] * 6, False)
+        assert [trace.name for trace in ring.traces()] == ['call', 'call']
+
+        # the ring keeps the type and message of an exception, not the exception and its traceback
+        exc = DummyException("released")
+        released = weakref.ref(exc)
+        ring.record('call', [None, 1.0, exc, 0.5, 1.5, 2.0, None, 0.0], True)
+        del exc
+        assert released() is None
+        assert ring.traces()[-1].attempts[0].exc_message == "released"
+
+        with pytest.raises(fault_tolerance.IncorrectFaultToleranceSpecificationError, match=r"^The parameter capacity is not an int"):
+            fault_tolerance.TraceRing(capacity=0)
+
+    def test_unformattable_exceptions_do_not_change_the_outcome(self):
+        """Tests that an exception whose __str__ raises is traced by its type, and that huge arguments are formatted within bounds"""
+
+        class UnprintableException(Exception):
+            def __str__(self):
+                raise RuntimeError("boom")
+
+        fault_tolerance.TRACE_RING.clear()
+        outcomes = [UnprintableException(), None, DummyException(list(range(100000))), DummyException(), DummyException()]
+
+        @fault_tolerance.forward_err_recovery_by_retry(max_no_of_retries=3, exc_lst=[DummyException, UnprintableException])
+        def dummy():
+            outcome = outcomes.pop(0)
+            if outcome is not None:
+                raise outcome
+            return "ok"
+
+        assert dummy() == "ok"
+        with pytest.raises(fault_tolerance.FailedToRecoverError) as exc_info:
+            dummy()
+        recovered, failed = fault_tolerance.TRACE_RING.traces()
+        assert recovered.attempts[0].exc_type == recovered.attempts[0].exc_message
+        assert recovered.attempts[0].exc_type.endswith('UnprintableException')
+        assert len(failed.attempts[0].exc_message) <= fault_tolerance.tracing.MAX_EXC_MESSAGE_LENGTH
+        assert failed.attempts[0].exc_message.startswith("[0, 1, 2")
+        assert exc_info.value.trace.attempts == failed.attempts
+
+    def test_hedging_failure_is_caused_by_last_exception(self):
+        """Tests that a call whose hedged attempts all failed is caused by an exception of an attempt"""
+
+        @fault_tolerance.forward_err_recovery_by_hedging(exc_lst=[DummyException], max_no_of_hedges=1, hedge_delay=0.01)
+        def dummy():
+            raise DummyException()
+
+        with pytest.raises(fault_tolerance.FailedToRecoverError) as exc_info:
+            dummy()
+        assert isinstance(exc_info.value.__cause__, DummyException)
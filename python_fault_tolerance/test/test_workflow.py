@@ -0,0 +1,225 @@
+#MIT License
+#
+#Copyright (c) 2022 I-and-D-Got-Accelerators
+#
+#Permission is hereby granted, free of charge, to any person obtaining a copy
+#of this software and associated documentation files (the "Software"), to deal
+#in the Software without restriction, including without limitation the rights
+#to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#copies of the Software, and to permit persons to whom the Software is
+#furnished to do so, subject to the following conditions:
+#
+#The above copyright notice and this permission notice shall be included in all
+#copies or substantial portions of the Software.
+#
+#THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#SOFTWARE.
+
+import asyncio
+import threading
+import pytest
+
+import fault_tolerance
+
+class DummyException(Exception):
+    pass
+
+class TestWorkflowSuite:
+
+    def test_incorrect_workflow_spec(self):
+        """Tests the error-detection concerning the specification of workflows and their steps"""
+
+        with pytest.raises(fault_tolerance.IncorrectFaultToleranceSpecificationError, match=r"^The parameter checkpoints is incorrect"):
+            fault_tolerance.Workflow('etl', checkpoints={})
+        workflow = fault_tolerance.Workflow('etl')
+        with pytest.raises(fault_tolerance.IncorrectFaultToleranceSpecificationError, match=r"^The parameter depends_on is incorrect"):
+            workflow.step(depends_on='extract')
+
+        @workflow.step()
+        def extract():
+            return 1
+
+        with pytest.raises(fault_tolerance.IncorrectFaultToleranceSpecificationError, match=r"^The workflow 'etl' already has a step named 'extract'"):
+            workflow.step()(extract)
+        with pytest.raises(fault_tolerance.IncorrectFaultToleranceSpecificationError, match=r"^The step 'load' cannot depend on itself"):
+            workflow.step(depends_on=['load'], name='load')(lambda load: load)
+
+        @workflow.step(depends_on=['extract', 'table'])
+        def load(extract, table):
+            return extract
+
+        with pytest.raises(fault_tolerance.IncorrectFaultToleranceSpecificationError, match=r"^The step 'load' depends on 'table', which is neither a step nor a parameter"):
+            workflow.run()
+        with pytest.raises(fault_tolerance.IncorrectFaultToleranceSpecificationError, match=r"^The parameter 'extract' of the run is named like a step of the workflow 'etl'"):
+            workflow.run(table='t', extract='from param')
+        assert workflow.run(table='t') == {'extract': 1, 'load': 1}
+        with pytest.raises(fault_tolerance.IncorrectFaultToleranceSpecificationError, match=r"^The parameter fresh is incorrect"):
+            workflow.run(fresh=1, table='t')
+
+        cyclic = fault_tolerance.Workflow('cyclic')
+        cyclic.step(depends_on=['b'], name='a')(lambda b: b)
+        cyclic.step(depends_on=['a'], name='b')(lambda a: a)
+        with pytest.raises(fault_tolerance.IncorrectFaultToleranceSpecificationError, match=r"^The steps \['a', 'b'\] of the workflow 'cyclic' depend on each other in a cycle"):
+            cyclic.run()
+
+    def test_workflow_dependencies(self):
+        """Tests that steps get the results they depend on, and that independent steps run concurrently"""
+
+        workflow = fault_tolerance.Workflow('diamond')
+        barrier = threading.Barrier(2, timeout=5)
+
+        @workflow.step(depends_on=['n'])
+        def source(n):
+            return n
+
+        @workflow.step(depends_on=['source'])
+        def left(source):
+            barrier.wait()
+            return source + 1
+
+        @workflow.step(depends_on=['source'])
+        def right(source):
+            barrier.wait()
+            return source * 10
+
+        @workflow.step(depends_on=['left', 'right'])
+        def sink(left, right):
+            return (left, right)
+
+        assert workflow.steps == ('source', 'left', 'right', 'sink')
+        assert workflow.run(n=2) == {'source': 2, 'left': 3, 'right': 20, 'sink': (3, 20)}
+
+    def test_workflow_resume(self, tmp_path):
+        """Tests that a failed workflow resumes from the checkpoints of its completed steps"""
+
+        checkpoints = fault_tolerance.SQLiteResultCache(str(tmp_path / 'checkpoints.db'))
+        calls = []
+        failing = [True]
+
+        def define():
+            workflow = fault_tolerance.Workflow('pipeline', checkpoints=checkpoints)
+
+            @workflow.step(depends_on=['n'])
+            def first(n):
+                calls.append('first')
+                return n + 1
+
+            @workflow.step(depends_on=['first'])
+            def second(first):
+                calls.append('second')
+                return first * 2
+
+            @workflow.step(depends_on=['second'])
+            @fault_tolerance.forward_err_recovery_by_retry(max_no_of_retries=2, exc_lst=[DummyException])
+            def third(second):
+                calls.append('third')
+                if failing[0]:
+                    raise DummyException("third failed")
+                return second + 1
+
+            @workflow.step(depends_on=['n'])
+            def independent(n):
+                calls.append('independent')
+                return -n
+
+            return workflow
+
+        with pytest.raises(fault_tolerance.WorkflowFailedError, match=r"^Workflow 'pipeline' failed at the steps \['third'\] after completing 3 of 4 steps") as info:
+            define().run(n=1)
+        assert info.value.results == {'first': 2, 'second': 4, 'independent': -1}
+        assert list(info.value.failures) == ['third']
+        assert isinstance(info.value.failures['third'], fault_tolerance.FailedToRecoverError)
+        assert info.value.__cause__ is info.value.failures['third']
+        assert sorted(calls) == ['first', 'independent', 'second', 'third', 'third']
+
+        # a new process resumes from the checkpoints on disk
+        calls.clear()
+        failing[0] = False
+        assert define().run(n=1) == {'first': 2, 'second': 4, 'independent': -1, 'third': 5}
+        assert calls == ['third']
+
+        # another run id starts from scratch
+        calls.clear()
+        assert define().run(run_id='other', n=1)['third'] == 5
+        assert sorted(calls) == ['first', 'independent', 'second', 'third']
+
+        # a fresh run reruns the completed run
+        calls.clear()
+        assert define().run(fresh=True, n=1)['third'] == 5
+        assert sorted(calls) == ['first', 'independent', 'second', 'third']
+
+    def test_workflow_without_parameters_needs_run_id(self):
+        """Tests that a checkpointed run without parameters needs a run_id, and does not resume the previous runs"""
+
+        workflow = fault_tolerance.Workflow('nightly', checkpoints=fault_tolerance.InMemoryResultCache())
+        calls = []
+
+        @workflow.step()
+        def report():
+            calls.append(1)
+            return len(calls)
+
+        with pytest.raises(fault_tolerance.IncorrectFaultToleranceSpecificationError, match=r"^The parameter run_id is missing"):
+            workflow.run()
+        with pytest.raises(fault_tolerance.IncorrectFaultToleranceSpecificationError, match=r"^The parameter run_id is missing"):
+            asyncio.run(workflow.run_async())
+        assert workflow.run(run_id='2026-10-17') == {'report': 1}
+        assert workflow.run(run_id='2026-10-18') == {'report': 2}
+        assert workflow.run(run_id='2026-10-18') == {'report': 2}
+        assert workflow.run(run_id='2026-10-18', fresh=True) == {'report': 3}
+        assert asyncio.run(workflow.run_async(run_id='2026-10-18')) == {'report': 3}
+
+    def test_workflow_skips_dependents_of_failed_steps(self):
+        """Tests that the steps depending on a failed step are not run"""
+
+        workflow = fault_tolerance.Workflow('skip')
+        ran = []
+
+        @workflow.step()
+        def broken():
+            raise DummyException("broken")
+
+        @workflow.step(depends_on=['broken'])
+        def dependent(broken):
+            ran.append('dependent')
+
+        with pytest.raises(fault_tolerance.WorkflowFailedError) as info:
+            workflow.run()
+        assert info.value.results == {}
+        assert isinstance(info.value.__cause__, DummyException)
+        assert ran == []
+
+    def test_workflow_async(self):
+        """Tests running coroutine function and plain function steps on the event loop"""
+
+        workflow = fault_tolerance.Workflow('async')
+        calls = []
+
+        @workflow.step(depends_on=['n'])
+        async def fetch(n):
+            await asyncio.sleep(0)
+            calls.append('fetch')
+            return n * 3
+
+        @workflow.step(depends_on=['fetch'])
+        def transform(fetch):
+            calls.append('transform')
+            return fetch + 1
+
+        @workflow.step(depends_on=['fetch'])
+        async def broken(fetch):
+            raise DummyException("broken")
+
+        with pytest.raises(fault_tolerance.WorkflowFailedError, match=r"^Workflow 'async' failed at the steps \['broken'\]") as info:
+            asyncio.run(workflow.run_async(n=2))
+        assert info.value.results == {'fetch': 6, 'transform': 7}
+        assert isinstance(info.value.__cause__, DummyException)
+        # coroutine function steps also run in the threads of run
+        with pytest.raises(fault_tolerance.WorkflowFailedError):
+            workflow.run(n=2)
+        assert calls == ['fetch', 'transform', 'fetch', 'transform']